@@ -0,0 +1,115 @@
+"""
+Automatic exposure and gain from star statistics.
+
+The worker feeds every solved frame's ``StarField`` (star count, saturated
+stars, sky background) and whether it solved to ``AutoExposure``. Every
+``camera.ae_window`` frames taken at the current settings it decides:
+
+- too bright (background above ``camera.ae_max_background`` of the white
+  level, or many saturated stars), or comfortably solving with at least 1.5x
+  ``camera.ae_target_stars``: less signal, shortening the exposure first and
+  then lowering the gain;
+- failed solves or fewer than ``camera.ae_target_stars`` stars: more signal,
+  raising the gain first and then the exposure;
+- otherwise hold.
+
+A signal level (exposure x gain) that proved too little isn't tried again
+for a while, so the loop settles just above it instead of oscillating.
+"""
+
+from collections import deque
+from typing import Optional, Tuple
+
+from skysolve_next.core.config import settings
+from skysolve_next.core.logging_config import get_logger
+from skysolve_next.solver.starfinder import StarField
+
+LESS_SIGNAL = 0.7
+MORE_SIGNAL = 1.5
+# Stars needed for a step down, relative to ae_target_stars
+HEADROOM = 1.5
+# Saturated fraction of the stars that counts as too bright
+MAX_SATURATED = 0.2
+# Windows during which a signal level that failed is not retried
+RETRY_WINDOWS = 20
+# Relative mismatch at which a frame is considered taken with other settings
+MATCH_TOLERANCE = 0.05
+
+
+class AutoExposure:
+    """Steers exposure and gain toward the shortest exposure that still solves."""
+
+    def __init__(self, exposure_s: float, gain: float) -> None:
+        cfg = settings.snapshot().camera
+        # Start from the manual values, brought within the limits
+        self.exposure_s = min(cfg.ae_max_exposure_s, max(cfg.ae_min_exposure_s, exposure_s))
+        self.gain = min(cfg.ae_max_gain, max(cfg.ae_min_gain, gain))
+        self.logger = get_logger("camera_autoexposure", "camera")
+        self._samples: deque = deque()
+        self._frames = 0
+        self._floor: Optional[Tuple[float, int]] = None  # (signal that was too little, frame it expires)
+        self.last_decision: Optional[str] = None
+
+    def observe(self, field: StarField, solved: bool, white: float,
+                exposure: Optional[Tuple[float, float]]) -> Optional[Tuple[float, float]]:
+        """Record one frame taken at ``exposure`` (seconds, gain); returns new (seconds, gain) to use, if any."""
+        cfg = settings.snapshot().camera
+        self._frames += 1
+        if exposure is None or not self._matches(exposure):
+            return None  # taken before the last change
+        self._samples.append((len(field), field.saturated, field.background / white if white else 0.0, solved))
+        window = max(1, cfg.ae_window)
+        while len(self._samples) > window:
+            self._samples.popleft()
+        if len(self._samples) < window:
+            return None
+
+        stars = sum(s[0] for s in self._samples) / window
+        saturated = sum(s[1] for s in self._samples) / max(1, sum(s[0] for s in self._samples))
+        background = sum(s[2] for s in self._samples) / window
+        solve_rate = sum(1 for s in self._samples if s[3]) / window
+        signal = self.exposure_s * self.gain
+
+        if background > cfg.ae_max_background or saturated > MAX_SATURATED:
+            factor, reason = LESS_SIGNAL, "too bright"
+        elif solve_rate < 1.0 or stars < cfg.ae_target_stars:
+            factor, reason = MORE_SIGNAL, "too few stars" if solve_rate == 1.0 else "failed solves"
+            self._floor = (signal, self._frames + RETRY_WINDOWS * window)
+        elif stars >= cfg.ae_target_stars * HEADROOM:
+            factor, reason = LESS_SIGNAL, "enough stars"
+            if self._floor is not None and self._frames < self._floor[1] and signal * factor <= self._floor[0]:
+                return None  # the next step down already failed recently
+        else:
+            return None
+
+        exposure_s, gain = self._distribute(signal * factor, factor > 1.0)
+        if abs(exposure_s - self.exposure_s) < 1e-6 and abs(gain - self.gain) < 1e-6:
+            return None  # at the limits
+        self.logger.info(f"Auto exposure ({reason}: {stars:.1f} stars, {solve_rate:.0%} solved, "
+                         f"background {background:.0%}): {self.exposure_s:.3f}s x{self.gain:.1f} -> "
+                         f"{exposure_s:.3f}s x{gain:.1f}")
+        self.exposure_s, self.gain = exposure_s, gain
+        self.last_decision = reason
+        self._samples.clear()
+        return exposure_s, gain
+
+    def _distribute(self, signal: float, more: bool) -> Tuple[float, float]:
+        """Split a signal level into (exposure, gain): gain goes up first, exposure comes down first."""
+        cfg = settings.snapshot().camera
+        if more:
+            gain = min(cfg.ae_max_gain, max(cfg.ae_min_gain, signal / self.exposure_s))
+            exposure_s = signal / gain
+        else:
+            exposure_s = max(cfg.ae_min_exposure_s, min(cfg.ae_max_exposure_s, signal / self.gain))
+            gain = signal / exposure_s
+        gain = min(cfg.ae_max_gain, max(cfg.ae_min_gain, gain))
+        exposure_s = min(cfg.ae_max_exposure_s, max(cfg.ae_min_exposure_s, exposure_s))
+        return round(exposure_s, 6), round(gain, 3)
+
+    def _matches(self, exposure: Tuple[float, float]) -> bool:
+        exposure_s, gain = exposure
+        return (abs(exposure_s - self.exposure_s) <= MATCH_TOLERANCE * self.exposure_s
+                and abs(gain - self.gain) <= MATCH_TOLERANCE * self.gain)
+
+    def stats(self):
+        return {"exposure_s": self.exposure_s, "gain": self.gain, "last_decision": self.last_decision}
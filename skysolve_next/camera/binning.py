@@ -0,0 +1,113 @@
+"""
+Sensor binning and region of interest.
+
+``camera.binning`` reduces the frame to 1/2 or 1/4 of ``camera.image_size``
+per side, using the smallest sensor mode (the sensor's own binned readout)
+that still covers that size, so fewer pixels are read out, extracted and
+solved. ``camera.roi`` crops on-chip through ``ScalerCrop``; the output size
+shrinks with it so the plate scale only depends on the binning.
+
+With ``camera.auto_binning`` the worker feeds the star count of every solved
+frame to ``AutoBinning``, which steps to a coarser mode while the frames have
+plenty of stars and back to a finer one when they fall below
+``camera.min_stars``.
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from skysolve_next.core.config import settings
+from skysolve_next.core.logging_config import get_logger
+
+BINNING_LEVELS = (1, 2, 4)
+# Step to a coarser mode only when the frames have this many times the stars needed
+COARSER_HEADROOM = 2.0
+# After a coarser mode ran short of stars, don't retry it for this many windows
+RETRY_WINDOWS = 20
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    width, height = map(int, text.split("x"))
+    return width, height
+
+
+def output_size(image_size: Tuple[int, int], binning: int, roi: Optional[Sequence[float]] = None) -> Tuple[int, int]:
+    """Frame size for ``binning`` and an optional ``[x, y, width, height]`` ROI (fractions of the frame).
+
+    Sizes are rounded down to even numbers, as the ISP requires.
+    """
+    width, height = image_size[0] / binning, image_size[1] / binning
+    if roi:
+        width, height = width * roi[2], height * roi[3]
+    return max(2, int(width) // 2 * 2), max(2, int(height) // 2 * 2)
+
+
+def pick_sensor_mode(modes: List[Dict[str, Any]], size: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+    """The smallest sensor mode at least ``size`` (the full, uncropped frame), if any."""
+    fits = [m for m in modes if m["size"][0] >= size[0] and m["size"][1] >= size[1]]
+    if not fits:
+        return None
+    return min(fits, key=lambda m: (m["size"][0] * m["size"][1], -m.get("bit_depth", 0)))
+
+
+def scaler_crop(roi: Sequence[float], crop_max: Sequence[int]) -> Tuple[int, int, int, int]:
+    """``ScalerCrop`` rectangle (sensor pixels) for a fractional ROI within ``ScalerCropMaximum``."""
+    x0, y0, width, height = crop_max
+    return (int(x0 + roi[0] * width), int(y0 + roi[1] * height), int(roi[2] * width), int(roi[3] * height))
+
+
+def bin_frame(frame: np.ndarray, binning: int, roi: Optional[Sequence[float]] = None) -> np.ndarray:
+    """Software equivalent of sensor binning and ROI, for frames not coming from a sensor."""
+    if roi:
+        height, width = frame.shape[:2]
+        x, y = int(roi[0] * width), int(roi[1] * height)
+        frame = frame[y:y + int(roi[3] * height), x:x + int(roi[2] * width)]
+    if binning == 1:
+        return frame
+    height = frame.shape[0] // binning * binning
+    width = frame.shape[1] // binning * binning
+    blocks = frame[:height, :width].reshape(height // binning, binning, width // binning, binning, *frame.shape[2:])
+    return blocks.mean(axis=(1, 3)).astype(frame.dtype)
+
+
+class AutoBinning:
+    """Chooses the coarsest binning whose frames still have enough stars."""
+
+    def __init__(self, binning: int = 1) -> None:
+        self.binning = binning
+        self.logger = get_logger("camera_binning", "camera")
+        self._counts: deque = deque()
+        self._frames = 0
+        self._blocked_until: Dict[int, int] = {}  # binning -> frame number
+
+    def observe(self, binning: int, stars: Optional[int]) -> Optional[int]:
+        """Record the star count of a frame taken at ``binning``; returns a new binning to switch to, if any."""
+        cfg = settings.snapshot().camera
+        self._frames += 1
+        if stars is None or binning != self.binning:
+            return None  # taken before the last switch
+        window = max(1, cfg.binning_window)
+        self._counts.append(stars)
+        while len(self._counts) > window:
+            self._counts.popleft()
+        if len(self._counts) < window:
+            return None
+        mean = sum(self._counts) / len(self._counts)
+        levels = [b for b in BINNING_LEVELS if b <= cfg.max_binning]
+        index = levels.index(binning) if binning in levels else 0
+        target = None
+        if mean < cfg.min_stars and index > 0:
+            target = levels[index - 1]
+            self._blocked_until[binning] = self._frames + RETRY_WINDOWS * window
+        elif (mean >= cfg.min_stars * COARSER_HEADROOM and index + 1 < len(levels)
+              and self._blocked_until.get(levels[index + 1], 0) <= self._frames):
+            target = levels[index + 1]
+        if target is None:
+            return None
+        self.logger.info(f"Auto binning: {binning}x{binning} -> {target}x{target} "
+                         f"(mean {mean:.1f} stars over {window} frames, min {cfg.min_stars})")
+        self.binning = target
+        self._counts.clear()
+        return target
@@ -0,0 +1,98 @@
+"""
+Camera control management for Picamera2.
+
+``CameraControlManager`` keeps the controls last sent to libcamera and only
+sends the ones that differ from a new request, so an unchanged exposure
+doesn't queue a control update with every frame. Each change bumps a
+generation number. Frames are captured together with their metadata, and
+until the metadata reports the requested ``ExposureTime`` and
+``AnalogueGain`` (within ``camera.control_tolerance``) the frames still in
+flight were taken with the old values and are dropped.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from skysolve_next.core.config import settings
+from skysolve_next.core.logging_config import get_logger
+
+# Controls whose effect can be read back from the frame metadata
+VERIFIED_CONTROLS = ("ExposureTime", "AnalogueGain")
+
+
+class CameraControlManager:
+    """Applies only changed controls and tells which frames were taken with them."""
+
+    def __init__(self, picam) -> None:
+        self.picam = picam
+        self.logger = get_logger("camera_controls", "camera")
+        self._lock = threading.Lock()
+        self._active: Dict[str, Any] = {}
+        self._pending: Dict[str, Any] = {}  # applied but not yet seen in frame metadata
+        self.generation = 0
+        self.stale_frames = 0  # dropped since the last change
+        self.dropped = 0
+        self.last_metadata: Dict[str, Any] = {}
+
+    @property
+    def settled(self) -> bool:
+        with self._lock:
+            return not self._pending
+
+    def apply(self, controls: Dict[str, Any]) -> Dict[str, Any]:
+        """Send the controls that differ from the active ones; returns what was sent."""
+        with self._lock:
+            changes = {k: v for k, v in controls.items() if self._active.get(k) != v}
+            if not changes:
+                return {}
+            self.picam.set_controls(changes)
+            self._active.update(changes)
+            self._pending.update({k: v for k, v in changes.items() if k in VERIFIED_CONTROLS})
+            self.generation += 1
+            self.stale_frames = 0
+        self.logger.debug(f"Camera controls changed (generation {self.generation}): {changes}")
+        return changes
+
+    def capture(self, names: Sequence[str] = ("main",)) -> Tuple[Optional[List[np.ndarray]], Dict[str, Any]]:
+        """Capture the named streams of one request with its metadata.
+
+        The arrays are None if the frame predates the last control change.
+        """
+        arrays, metadata = self.picam.capture_arrays(list(names))
+        return (arrays if self.accept(metadata) else None), metadata
+
+    def accept(self, metadata: Dict[str, Any]) -> bool:
+        """True if a frame with this metadata was taken with the requested controls."""
+        with self._lock:
+            self.last_metadata = metadata
+            if not self._pending:
+                return True
+            if all(self._matches(metadata.get(k), v) for k, v in self._pending.items()):
+                self._pending = {}
+                return True
+            self.stale_frames += 1
+            if self.stale_frames > settings.snapshot().camera.max_stale_frames:
+                # The sensor clamped or rounded the request; take what it delivers
+                self.logger.warning(f"Camera controls {self._pending} not confirmed after {self.stale_frames - 1} "
+                                    f"frames; using {self._reported(metadata)}")
+                self._pending = {}
+                return True
+            self.dropped += 1
+            return False
+
+    @staticmethod
+    def _matches(actual, requested) -> bool:
+        if actual is None:
+            return False
+        return abs(float(actual) - float(requested)) <= settings.snapshot().camera.control_tolerance * abs(float(requested))
+
+    @staticmethod
+    def _reported(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: metadata.get(k) for k in VERIFIED_CONTROLS}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"generation": self.generation, "settled": not self._pending, "dropped": self.dropped,
+                    **self._reported(self.last_metadata)}
@@ -0,0 +1,118 @@
+"""
+Background preview encoding.
+
+The capture path hands each preview frame (the Picamera2 ``lores`` stream,
+or the full frame without a camera) to ``PreviewEncoder.submit``, which only
+keeps a reference to the newest one. A background thread JPEG-encodes at most
+``camera.preview_fps`` frames per second, downscaled to fit
+``camera.preview_size``, and publishes them into shared memory, from where
+the web app serves ``/solve/image.jpg``. Nothing is written to disk.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from skysolve_next.core.config import settings
+from skysolve_next.core.logging_config import get_logger
+from skysolve_next.core.metrics import metrics
+from skysolve_next.core.shm import SharedPreview, shared_preview
+
+
+def preview_size():
+    """(width, height) of the preview from ``camera.preview_size``."""
+    width, height = map(int, settings.snapshot().camera.preview_size.split("x"))
+    return width, height
+
+
+def fit_size(size, bound):
+    """``size`` scaled down (keeping its aspect, even sides) to fit within ``bound``; Picamera2 needs
+    the lores stream to be no larger than the main stream."""
+    scale = min(1.0, bound[0] / size[0], bound[1] / size[1])
+    if scale == 1.0:
+        return tuple(size)
+    return max(2, int(size[0] * scale) // 2 * 2), max(2, int(size[1] * scale) // 2 * 2)
+
+
+def yuv420_luma(frame: np.ndarray, width: int, height: int) -> np.ndarray:
+    """The Y plane of a YUV420 frame as returned by Picamera2 (``height * 3 / 2`` rows, maybe padded)."""
+    return frame[:height, :width]
+
+
+class PreviewEncoder:
+    """Encodes the newest submitted frame to JPEG on its own thread, at a capped rate."""
+
+    def __init__(self, target: SharedPreview = shared_preview) -> None:
+        self.target = target
+        self.logger = get_logger("camera_preview", "camera")
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.encoded = 0
+        self.skipped = 0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="camera-preview", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def submit(self, frame: np.ndarray) -> None:
+        """Offer a frame for the preview; never blocks on encoding."""
+        with self._cond:
+            if self._frame is not None:
+                self.skipped += 1  # superseded before it was encoded
+            self._frame = frame
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"encoded": self.encoded, "skipped": self.skipped, "last_error": self.last_error}
+
+    def _run(self) -> None:
+        next_at = 0.0
+        while True:
+            with self._cond:
+                while self._running and self._frame is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+            # Rate cap: leave newer frames to replace this one while we wait
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            with self._cond:
+                frame, self._frame = self._frame, None
+            next_at = time.monotonic() + 1.0 / max(settings.snapshot().camera.preview_fps, 0.01)
+            try:
+                self.encode(frame)
+            except Exception as e:
+                self.last_error = f"Preview encode failed: {e}"
+                self.logger.error(self.last_error)
+
+    def encode(self, frame: np.ndarray) -> bytes:
+        import cv2
+        with metrics.timer("preview_encode"):
+            width, height = preview_size()
+            scale = min(width / frame.shape[1], height / frame.shape[0])
+            if scale < 1.0:
+                frame = cv2.resize(frame, (max(1, int(frame.shape[1] * scale)), max(1, int(frame.shape[0] * scale))),
+                                   interpolation=cv2.INTER_AREA)
+            ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, settings.snapshot().camera.preview_quality])
+            if not ok:
+                raise ValueError("JPEG encoding failed")
+            data = jpeg.tobytes()
+        if not self.target.publish(data):
+            raise ValueError(f"Preview of {len(data)} bytes doesn't fit in shared memory")
+        self.encoded += 1
+        self.last_error = None
+        return data
@@ -0,0 +1,92 @@
+"""
+Raw Bayer and mono frames for star detection.
+
+With ``camera.format`` set to ``raw``, the worker captures the unpacked raw
+stream of a sensor mode instead of an ISP-processed ``RGB888`` frame; colour
+and mono sensors are told apart by the sensor mode's raw format. The ISP
+then only produces the small preview stream, and the frame for the solver is
+built here with strided NumPy views straight into a ``uint16`` array, keeping
+the sensor's linear response:
+
+- ``superpixel``: sum of each 2x2 Bayer cell (R + 2G + B), half resolution.
+- ``green``: sum of the two green pixels of each cell, half resolution; the
+  green channel has the best signal and the sharpest stars.
+- mono sensors: the raw plane as is.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+BAYER_ORDERS = ("RGGB", "GRBG", "GBRG", "BGGR")
+
+
+def bayer_order(fmt: str) -> Optional[str]:
+    """Bayer order of a raw format such as ``SRGGB12`` (None for mono formats like ``R12``)."""
+    if fmt.startswith("S") and fmt[1:5] in BAYER_ORDERS:
+        return fmt[1:5]
+    return None
+
+
+def bit_depth(fmt: str) -> int:
+    digits = "".join(c for c in fmt.split("_")[0] if c.isdigit())
+    return int(digits) if digits else 8
+
+
+def unpack(raw: np.ndarray, width: int) -> np.ndarray:
+    """View an unpacked raw buffer (uint8 rows of 16-bit little-endian pixels, maybe padded) as uint16."""
+    if raw.dtype == np.uint16:
+        return raw[:, :width]
+    return raw.view("<u2")[:, :width]
+
+
+def crop(raw: np.ndarray, roi: Optional[Sequence[float]]) -> np.ndarray:
+    """Crop to a fractional ``[x, y, width, height]`` ROI on whole 2x2 cells, so the Bayer order is kept."""
+    if not roi:
+        return raw
+    height, width = raw.shape
+    x, y = int(roi[0] * width) // 2 * 2, int(roi[1] * height) // 2 * 2
+    w, h = int(roi[2] * width) // 2 * 2, int(roi[3] * height) // 2 * 2
+    return raw[y:y + h, x:x + w]
+
+
+def _cells(raw: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    height, width = raw.shape[0] // 2 * 2, raw.shape[1] // 2 * 2
+    raw = raw[:height, :width]
+    return raw[0::2, 0::2], raw[0::2, 1::2], raw[1::2, 0::2], raw[1::2, 1::2]
+
+
+def superpixel(raw: np.ndarray) -> np.ndarray:
+    """Sum each 2x2 cell; fits uint16 for raw data of up to 14 bits."""
+    a, b, c, d = _cells(raw)
+    out = a.astype(np.uint16)
+    out += b
+    out += c
+    out += d
+    return out
+
+
+def green(raw: np.ndarray, order: str) -> np.ndarray:
+    """Sum the two green pixels of each 2x2 cell."""
+    a, b, c, d = _cells(raw)
+    g1, g2 = (b, c) if order in ("RGGB", "BGGR") else (a, d)
+    out = g1.astype(np.uint16)
+    out += g2
+    return out
+
+
+def extract(raw: np.ndarray, fmt: str, width: int, method: str = "superpixel",
+            roi: Optional[Sequence[float]] = None) -> Tuple[np.ndarray, float, int]:
+    """Turn a raw buffer into the frame for star detection.
+
+    Returns ``(frame, saturation, factor)``: the uint16 frame, the value a
+    saturated pixel has in it, and how many raw pixels one frame pixel spans.
+    """
+    data = crop(unpack(raw, width), roi)
+    white = float((1 << bit_depth(fmt)) - 1)
+    order = bayer_order(fmt)
+    if order is None:
+        return data, white, 1
+    if method == "green":
+        return green(data, order), 2 * white, 2
+    return superpixel(data), 4 * white, 2
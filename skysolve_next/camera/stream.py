@@ -0,0 +1,107 @@
+"""
+Continuous capture from Picamera2's buffer ring.
+
+With a video configuration the sensor free-runs and completed requests queue
+up in a ring of ``camera.buffer_count`` buffers. ``FrameStream`` drains that
+ring on its own thread with ``capture_request()``: each request's metadata
+is checked against the pending control change, its streams are copied out
+and the buffer is released right away, and the result replaces the previous
+frame. The capture stage then takes the freshest frame without waiting for an
+exposure, while the next exposure overlaps with solving.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from skysolve_next.camera.controls import CameraControlManager
+from skysolve_next.core.logging_config import get_logger
+
+
+@dataclass
+class StreamFrame:
+    """One completed request, copied out of the camera's buffers."""
+    seq: int
+    arrays: Dict[str, np.ndarray]
+    metadata: Dict[str, Any]
+    captured_at: float
+
+
+class FrameStream:
+    """Keeps the most recent accepted frame from a running Picamera2."""
+
+    def __init__(self, picam, controls: CameraControlManager, names: Sequence[str] = ("main",)) -> None:
+        self.picam = picam
+        self.controls = controls
+        self.names = tuple(names)
+        self.logger = get_logger("camera_stream", "camera")
+        self._cond = threading.Condition()
+        self._latest: Optional[StreamFrame] = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._seq = 0
+        self._taken = 0  # seq of the last frame handed out
+        self.overwritten = 0  # frames replaced before anyone took them
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="camera-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def latest(self, after: int = 0, timeout: Optional[float] = None) -> Optional[StreamFrame]:
+        """Return the newest frame with ``seq > after``, waiting for one if needed; None on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: (self._latest is not None and self._latest.seq > after)
+                                       or not self._running, timeout):
+                return None
+            if self._latest is None or self._latest.seq <= after:
+                return None
+            self._taken = max(self._taken, self._latest.seq)
+            return self._latest
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {"frames": self._seq, "overwritten": self.overwritten, "last_error": self.last_error}
+
+    def _run(self) -> None:
+        while self._running:
+            try:
+                frame = self._next()
+            except Exception as e:
+                self.last_error = f"Camera stream failed: {e}"
+                self.logger.error(self.last_error)
+                time.sleep(0.5)
+                continue
+            if frame is None:
+                continue
+            with self._cond:
+                if self._latest is not None and self._latest.seq > self._taken:
+                    self.overwritten += 1
+                self._seq += 1
+                frame.seq = self._seq
+                self._latest = frame
+                self.last_error = None
+                self._cond.notify_all()
+
+    def _next(self) -> Optional[StreamFrame]:
+        request = self.picam.capture_request()
+        try:
+            metadata = request.get_metadata()
+            if not self.controls.accept(metadata):
+                return None  # exposed with the previous controls
+            arrays = {name: request.make_array(name) for name in self.names}
+        finally:
+            # Hand the buffer back to the ring before doing anything else with the frame
+            request.release()
+        return StreamFrame(0, arrays, metadata, time.time())
@@ -1,90 +1,360 @@
 from pydantic_settings import BaseSettings
-from pydantic import Field, validator
-from typing import Literal
+from pydantic import Field, PrivateAttr, ValidationError, validator
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
 import os
 import json
+import select
+import struct
+import sys
+import threading
+import time
 
-class SolverSettings(BaseSettings):
+try:
+    import ctypes
+    import ctypes.util
+    _libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+    _libc.inotify_init1, _libc.inotify_add_watch
+    INOTIFY_AVAILABLE = sys.platform.startswith("linux")
+except (ImportError, OSError, AttributeError):
+    INOTIFY_AVAILABLE = False
+
+class _Section(BaseSettings):
+    """A settings model that becomes read-only once it is part of a published snapshot."""
+
+    _frozen: bool = PrivateAttr(default=False)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False) and not name.startswith("_"):
+            raise TypeError(f"Settings snapshots are read-only; can't set {type(self).__name__}.{name}")
+        super().__setattr__(name, value)
+
+    def _freeze(self):
+        for name in type(self).model_fields:
+            value = getattr(self, name)
+            if isinstance(value, _Section):
+                value._freeze()
+        self._frozen = True
+        return self
+
+class SolverSettings(_Section):
     type: str = "astrometry"
     hint_timeout: int = 10
     solve_radius: float = 20.0
     plot: bool = False
+    tetra3_database: str = "default_database"
+    fov_estimate: Optional[float] = None  # Horizontal field of view (deg), narrows Tetra3 search
+    fov_max_error: Optional[float] = None
+    astrometry_backend: str = "solve-field"  # solve-field|engine (indexes kept loaded in-process; needs the "engine" extra)
+    index_dirs: List[str] = Field(default_factory=lambda: ["/usr/local/astrometry/data", "/usr/share/astrometry"])
+    plate_scale: Optional[float] = None  # arcsec/px; derived from camera optics or learned when unset
+    scale_tolerance: float = 0.1  # +/- fraction around the known plate scale
+    speculative: bool = False  # Run hinted and blind astrometry solves concurrently, first solution wins
+    parallel_shards: int = 1  # Split astrometry index files across this many concurrent solve-field processes
 
-class CameraSettings(BaseSettings):
+class CameraSettings(_Section):
     shutter_speed: str = "1"
     iso_speed: str = "1000"
     image_size: str = "1280x960"
+    focal_length_mm: Optional[float] = None
+    pixel_size_um: Optional[float] = None
+    control_tolerance: float = 0.02  # Relative difference allowed between requested and reported exposure/gain
+    max_stale_frames: int = 4  # Frames dropped waiting for new controls before accepting what the sensor reports
+    preview_size: str = "640x480"  # Low-res stream used for the UI preview
+    preview_fps: float = 2.0  # Max preview JPEG encodes per second
+    preview_quality: int = 80  # Preview JPEG quality
+    continuous: bool = True  # Free-running video capture from a buffer ring instead of still requests
+    buffer_count: int = 4  # Buffers in the ring for continuous capture
+    binning: Literal[1, 2, 4] = 1  # Frame is image_size / binning per side, read out in a binned sensor mode
+    roi: Optional[List[float]] = None  # On-chip crop [x, y, width, height] as fractions of the frame
+    auto_binning: bool = False  # Use the coarsest binning whose frames keep at least min_stars stars
+    max_binning: int = 4
+    min_stars: int = 12
+    binning_window: int = 5  # Frames averaged before auto binning changes mode
+    format: Literal["rgb", "raw"] = "rgb"  # raw: solve the sensor's raw stream (Bayer reduced 2x2, mono as is)
+    raw_extraction: Literal["superpixel", "green"] = "superpixel"  # How a Bayer cell becomes one pixel
+    auto_exposure: bool = False  # Steer exposure/gain from star statistics instead of shutter_speed/iso_speed
+    ae_min_exposure_s: float = 0.05
+    ae_max_exposure_s: float = 2.0
+    ae_min_gain: float = 1.0
+    ae_max_gain: float = 16.0
+    ae_target_stars: int = 20  # Stars per frame auto exposure aims for
+    ae_max_background: float = 0.25  # Sky background limit, as a fraction of the white level
+    ae_window: int = 3  # Frames judged together before each adjustment
 
-class OnStepSettings(BaseSettings):
+class PipelineSettings(_Section):
+    solve_workers: int = 1  # Parallel solve threads
+    solve_queue_size: int = 1  # Frames waiting for a solver (oldest dropped when full)
+    publish_queue_size: int = 4
+
+class OnStepSettings(_Section):
     host: str = "localhost"
     port: int = 9998
     enabled: bool = False
+    timeout_s: float = 3.0  # Connect/reply timeout on the persistent connection
+    # sync_then_slew: sync to the solve, then slew back to where the mount was pointing (slew_then_sync: older name)
+    sync_mode: Literal["sync", "sync_then_slew", "slew_then_sync"] = "sync"
+    min_confidence: float = 0.5  # Solves below this confidence are never synced
+    tolerance_arcmin: float = 2.0  # Sync only when the mount is further off than this
+    max_sync_deg: float = 5.0  # Safety limit: larger deltas are not synced automatically
+    min_interval_s: float = 10.0  # Minimum time between syncs
+    slew_timeout_s: float = 120.0
+    slew_poll_s: float = 0.5  # Interval between :D# slew-status polls
+    settle_s: float = 1.0  # Wait after a slew before using solves
+    center_tolerance_arcmin: float = 1.0  # Goto-and-center stops once the solve is this close to the target
+    center_max_iterations: int = 4
+    center_solve_timeout_s: float = 30.0
+
+class LX200Settings(_Section):
+    predict: bool = True  # Answer position queries with the pointing extrapolated to query time
+    tracking: bool = False  # Mount follows the sky; when False, an idle telescope drifts at the sidereal rate
+    history_s: float = 6.0  # Solves used to fit the pointing motion
+    max_extrapolate_s: float = 5.0  # Cap on extrapolating fitted motion past the last solve
+    confidence_half_life_s: float = 10.0
+    idle_timeout_s: float = 120.0  # Close client connections silent for this long (0 disables)
+    max_clients: int = 16
+    trace: bool = False  # Record LX200 traffic to a binary trace (GET /lx200/trace)
 
-class LogRotationSettings(BaseSettings):
+class LogRotationSettings(_Section):
     max_file_size_mb: int = 10
     backup_count: int = 5
 
-class LoggingSettings(BaseSettings):
+class LoggingSettings(_Section):
     level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
     structured: bool = False  # Enable JSON structured logging
     rotation: LogRotationSettings = Field(default_factory=LogRotationSettings)
 
-class Settings(BaseSettings):
+class Settings(_Section):
     mode: str = Field(default="test")  # solve|align|demo|test
     web_port: int = 5001
     lx200_port: int = 5002
     log_level: str = Field(default="INFO")  # Backward compatibility
     solver: SolverSettings = Field(default_factory=SolverSettings)
     camera: CameraSettings = Field(default_factory=CameraSettings)
+    pipeline: PipelineSettings = Field(default_factory=PipelineSettings)
     onstep: OnStepSettings = Field(default_factory=OnStepSettings)
+    lx200: LX200Settings = Field(default_factory=LX200Settings)
     logging: LoggingSettings = Field(default_factory=LoggingSettings)
 
     _config_path = "skysolve_next/settings.json"
     _last_mtime = None
+    _dirty: threading.Event = PrivateAttr(default_factory=threading.Event)
+    _watcher: Optional["SettingsWatcher"] = PrivateAttr(default=None)
+    _loaded: Dict[str, Any] = PrivateAttr(default_factory=dict)  # flattened values last read or saved
+    _snapshot: Optional["Settings"] = PrivateAttr(default=None)  # read-only, replaced as a whole
+    _subscribers: List[Tuple[Tuple[str, ...], Callable]] = PrivateAttr(default_factory=list)
+    _reload_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
 
     def reload_if_changed(self):
+        """Apply settings.json if it changed since the last call.
+
+        A background watcher flags changes to the file, so when nothing
+        changed this is a flag check with no system calls.
+        """
+        if self._watcher is None:
+            self._start_watcher()
+        if not self._dirty.is_set():
+            return
+        self._dirty.clear()
+        self._reload()
+
+    def _start_watcher(self):
+        # Web request threads and the capture stage may get here at the same time; start only one
+        with self._reload_lock:
+            if self._watcher is not None:
+                return
+            watcher = SettingsWatcher(self._config_path, self._dirty.set)
+            watcher.start()
+            self._dirty.set()
+            self._watcher = watcher
+
+    def _reload(self):
         # Import here to avoid circular imports
-        from skysolve_next.core.logging_config import set_log_level
-        
+        from skysolve_next.core.logging_config import get_logger, set_log_level
+
         if not os.path.exists(self._config_path):
-            # Create default settings.json if missing
-            with open(self._config_path, "w") as f:
-                json.dump(self.model_dump(), f, indent=2)
-            self._last_mtime = os.path.getmtime(self._config_path)
+            # Keep the current values; the file is picked up again once it exists
+            get_logger("config", "core").warning(f"{self._config_path} is missing; keeping the current settings")
             return
-        mtime = os.path.getmtime(self._config_path)
-        if self._last_mtime is None or mtime > self._last_mtime:
-            old_log_level = getattr(self.logging, 'level', self.log_level)
-            
+        current = self.snapshot()
+        try:
             with open(self._config_path, "r") as f:
                 data = json.load(f)
-            
-            # Only update known fields
-            for k, v in data.items():
-                if hasattr(self, k):
-                    field = getattr(self, k)
-                    if isinstance(field, BaseSettings) and isinstance(v, dict):
-                        for subk, subv in v.items():
-                            if hasattr(field, subk):
-                                setattr(field, subk, subv)
-                    else:
-                        setattr(self, k, v)
-            
-            # Update log level dynamically if it changed
-            new_log_level = getattr(self.logging, 'level', self.log_level)
-            if old_log_level != new_log_level:
-                set_log_level(new_log_level)
-            
-            self._last_mtime = mtime
-
-    def save(self):
-        """Save current settings to file"""
-        with open(self._config_path, "w") as f:
+            # Only update known fields, on top of the current values
+            merged = _merge(current.model_dump(), data if isinstance(data, dict) else {})
+            snapshot = type(self).model_validate(merged)
+        except (OSError, ValueError, ValidationError) as e:
+            get_logger("config", "core").error(f"Ignoring invalid {self._config_path}: {e}")
+            return
+        old_log_level = getattr(current.logging, 'level', current.log_level)
+        self._apply(snapshot)
+        # Update log level dynamically if it changed
+        new_log_level = getattr(snapshot.logging, 'level', snapshot.log_level)
+        if old_log_level != new_log_level:
+            set_log_level(new_log_level)
+
+    def _apply(self, snapshot: "Settings") -> None:
+        """Publish a validated ``Settings`` as the new snapshot and notify subscribers of what changed."""
+        with self._reload_lock:
+            new_values = _flatten(snapshot.model_dump())
+            changes = {path: (self._loaded.get(path), value) for path, value in new_values.items()
+                       if path not in self._loaded or self._loaded[path] != value}
+            if changes:
+                # Readers hold either the old or the new snapshot, never a mix of both
+                self._snapshot = snapshot._freeze()
+                # The live object keeps its own, editable copy of the sections
+                self._assign(type(self).model_validate(snapshot.model_dump()))
+            self._loaded = new_values
+            subscribers = list(self._subscribers)
+        for prefixes, callback in subscribers:
+            relevant = {path: change for path, change in changes.items()
+                        if any(not p or path == p or path.startswith(p + ".") for p in prefixes)}
+            if relevant:
+                try:
+                    callback(relevant)
+                except Exception as e:
+                    from skysolve_next.core.logging_config import get_logger
+                    get_logger("config", "core").warning(f"Settings subscriber failed: {e}")
+
+    def snapshot(self) -> "Settings":
+        """The settings as last read from (or saved to) the file: validated, read-only, and replaced as a
+        whole on every change. Hot paths read their values from one snapshot."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._reload_lock:
+                if self._snapshot is None:
+                    self._snapshot = self.frozen_copy()
+                snapshot = self._snapshot
+        return snapshot
+
+    def frozen_copy(self) -> "Settings":
+        """A validated, read-only copy of the current values."""
+        return type(self).model_validate(self.model_dump())._freeze()
+
+    def subscribe(self, callback: Callable[[Dict[str, Tuple[Any, Any]]], None], *prefixes: str) -> None:
+        """Call ``callback({path: (old, new)})`` when fields under ``prefixes`` (e.g. "camera") change."""
+        with self._reload_lock:
+            self._subscribers.append((prefixes or ("",), callback))
+
+    def unsubscribe(self, callback) -> None:
+        with self._reload_lock:
+            self._subscribers = [(p, cb) for p, cb in self._subscribers if cb is not callback]
+
+    def _assign(self, values: "Settings") -> None:
+        for name in type(self).model_fields:
+            setattr(self, name, getattr(values, name))
+
+    def save(self, values: Optional["Settings"] = None):
+        """Save current settings (or validated ``values``, which become the current ones) to file"""
+        if values is not None:
+            self._assign(values)
+        tmp_path = self._config_path + ".tmp"
+        with open(tmp_path, "w") as f:
             json.dump(self.model_dump(), f, indent=2)
-        self._last_mtime = os.path.getmtime(self._config_path)
+        os.replace(tmp_path, self._config_path)
+        self._apply(type(self).model_validate(self.model_dump()))
 
     class Config:
         env_prefix = "SKYSOLVE_"
         case_sensitive = False
 
+
+def _merge(current: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(current)
+    for k, v in data.items():
+        if k not in current:
+            continue
+        if isinstance(current[k], dict) and isinstance(v, dict):
+            merged[k] = _merge(current[k], v)
+        else:
+            merged[k] = v
+    return merged
+
+
+def _flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    flat = {}
+    for k, v in data.items():
+        if isinstance(v, dict):
+            flat.update(_flatten(v, f"{prefix}{k}."))
+        else:
+            flat[f"{prefix}{k}"] = v
+    return flat
+
+
+# inotify(7) constants
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_CLOEXEC = 0o2000000
+_IN_NONBLOCK = 0o4000
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class SettingsWatcher:
+    """Calls ``on_change`` from a background thread whenever the settings file changes.
+
+    Uses inotify on the file's directory (so atomic replaces are seen) and
+    falls back to polling the file's stat once per ``poll_interval``.
+    """
+
+    def __init__(self, path: str, on_change: Callable[[], None], poll_interval: float = 1.0) -> None:
+        self.path = path
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="settings-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        if INOTIFY_AVAILABLE and self._watch_inotify():
+            return
+        self._watch_poll()
+
+    def _watch_inotify(self) -> bool:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        name = os.path.basename(self.path).encode()
+        fd = _libc.inotify_init1(_IN_CLOEXEC | _IN_NONBLOCK)
+        if fd < 0:
+            return False
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_MOVED_FROM | _IN_CREATE | _IN_DELETE
+        if _libc.inotify_add_watch(fd, directory.encode(), mask) < 0:
+            os.close(fd)
+            return False
+        try:
+            while True:
+                select.select([fd], [], [])
+                try:
+                    data = os.read(fd, 4096)
+                except BlockingIOError:
+                    continue
+                offset, changed = 0, False
+                while offset + _INOTIFY_EVENT.size <= len(data):
+                    _, _, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                    offset += _INOTIFY_EVENT.size
+                    if data[offset:offset + length].rstrip(b"\0") == name:
+                        changed = True
+                    offset += length
+                if changed:
+                    self.on_change()
+        finally:
+            os.close(fd)
+
+    def _watch_poll(self) -> None:
+        last = None
+        while True:
+            try:
+                st = os.stat(self.path)
+                current = (st.st_mtime_ns, st.st_size, st.st_ino)
+            except OSError:
+                current = None
+            if current != last:
+                last = current
+                self.on_change()
+            time.sleep(self.poll_interval)
+
+
 settings = Settings()
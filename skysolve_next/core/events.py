@@ -0,0 +1,245 @@
+"""
+Event bus from the solve worker to the web process.
+
+The worker sends each event (new solve, status change, error) as one JSON
+datagram on a Unix domain socket that the web process binds. Sending never
+blocks, so the worker is never slowed down by the UI: if the web process
+isn't listening the event is dropped, and if its receive queue is full the
+latest event of each type is held back and retried on the next publish.
+
+In the web process, ``EventHub`` fans events out to WebSocket clients. Each
+client keeps only the latest pending event per type, so a slow client
+receives coalesced updates instead of an ever-growing backlog.
+
+Commands travel the other way (web to worker) in the same format on a
+second socket, which the worker reads with ``CommandListener``.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from skysolve_next.core.logging_config import get_logger
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "skysolve_next_events.sock")
+COMMAND_SOCKET = os.path.join(tempfile.gettempdir(), "skysolve_next_commands.sock")
+MAX_DATAGRAM = 65536
+
+
+class EventPublisher:
+    """Non-blocking sender of events to the web process."""
+
+    def __init__(self, path: str = DEFAULT_SOCKET) -> None:
+        self.path = path
+        self.dropped = 0
+        self._sock: Optional[socket.socket] = None
+        self._backlog: Dict[str, bytes] = {}  # latest unsent event per type
+        self._lock = threading.Lock()
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> bool:
+        """Send one event; returns False if it was dropped or held back."""
+        payload = json.dumps({"type": event_type, "ts": time.time(), "data": data},
+                             separators=(",", ":"), default=str).encode("utf-8")
+        if len(payload) > MAX_DATAGRAM:
+            self.dropped += 1
+            return False
+        with self._lock:
+            if event_type in self._backlog:
+                self.dropped += 1  # superseded before it could be sent
+            self._backlog.pop(event_type, None)
+            self._backlog[event_type] = payload
+            return self._flush()
+
+    def flush(self) -> bool:
+        """Retry held-back events; returns True if nothing is left pending."""
+        with self._lock:
+            return self._flush()
+
+    def _flush(self) -> bool:
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+        while self._backlog:
+            event_type, payload = next(iter(self._backlog.items()))
+            try:
+                self._sock.sendto(payload, self.path)
+            except BlockingIOError:
+                return False  # receiver's queue is full; keep for the next publish
+            except OSError:
+                # Nobody listening: the web process will start from the shared status
+                self.dropped += len(self._backlog)
+                self._backlog.clear()
+                return False
+            del self._backlog[event_type]
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+
+class EventSubscription:
+    """Pending events for one client, coalesced to the latest per type."""
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+        self.coalesced = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        if event.get("type") in self._pending:
+            self.coalesced += 1
+        self._pending[event.get("type")] = event
+        self._ready.set()
+
+    async def next(self) -> List[Dict[str, Any]]:
+        """Wait for and return all pending events, oldest first."""
+        await self._ready.wait()
+        self._ready.clear()
+        events = sorted(self._pending.values(), key=lambda e: e.get("ts", 0.0))
+        self._pending.clear()
+        return events
+
+
+class EventHub:
+    """Receives worker events on the Unix socket and fans them out to subscribers."""
+
+    def __init__(self, path: str = DEFAULT_SOCKET) -> None:
+        self.path = path
+        self.logger = get_logger("events", "web")
+        self._subscribers: Set[EventSubscription] = set()
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def started(self) -> bool:
+        return self._sock is not None
+
+    async def start(self) -> None:
+        """Bind the socket and start reading (idempotent)."""
+        if self._sock is not None:
+            return
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            if os.path.exists(self.path):
+                os.unlink(self.path)  # left over from a previous web process
+            sock.bind(self.path)
+        except OSError as e:
+            sock.close()
+            self.logger.warning(f"Event bus unavailable on {self.path}: {e}")
+            return
+        sock.setblocking(False)
+        self._sock = sock
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+        self.logger.info(f"Listening for worker events on {self.path}")
+
+    def stop(self) -> None:
+        if self._sock is None:
+            return
+        if self._loop is not None:
+            self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def _on_readable(self) -> None:
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                self.logger.warning(f"Event socket error: {e}")
+                return
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+            self.dispatch(event)
+
+    def dispatch(self, event: Dict[str, Any]) -> None:
+        for subscription in list(self._subscribers):
+            subscription.offer(event)
+
+    def subscribe(self) -> EventSubscription:
+        subscription = EventSubscription()
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription) -> None:
+        self._subscribers.discard(subscription)
+
+
+class CommandListener:
+    """Receives commands on a Unix datagram socket and runs their handlers on a background thread."""
+
+    def __init__(self, path: str = COMMAND_SOCKET) -> None:
+        self.path = path
+        self.logger = get_logger("commands", "worker")
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def on(self, command: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        self._handlers[command] = handler
+
+    def start(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # left over from a previous worker
+        sock.bind(self.path)
+        sock.settimeout(0.5)
+        self._sock = sock
+        self._thread = threading.Thread(target=self._run, name="commands", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Listening for commands on {self.path}")
+
+    def stop(self) -> None:
+        sock, self._sock = self._sock, None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if sock is not None:
+            sock.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def _run(self) -> None:
+        while True:
+            sock = self._sock
+            if sock is None:
+                return
+            try:
+                data = sock.recv(MAX_DATAGRAM)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            try:
+                command = json.loads(data)
+            except ValueError:
+                continue
+            handler = self._handlers.get(command.get("type"))
+            if handler is None:
+                self.logger.warning(f"Unknown command {command.get('type')!r}")
+                continue
+            try:
+                handler(command.get("data") or {})
+            except Exception as e:
+                self.logger.error(f"Command {command.get('type')!r} failed: {e}")
+
+
+# Process-wide publisher (worker and web /solve)
+event_publisher = EventPublisher()
@@ -0,0 +1,137 @@
+"""
+Latency metrics for SkySolve Next.
+
+Every stage of a fix (capture, star extraction, each solver phase, status
+write, publish) records its duration into a fixed-size ring buffer, so the
+cost of recording is constant and memory is bounded. Snapshots report
+p50/p90/p99 over the most recent samples plus cumulative count/sum, and can
+be rendered as Prometheus text.
+
+The worker and web app are separate processes: the worker periodically
+writes its snapshot to ``METRICS_PATH`` (in ``/dev/shm``, like the shared
+status, so it never touches the SD card) and the web app merges it with its
+own registry when serving ``/metrics``.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+
+METRICS_PATH = os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+                            "skysolve_next_metrics.json")
+DEFAULT_WINDOW = 512
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LatencyHistogram:
+    """Ring buffer of the last ``window`` durations (seconds) with cumulative totals."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._samples = np.zeros(window, dtype=np.float64)
+        self._next = 0
+        self._filled = 0
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples[self._next] = seconds
+            self._next = (self._next + 1) % len(self._samples)
+            self._filled = min(self._filled + 1, len(self._samples))
+            self.count += 1
+            self.total += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            window = self._samples[: self._filled].copy()
+            count, total = self.count, self.total
+        snap: Dict[str, Any] = {"count": count, "sum": round(total, 6), "window": int(window.size)}
+        if window.size:
+            values = np.quantile(window, QUANTILES)
+            snap.update({f"p{int(q * 100)}": round(float(v), 6) for q, v in zip(QUANTILES, values)})
+            snap["max"] = round(float(window.max()), 6)
+        return snap
+
+
+class MetricsRegistry:
+    """Named latency histograms for one process."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self.window = window
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram(self.window))
+        return histogram
+
+    def observe(self, name: str, seconds: float) -> None:
+        self.histogram(name).observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Record the duration of the ``with`` block under ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histogram.snapshot() for name, histogram in sorted(histograms.items())}
+
+    def write(self, path: str = METRICS_PATH, min_interval: float = 1.0) -> None:
+        """Persist the snapshot for other processes, at most once per ``min_interval`` seconds."""
+        now = time.time()
+        if now - self._last_write < min_interval:
+            return
+        self._last_write = now
+        data = {"timestamp": now, "stages": self.snapshot()}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+def read_metrics(path: str = METRICS_PATH) -> Optional[Dict[str, Any]]:
+    """Load a snapshot written by another process, or None if unavailable."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def to_prometheus(stages: Dict[str, Dict[str, Any]], process: str) -> str:
+    """Render stage snapshots as a Prometheus ``summary`` metric."""
+    lines = []
+    for stage, snap in stages.items():
+        labels = f'process="{process}",stage="{stage}"'
+        for q in QUANTILES:
+            value = snap.get(f"p{int(q * 100)}")
+            if value is not None:
+                lines.append(f'skysolve_stage_seconds{{{labels},quantile="{q}"}} {value}')
+        lines.append(f"skysolve_stage_seconds_sum{{{labels}}} {snap['sum']}")
+        lines.append(f"skysolve_stage_seconds_count{{{labels}}} {snap['count']}")
+    return "\n".join(lines)
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Union
+from typing import Optional, Union
 
 @dataclass
 class SolveResult:
@@ -8,3 +8,4 @@ class SolveResult:
     roll_deg: float
     plate_scale_arcsec_px: float
     confidence: Union[float, str]
+    matched_stars: Optional[int] = None  # field stars matched to the catalog, if known
@@ -0,0 +1,289 @@
+"""
+Shared-memory worker status.
+
+The worker publishes its latest status (pointing, confidence, mode, error)
+into a small fixed-layout region of an mmap'd file in ``/dev/shm``, and the
+web process reads it without opening, stat'ing or parsing anything.
+
+Consistency uses a seqlock: a writer makes the sequence number odd, writes
+the body, then makes it even again; a reader copies the body and retries if
+the sequence was odd or changed meanwhile. Writers in different processes
+(worker, web ``/solve``) serialize on an advisory file lock. Pipeline and
+solver statistics, which are free-form, travel as a JSON blob whose parsed
+value the reader caches until the blob changes.
+
+The UI preview JPEG travels the same way in a second region
+(``SharedPreview``), so ``/solve/image.jpg`` is served from memory.
+"""
+
+import fcntl
+import json
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+MAGIC = b"SKSS"
+VERSION = 1
+# magic, version, seq
+_HEADER = struct.Struct("<4sIQ")
+# written_at, solved_at, ra, dec, roll, scale, confidence, matched_stars, mode, error, stats_seq, stats_len
+_BODY = struct.Struct("<7di16s256sQI")
+STATS_SIZE = 8192
+_SEQ_OFFSET = 8
+_BODY_OFFSET = _HEADER.size
+_STATS_OFFSET = _BODY_OFFSET + _BODY.size
+SIZE = _STATS_OFFSET + STATS_SIZE
+
+_SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+DEFAULT_PATH = os.path.join(_SHM_DIR, "skysolve_next_status")
+PREVIEW_PATH = os.path.join(_SHM_DIR, "skysolve_next_preview")
+
+# written_at, jpeg_len
+_PREVIEW_BODY = struct.Struct("<dI")
+PREVIEW_CAPACITY = 1024 * 1024
+_PREVIEW_DATA_OFFSET = _HEADER.size + _PREVIEW_BODY.size
+PREVIEW_SIZE = _PREVIEW_DATA_OFFSET + PREVIEW_CAPACITY
+
+_NAN = float("nan")
+
+
+def _f(value) -> float:
+    try:
+        return float(value) if value is not None else _NAN
+    except (TypeError, ValueError):
+        return _NAN
+
+
+def _opt(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+def _text(value: Optional[str], size: int) -> bytes:
+    return (value or "").encode("utf-8")[:size]
+
+
+class SharedStatus:
+    """Seqlock-protected status region shared between the worker and the web app."""
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        self.path = path
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._stats_cache = (None, None)  # (stats_seq, parsed stats)
+
+    # --- mapping -------------------------------------------------------
+
+    def _open(self, create: bool) -> bool:
+        if self._map is not None:
+            return True
+        flags = os.O_RDWR | (os.O_CREAT if create else 0)
+        try:
+            fd = os.open(self.path, flags, 0o644)
+        except OSError:
+            return False
+        try:
+            if os.fstat(fd).st_size < SIZE:
+                if not create:
+                    os.close(fd)
+                    return False
+                os.ftruncate(fd, SIZE)
+            mapping = mmap.mmap(fd, SIZE)
+        except OSError:
+            os.close(fd)
+            return False
+        if create and mapping[:4] != MAGIC:
+            mapping[:_HEADER.size] = _HEADER.pack(MAGIC, VERSION, 0)
+        self._fd, self._map = fd, mapping
+        return True
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+            self._map = self._fd = None
+
+    # --- writer --------------------------------------------------------
+
+    def publish(self, mode: str, result=None, error: Optional[str] = None,
+                stats: Optional[Dict[str, Any]] = None) -> None:
+        """Publish the status for one frame.
+
+        The pointing is only replaced by a solve-mode result with RA/Dec;
+        otherwise the last good pointing is kept, as in worker_status.json.
+        ``stats`` (pipeline/solver statistics) replaces the stored blob when given.
+        """
+        if not self._open(create=True):
+            return
+        m = self._map
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            magic, version, seq = _HEADER.unpack_from(m, 0)
+            if magic != MAGIC or version != VERSION:
+                m[:_HEADER.size] = _HEADER.pack(MAGIC, VERSION, 0)
+                seq = 0
+                body = (0.0, 0.0, _NAN, _NAN, _NAN, _NAN, _NAN, -1, b"", b"", 0, 0)
+            else:
+                body = _BODY.unpack_from(m, _BODY_OFFSET)
+            (_, solved_at, ra, dec, roll, scale, conf, matched, _, _, stats_seq, stats_len) = body
+
+            now = time.time()
+            if mode == "solve" and result is not None and result.ra_deg is not None and result.dec_deg is not None:
+                solved_at = now
+                ra, dec = _f(result.ra_deg), _f(result.dec_deg)
+                roll, scale = _f(result.roll_deg), _f(result.plate_scale_arcsec_px)
+                conf = _f(result.confidence) if result.confidence not in (None, 0.0) else _NAN
+                matched = result.matched_stars if getattr(result, "matched_stars", None) is not None else -1
+
+            blob = None
+            if stats is not None:
+                blob = json.dumps(stats, separators=(",", ":")).encode("utf-8")
+                if len(blob) > STATS_SIZE:
+                    blob = b"{}"
+                stats_seq, stats_len = stats_seq + 1, len(blob)
+
+            struct.pack_into("<Q", m, _SEQ_OFFSET, seq + 1)  # odd: write in progress
+            _BODY.pack_into(m, _BODY_OFFSET, now, solved_at, ra, dec, roll, scale, conf, matched,
+                            _text(mode, 16), _text(error, 256), stats_seq, stats_len)
+            if blob is not None:
+                m[_STATS_OFFSET:_STATS_OFFSET + len(blob)] = blob
+            struct.pack_into("<Q", m, _SEQ_OFFSET, seq + 2)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    # --- reader --------------------------------------------------------
+
+    def read(self, retries: int = 100) -> Optional[Dict[str, Any]]:
+        """Return the latest status dict, or None if no worker has published one."""
+        if not self._open(create=False):
+            return None
+        m = self._map
+        for _ in range(retries):
+            magic, version, seq = _HEADER.unpack_from(m, 0)
+            if magic != MAGIC or version != VERSION:
+                return None
+            if seq == 0:
+                return None
+            if seq & 1:
+                continue
+            body = _BODY.unpack_from(m, _BODY_OFFSET)
+            stats_seq, stats_len = body[10], body[11]
+            cached_seq, stats = self._stats_cache
+            blob = None if cached_seq == stats_seq else m[_STATS_OFFSET:_STATS_OFFSET + stats_len]
+            if _HEADER.unpack_from(m, 0)[2] != seq:
+                continue
+            if blob is not None:
+                try:
+                    stats = json.loads(blob) if blob else {}
+                except ValueError:
+                    stats = {}
+                self._stats_cache = (stats_seq, stats)
+            return self._to_status(body, stats or {})
+        return None
+
+    @staticmethod
+    def _to_status(body, stats: Dict[str, Any]) -> Dict[str, Any]:
+        written_at, solved_at, ra, dec, roll, scale, conf, matched, mode, error, _, _ = body
+        solved = solved_at > 0
+        status = {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(solved_at)) if solved else None,
+            "mode": mode.rstrip(b"\0").decode("utf-8", "replace"),
+            "ra": _opt(ra),
+            "dec": _opt(dec),
+            "roll": _opt(roll),
+            "plate_scale": _opt(scale),
+            "confidence": (conf if not math.isnan(conf) else "-") if solved else None,
+            "matched_stars": matched if matched >= 0 else None,
+            "error": error.rstrip(b"\0").decode("utf-8", "replace") or None,
+            "updated_at": written_at,
+        }
+        status.update(stats)
+        return status
+
+
+class SharedPreview:
+    """Seqlock-protected region holding the latest preview JPEG."""
+
+    def __init__(self, path: str = PREVIEW_PATH) -> None:
+        self.path = path
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._cache = (None, None)  # (seq, (jpeg, written_at))
+
+    def _open(self, create: bool) -> bool:
+        if self._map is not None:
+            return True
+        flags = os.O_RDWR | (os.O_CREAT if create else 0)
+        try:
+            fd = os.open(self.path, flags, 0o644)
+        except OSError:
+            return False
+        try:
+            if os.fstat(fd).st_size < PREVIEW_SIZE:
+                if not create:
+                    os.close(fd)
+                    return False
+                os.ftruncate(fd, PREVIEW_SIZE)
+            mapping = mmap.mmap(fd, PREVIEW_SIZE)
+        except OSError:
+            os.close(fd)
+            return False
+        if create and mapping[:4] != MAGIC:
+            mapping[:_HEADER.size] = _HEADER.pack(MAGIC, VERSION, 0)
+        self._fd, self._map = fd, mapping
+        return True
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+            self._map = self._fd = None
+
+    def publish(self, jpeg: bytes) -> bool:
+        """Store a preview JPEG; returns False if it doesn't fit or shm is unavailable."""
+        if len(jpeg) > PREVIEW_CAPACITY or not self._open(create=True):
+            return False
+        m = self._map
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            magic, version, seq = _HEADER.unpack_from(m, 0)
+            if magic != MAGIC or version != VERSION:
+                m[:_HEADER.size] = _HEADER.pack(MAGIC, VERSION, 0)
+                seq = 0
+            struct.pack_into("<Q", m, _SEQ_OFFSET, seq + 1)
+            _PREVIEW_BODY.pack_into(m, _HEADER.size, time.time(), len(jpeg))
+            m[_PREVIEW_DATA_OFFSET:_PREVIEW_DATA_OFFSET + len(jpeg)] = jpeg
+            struct.pack_into("<Q", m, _SEQ_OFFSET, seq + 2)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        return True
+
+    def read(self, retries: int = 100) -> Optional[Tuple[bytes, float]]:
+        """Return (jpeg, written_at) of the latest preview, or None if there is none."""
+        if not self._open(create=False):
+            return None
+        m = self._map
+        for _ in range(retries):
+            magic, version, seq = _HEADER.unpack_from(m, 0)
+            if magic != MAGIC or version != VERSION or seq == 0:
+                return None
+            if seq & 1:
+                continue
+            cached_seq, cached = self._cache
+            if cached_seq == seq:
+                return cached
+            written_at, length = _PREVIEW_BODY.unpack_from(m, _HEADER.size)
+            jpeg = m[_PREVIEW_DATA_OFFSET:_PREVIEW_DATA_OFFSET + min(length, PREVIEW_CAPACITY)]
+            if _HEADER.unpack_from(m, 0)[2] != seq:
+                continue
+            self._cache = (seq, (jpeg, written_at))
+            return jpeg, written_at
+        return None
+
+
+# Process-wide handles on the default regions
+shared_status = SharedStatus()
+shared_preview = SharedPreview()
@@ -0,0 +1,178 @@
+"""
+Closed-loop goto-and-center for OnStep mounts.
+
+``GotoCenter`` runs on its own thread while the solve pipeline keeps
+running: it slews to the target, polls ``:D#`` until the slew is done,
+waits for a solve of a frame captured after the mount settled, and measures
+the residual. If the target isn't within ``onstep.center_tolerance_arcmin``
+it syncs the mount to the solve and slews again, up to
+``onstep.center_max_iterations`` times. Every step is reported to a
+listener (progress events) and the run can be cancelled at any point, which
+stops the mount with ``:Q#``.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from skysolve_next.core.config import settings
+from skysolve_next.core.logging_config import get_logger
+from skysolve_next.core.metrics import metrics
+from skysolve_next.core.models import SolveResult
+from skysolve_next.mounts.onstep.lx200 import OnStepClient, OnStepError
+from skysolve_next.mounts.onstep.sync import angular_separation
+
+STATE_IDLE = "idle"
+STATE_SLEWING = "slewing"
+STATE_SOLVING = "solving"
+STATE_SYNCING = "syncing"
+STATE_CENTERED = "centered"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class LatestSolve:
+    """Most recent good solve from the pipeline, which tasks can wait on."""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._solve: Optional[Tuple[SolveResult, float]] = None
+
+    def update(self, result: SolveResult, captured_at: Optional[float]) -> None:
+        if result is None or result.ra_deg is None or result.dec_deg is None:
+            return
+        with self._cond:
+            self._solve = (result, captured_at or time.time())
+            self._cond.notify_all()
+
+    def wait_after(self, t: float, timeout: float, cancelled: threading.Event) -> Optional[Tuple[SolveResult, float]]:
+        """Wait for a solve of a frame captured after ``t``; None on timeout or cancellation."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._solve is None or self._solve[1] <= t:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or cancelled.is_set():
+                    return None
+                # Wake up regularly to notice cancellation
+                self._cond.wait(min(remaining, 0.25))
+            return self._solve
+
+
+class GotoCenter:
+    """Slew to a target and iterate solve/sync/slew until it is centered."""
+
+    def __init__(self, client: OnStepClient, solves: LatestSolve,
+                 listener: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+        self.client = client
+        self.solves = solves
+        self.listener = listener
+        self.logger = get_logger("onstep_goto", "mount")
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {"state": STATE_IDLE}
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, ra_deg: float, dec_deg: float) -> bool:
+        """Start centering on RA/Dec; returns False if a run is already in progress."""
+        with self._lock:
+            if self.active:
+                return False
+            self._cancel.clear()
+            self._state = {"state": STATE_SLEWING, "target_ra": ra_deg, "target_dec": dec_deg, "iteration": 0,
+                           "residuals_arcmin": [], "started_at": time.time(), "elapsed_s": 0.0, "error": None}
+            self._thread = threading.Thread(target=self._run, args=(ra_deg, dec_deg), name="onstep-goto", daemon=True)
+            self._thread.start()
+        return True
+
+    def cancel(self) -> bool:
+        """Cancel the running goto; returns False if none was running."""
+        if not self.active:
+            return False
+        self._cancel.set()
+        return True
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = dict(self._state)
+            state["residuals_arcmin"] = list(state.get("residuals_arcmin", []))
+            return state
+
+    def _update(self, **changes) -> None:
+        with self._lock:
+            self._state.update(changes)
+            self._state["elapsed_s"] = round(time.time() - self._state.get("started_at", time.time()), 3)
+            state = dict(self._state)
+        if self.listener is not None:
+            try:
+                self.listener(state)
+            except Exception as e:
+                self.logger.warning(f"Goto listener failed: {e}")
+
+    def _check_cancel(self) -> None:
+        if self._cancel.is_set():
+            raise _Cancelled()
+
+    def _run(self, ra_deg: float, dec_deg: float) -> None:
+        cfg = settings.onstep
+        start = time.monotonic()
+        residuals: List[float] = []
+        self.logger.info(f"Goto-and-center to RA={ra_deg:.5f}, Dec={dec_deg:.5f}")
+        try:
+            for iteration in range(1, cfg.center_max_iterations + 1):
+                self._update(state=STATE_SLEWING, iteration=iteration)
+                with metrics.timer("goto_slew"):
+                    self.client.goto(ra_deg, dec_deg)
+                    if not self.client.wait_for_slew(cfg.slew_timeout_s, cfg.slew_poll_s, self._cancel):
+                        self._check_cancel()
+                        raise OnStepError(f"Slew did not finish within {cfg.slew_timeout_s:.0f} s")
+                if self._cancel.wait(cfg.settle_s):
+                    raise _Cancelled()
+
+                self._update(state=STATE_SOLVING)
+                settled_at = time.time()
+                solve = self.solves.wait_after(settled_at, cfg.center_solve_timeout_s, self._cancel)
+                self._check_cancel()
+                if solve is None:
+                    raise OnStepError(f"No solve within {cfg.center_solve_timeout_s:.0f} s after the slew")
+                result = solve[0]
+                residual = angular_separation(ra_deg, dec_deg, result.ra_deg, result.dec_deg) * 60.0
+                residuals.append(round(residual, 3))
+                self._update(residuals_arcmin=list(residuals), last_ra=result.ra_deg, last_dec=result.dec_deg)
+                self.logger.info(f"Goto iteration {iteration}: residual {residual:.2f}'")
+                if residual <= cfg.center_tolerance_arcmin:
+                    elapsed = time.monotonic() - start
+                    metrics.observe("goto_center", elapsed)
+                    self._update(state=STATE_CENTERED, time_to_center_s=round(elapsed, 3))
+                    return
+
+                # Teach the mount where it really points, then slew again
+                self._update(state=STATE_SYNCING)
+                self.client.sync_pointing(result)
+            raise OnStepError(f"Not centered after {cfg.center_max_iterations} iterations "
+                              f"(residual {residuals[-1]:.2f}')")
+        except _Cancelled:
+            self._stop_mount()
+            self.logger.info("Goto-and-center cancelled")
+            self._update(state=STATE_CANCELLED)
+        except OnStepError as e:
+            self._stop_mount()
+            self.logger.error(f"Goto-and-center failed: {e}")
+            self._update(state=STATE_FAILED, error=str(e))
+
+    def _stop_mount(self) -> None:
+        try:
+            self.client.abort()
+        except OnStepError as e:
+            self.logger.warning(f"Could not stop the mount: {e}")
@@ -1,35 +1,219 @@
+import re
+import select
 import socket
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
 from skysolve_next.core.config import settings
 from skysolve_next.core.models import SolveResult
 from skysolve_next.core.logging_config import get_logger
+from skysolve_next.core.metrics import metrics
+
+# Reply formats of the LX200 commands we send
+REPLY_NONE = "none"  # no reply
+REPLY_BOOL = "bool"  # single '0'/'1' (:Sr, :Sd)
+REPLY_STRING = "string"  # '#'-terminated (:CM#)
+REPLY_GOTO = "goto"  # '0' on success, else an error digit optionally followed by a '#'-terminated message (:MS#)
+
+
+class OnStepError(Exception):
+    """The mount rejected a command or its reply couldn't be read."""
+
+
+_SEXAGESIMAL = re.compile(r"^\s*([+-]?)(\d+)\D(\d+(?:\.\d+)?)(?:\D(\d+(?:\.\d+)?))?\s*$")
+
+
+def _parse_sexagesimal(text: str) -> float:
+    m = _SEXAGESIMAL.match(text)
+    if not m:
+        raise OnStepError(f"Unparseable coordinate {text!r}")
+    sign, a, b, c = m.groups()
+    value = int(a) + float(b) / 60.0 + (float(c) / 3600.0 if c else 0.0)
+    return -value if sign == "-" else value
+
+
+def parse_ra(text: str) -> float:
+    """RA in degrees from ``HH:MM:SS`` or low-precision ``HH:MM.T``."""
+    return _parse_sexagesimal(text) * 15.0
+
+
+def parse_dec(text: str) -> float:
+    """Dec in degrees from ``sDD*MM:SS``, ``sDD*MM'SS`` or low-precision ``sDD*MM``."""
+    return _parse_sexagesimal(text)
+
 
 class OnStepClient:
-    def __init__(self, host: str | None = None, port: int | None = None) -> None:
+    """LX200 client for an OnStep mount over one persistent TCP connection.
+
+    Commands are serialized by a lock, a command sequence goes out in a single
+    ``sendall`` and each reply is read and validated. The connection is
+    reopened on demand after an error, retrying once if a reused connection
+    turned out to be dead.
+    """
+
+    def __init__(self, host: str | None = None, port: int | None = None, timeout: float | None = None) -> None:
         self.host = host or settings.onstep.host
         self.port = port or settings.onstep.port
+        self.timeout = timeout or settings.onstep.timeout_s
         self.logger = get_logger("onstep_client", "mount")
+        self._sock: Optional[socket.socket] = None
+        self._buf = b""
+        self._lock = threading.Lock()
+        self.connects = 0
+
+    # --- connection ----------------------------------------------------
+
+    def _connect(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock, self._buf = sock, b""
+        self.connects += 1
+        self.logger.debug(f"Connected to OnStep at {self.host}:{self.port}")
+        return sock
 
-    def _send(self, cmd: str) -> None:
-        with socket.create_connection((self.host, self.port), timeout=3) as s:
-            s.sendall(cmd.encode())
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock, self._buf = None, b""
+
+    def _drain(self, sock: socket.socket) -> None:
+        """Discard stale bytes, e.g. a late reply to a command that timed out."""
+        self._buf = b""
+        while select.select([sock], [], [], 0)[0]:
+            if not sock.recv(4096):
+                raise ConnectionResetError("OnStep closed the connection")
+
+    def _read(self, sock: socket.socket, size: int = 0, terminator: bytes = b"") -> bytes:
+        """Read exactly ``size`` bytes, or up to and including ``terminator``."""
+        while True:
+            if size and len(self._buf) >= size:
+                data, self._buf = self._buf[:size], self._buf[size:]
+                return data
+            if terminator:
+                idx = self._buf.find(terminator)
+                if idx != -1:
+                    data, self._buf = self._buf[:idx + 1], self._buf[idx + 1:]
+                    return data
+            chunk = sock.recv(256)
+            if not chunk:
+                raise ConnectionResetError("OnStep closed the connection")
+            self._buf += chunk
+
+    def _read_reply(self, sock: socket.socket, kind: str) -> str:
+        if kind == REPLY_NONE:
+            return ""
+        if kind == REPLY_BOOL:
+            return self._read(sock, size=1).decode(errors="replace")
+        if kind == REPLY_STRING:
+            return self._read(sock, terminator=b"#").decode(errors="replace").rstrip("#")
+        if kind == REPLY_GOTO:
+            code = self._read(sock, size=1).decode(errors="replace")
+            if code != "0":
+                try:
+                    code += self._read(sock, terminator=b"#").decode(errors="replace").rstrip("#")
+                except socket.timeout:
+                    pass  # OnStep sends the bare error digit
+            return code
+        raise ValueError(f"Unknown reply kind {kind!r}")
+
+    def transact(self, commands: Sequence[str], replies: Sequence[str]) -> List[str]:
+        """Send ``commands`` in one write and return their replies, in order."""
+        payload = "".join(commands).encode()
+        with self._lock:
+            for attempt in (1, 2):
+                reused = self._sock is not None
+                try:
+                    sock = self._sock or self._connect()
+                    self._drain(sock)
+                    sock.sendall(payload)
+                    return [self._read_reply(sock, kind) for kind in replies]
+                except OSError as e:  # includes socket.timeout
+                    self._close()
+                    if attempt == 1 and reused and not isinstance(e, socket.timeout):
+                        self.logger.debug(f"OnStep connection lost ({e}), reconnecting")
+                        continue
+                    raise OnStepError(f"OnStep {''.join(commands)} failed: {e}") from e
+
+    def _send(self, cmd: str, reply: str = REPLY_NONE) -> str:
+        return self.transact([cmd], [reply])[0]
+
+    # --- commands ------------------------------------------------------
+
+    def get_position(self) -> Tuple[float, float]:
+        """Return the mount's current (RA, Dec) in degrees."""
+        ra, dec = self.transact([":GR#", ":GD#"], [REPLY_STRING, REPLY_STRING])
+        return parse_ra(ra), parse_dec(dec)
+
+    def is_slewing(self) -> bool:
+        """True while a goto is in progress (``:D#`` returns a non-empty distance bar)."""
+        return self._send(":D#", REPLY_STRING) != ""
+
+    def wait_for_slew(self, timeout: float, poll_interval: float = 0.5, cancelled: Optional[threading.Event] = None) -> bool:
+        """Poll until the slew finishes; returns False on timeout or cancellation."""
+        deadline = time.monotonic() + timeout
+        while self.is_slewing():
+            if time.monotonic() >= deadline:
+                return False
+            if cancelled is not None:
+                if cancelled.wait(poll_interval):
+                    return False
+            else:
+                time.sleep(poll_interval)
+        return True
+
+    def abort(self) -> None:
+        """Stop any slew (``:Q#``, no reply)."""
+        self._send(":Q#")
+
+    def goto(self, ra_deg: float, dec_deg: float) -> None:
+        """Start a slew to RA/Dec; raises OnStepError if the mount refuses it."""
+        replies = self.transact(self._target_commands(SolveResult(ra_deg, dec_deg, None, None, None)) + [":MS#"],
+                                [REPLY_BOOL, REPLY_BOOL, REPLY_GOTO])
+        self._check_target(replies)
+        if replies[2] != "0":
+            raise OnStepError(f"OnStep refused the goto (reply {replies[2]!r})")
+
+    def _target_commands(self, result: SolveResult) -> List[str]:
+        return [f":Sr{self._format_ra(result.ra_deg)}#", f":Sd{self._format_dec(result.dec_deg)}#"]
+
+    @staticmethod
+    def _check_target(replies: Sequence[str]) -> None:
+        if replies[0] != "1":
+            raise OnStepError(f"OnStep rejected target RA (reply {replies[0]!r})")
+        if replies[1] != "1":
+            raise OnStepError(f"OnStep rejected target Dec (reply {replies[1]!r})")
 
     def sync_pointing(self, result: SolveResult) -> None:
-        # Set RA/Dec then sync (:CM#)
+        # Set RA/Dec then sync (:CM#), pipelined on the open connection
         self.logger.info(f"Syncing OnStep pointing: RA={result.ra_deg}, Dec={result.dec_deg}")
-        self._send(f":Sr{self._format_ra(result.ra_deg)}#")
-        self._send(f":Sd{self._format_dec(result.dec_deg)}#")
-        self._send(":CM#")
+        with metrics.timer("onstep_sync"):
+            replies = self.transact(self._target_commands(result) + [":CM#"], [REPLY_BOOL, REPLY_BOOL, REPLY_STRING])
+        self._check_target(replies)
+        # OnStep acknowledges with "N/A" (Meade: the synced object's name) and reports failures as "E<n>"
+        if replies[2].startswith("E"):
+            raise OnStepError(f"OnStep sync failed (reply {replies[2]!r})")
         self.logger.info("OnStep sync completed")
 
-    def slew_then_sync(self, result: SolveResult) -> None:
-        # Slew to solved coords, then sync
-        self.logger.info(f"OnStep slew then sync: RA={result.ra_deg}, Dec={result.dec_deg}")
-        self._send(f":Sr{self._format_ra(result.ra_deg)}#")
-        self._send(f":Sd{self._format_dec(result.dec_deg)}#")
-        self._send(":MS#")
-        # TODO: wait/poll until slew complete, then sync
-        self._send(":CM#")
-        self.logger.info("OnStep slew and sync completed")
+    def sync_then_slew(self, result: SolveResult, ra_deg: float, dec_deg: float) -> None:
+        """Sync to the solved position, then slew to (ra_deg, dec_deg), where the mount meant to point.
+
+        Syncing first corrects the pointing model, so the slew then removes the pointing error.
+        """
+        self.logger.info(f"OnStep sync then slew: solved RA={result.ra_deg}, Dec={result.dec_deg}; "
+                         f"target RA={ra_deg}, Dec={dec_deg}")
+        self.sync_pointing(result)
+        self.goto(ra_deg, dec_deg)
+        # Runs on the sync scheduler's thread, so waiting here doesn't hold up solving
+        if not self.wait_for_slew(settings.onstep.slew_timeout_s, settings.onstep.slew_poll_s):
+            raise OnStepError("OnStep slew did not finish in time")
+        self.logger.info("OnStep sync and slew completed")
 
     @staticmethod
     def _format_ra(ra_deg: float) -> str:
@@ -0,0 +1,150 @@
+"""
+OnStep sync scheduling.
+
+The publish stage hands every solve to ``SyncScheduler.submit``, which only
+keeps the latest candidate and returns immediately. A background thread
+decides whether to sync: the solve must have coordinates and at least
+``onstep.min_confidence``, syncs are at least ``onstep.min_interval_s``
+apart, and the mount's reported position (``:GR#``/``:GD#``) must differ
+from the solve by more than ``onstep.tolerance_arcmin`` but not more than
+``onstep.max_sync_deg`` (the safety limit from the PRD). The delta and
+outcome of every attempt are kept for ``/status``.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from skysolve_next.core.config import settings
+from skysolve_next.core.logging_config import get_logger
+from skysolve_next.core.models import SolveResult
+from skysolve_next.mounts.onstep.lx200 import OnStepClient, OnStepError
+
+OUTCOME_SYNCED = "synced"
+OUTCOME_IN_TOLERANCE = "in_tolerance"
+OUTCOME_BLOCKED = "blocked"
+OUTCOME_FAILED = "failed"
+
+
+def angular_separation(ra1: float, dec1: float, ra2: float, dec2: float) -> float:
+    """Great-circle distance in degrees (haversine)."""
+    ra1, dec1, ra2, dec2 = map(math.radians, (ra1, dec1, ra2, dec2))
+    h = math.sin((dec2 - dec1) / 2) ** 2 + math.cos(dec1) * math.cos(dec2) * math.sin((ra2 - ra1) / 2) ** 2
+    return math.degrees(2 * math.asin(min(1.0, math.sqrt(h))))
+
+
+class SyncScheduler:
+    """Syncs the mount to recent solves from a background thread."""
+
+    def __init__(self, client: OnStepClient) -> None:
+        self.client = client
+        self.logger = get_logger("onstep_sync", "mount")
+        self._candidate: Optional[Tuple[SolveResult, float, float]] = None
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._last_sync_at = 0.0
+        self._state: Dict[str, Any] = {
+            "syncs": 0, "skipped": 0, "failures": 0,
+            "last_attempt_at": None, "last_delta_deg": None, "last_outcome": None, "last_error": None,
+        }
+        self._listeners = []
+
+    def add_listener(self, callback) -> None:
+        """Call ``callback(state)`` after each attempt that reached the mount."""
+        self._listeners.append(callback)
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="onstep-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def submit(self, result: SolveResult, confidence: float, captured_at: Optional[float] = None) -> bool:
+        """Offer a solve for syncing; returns False if it can't be used at all."""
+        cfg = settings.onstep
+        if result is None or result.ra_deg is None or result.dec_deg is None:
+            return False
+        if confidence is None or confidence < cfg.min_confidence:
+            with self._cond:
+                self._state["skipped"] += 1
+            return False
+        with self._cond:
+            # Only the latest solve matters; an unprocessed older one is superseded
+            self._candidate = (result, confidence, captured_at or time.time())
+            self._cond.notify()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return dict(self._state)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running:
+                    wait = self._last_sync_at + settings.onstep.min_interval_s - time.time()
+                    if self._candidate is not None and wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait if self._candidate is not None else None)
+                if not self._running:
+                    return
+                candidate, self._candidate = self._candidate, None
+            try:
+                self.process(*candidate)
+            except Exception as e:
+                self.logger.error(f"OnStep sync scheduler error: {e}")
+
+    def process(self, result: SolveResult, confidence: float, captured_at: float) -> str:
+        """Check one solve against the mount and sync if needed; returns the outcome."""
+        cfg = settings.onstep
+        delta = None
+        error = None
+        try:
+            mount_ra, mount_dec = self.client.get_position()
+            delta = angular_separation(mount_ra, mount_dec, result.ra_deg, result.dec_deg)
+            if delta * 60.0 <= cfg.tolerance_arcmin:
+                outcome = OUTCOME_IN_TOLERANCE
+            elif delta > cfg.max_sync_deg:
+                outcome = OUTCOME_BLOCKED
+                self.logger.warning(f"Not syncing: solve is {delta:.2f} deg from the mount "
+                                    f"(onstep.max_sync_deg={cfg.max_sync_deg})")
+            else:
+                if cfg.sync_mode in ("sync_then_slew", "slew_then_sync"):
+                    # Correct the pointing, then put the scope back on the mount's target
+                    self.client.sync_then_slew(result, mount_ra, mount_dec)
+                else:
+                    self.client.sync_pointing(result)
+                outcome = OUTCOME_SYNCED
+        except OnStepError as e:
+            outcome, error = OUTCOME_FAILED, str(e)
+            self.logger.error(f"OnStep sync error: {e}")
+        now = time.time()
+        with self._cond:
+            self._state.update(last_attempt_at=now, last_delta_deg=delta, last_outcome=outcome, last_error=error,
+                               last_solve_age_s=round(now - captured_at, 3))
+            if outcome == OUTCOME_SYNCED:
+                self._state["syncs"] += 1
+            elif outcome == OUTCOME_FAILED:
+                self._state["failures"] += 1
+            else:
+                self._state["skipped"] += 1
+            if outcome in (OUTCOME_SYNCED, OUTCOME_FAILED):
+                # Rate limit attempts that sent commands to the mount, including failures
+                self._last_sync_at = now
+            state = dict(self._state)
+        self.logger.info(f"OnStep sync check: delta={delta if delta is None else round(delta * 60.0, 2)}' "
+                         f"outcome={outcome}")
+        for callback in self._listeners:
+            try:
+                callback(state)
+            except Exception as e:
+                self.logger.warning(f"Sync listener failed: {e}")
+        return outcome
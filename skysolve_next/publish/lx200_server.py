@@ -1,190 +1,337 @@
 # skysolve_next/publish/lx200_server.py
 import socket
+import selectors
 import threading
 import time
 import logging
 import binascii
-from typing import Optional, Deque
-from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple
 from skysolve_next.core.config import settings
 from skysolve_next.core.models import SolveResult
 from skysolve_next.core.logging_config import get_logger
+from skysolve_next.publish.pointing import PointingModel, PointingPredictor
+from skysolve_next.publish.trace import (tracer, format_record, TRACE_ACCEPT, TRACE_CLOSE, TRACE_CMD, TRACE_INFO,
+                                         TRACE_PUBLISH, TRACE_RECV, TRACE_SEND)
 
 # --- Logging setup using centralized configuration ---
 _logger = get_logger("lx200_server", "network")
 
-# --- Rotating in-memory debug store (and persisted tail) ---
-_DEBUG_LOG_PATH = "/tmp/skysolve-lx200-debug.log"
-_debug_store: Deque[str] = deque(maxlen=200)
+# Bounds per connection: LX200 commands are a few bytes, replies a few dozen
+MAX_INPUT_BUFFER = 1024
+MAX_OUTPUT_BUFFER = 16384
+# How often the server loop wakes up to reap idle clients and apply trace settings
+TICK_INTERVAL = 1.0
 
-def _debug_persist(text: str) -> None:
-    try:
-        with open(_DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(text + "\n")
-    except Exception:
-        pass
 
-def _record_debug(text: str) -> None:
-    ts = time.strftime("%Y-%m-%d %H:%M:%S")
-    line = f"{ts} {text}"
-    _debug_store.append(line)
-    _debug_persist(line)
+@dataclass(frozen=True)
+class _Snapshot:
+    """Latest solve as seen by the poll path; replaced as a whole on publish."""
+    model: Optional[PointingModel] = None
+    ra_deg: float = 0.0
+    dec_deg: float = 0.0
+    ra_reply: bytes = b"00:00:00#"
+    dec_reply: bytes = b"+00*00:00#"
+
+
+class _Connection:
+    __slots__ = ("sock", "addr", "inbuf", "outbuf", "last_active")
+
+    def __init__(self, sock: socket.socket, addr) -> None:
+        self.sock = sock
+        self.addr = addr
+        self.inbuf = bytearray()
+        self.outbuf = bytearray()
+        self.last_active = time.monotonic()
+
 
 # --- LX200 server implementation ---
 class LX200Server:
     """Robust read-only LX200 server for SkySafari.
-    Publishes latest solved RA/Dec; ignores movement commands.
+    Publishes latest solved RA/Dec, extrapolated to query time between
+    solves when ``settings.lx200.predict`` is on; ignores movement commands.
+
+    All clients are served by one thread running a ``selectors`` loop. Each
+    connection has bounded input/output buffers and is closed after
+    ``settings.lx200.idle_timeout_s`` without traffic. Queries read an
+    immutable snapshot of the latest solve, so they never wait on ``publish``.
     """
 
     def __init__(self, host: str = "0.0.0.0", port: Optional[int] = None) -> None:
-        self.port = port or settings.lx200_port
+        self.port = port if port is not None else settings.lx200_port
         self.host = host
         self._server: Optional[socket.socket] = None
         self._last: Optional[SolveResult] = None
-        self._lock = threading.Lock()
+        self._lock = threading.Lock()  # serializes publishers only
+        self._predictor = PointingPredictor()
+        self._snapshot = _Snapshot()
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._connections: Dict[socket.socket, _Connection] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._wakeup: Optional[Tuple[socket.socket, socket.socket]] = None
 
     def start(self) -> None:
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         s.bind((self.host, self.port))
         s.listen(8)
+        s.setblocking(False)
         self._server = s
-        threading.Thread(target=self._accept_loop, daemon=True).start()
+        self.port = s.getsockname()[1]
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(s, selectors.EVENT_READ, self._accept)
+        self._wakeup = socket.socketpair()
+        self._wakeup[0].setblocking(False)
+        self._selector.register(self._wakeup[0], selectors.EVENT_READ, None)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="lx200-server", daemon=True)
+        self._thread.start()
         _logger.info("LX200 server listening on %s:%d", self.host, self.port)
-        _record_debug(f"LX200 server started on {self.host}:{self.port}")
+        tracer.set_enabled(settings.lx200.trace)
+        if tracer.enabled:
+            tracer.record(TRACE_INFO, None, f"started on {self.host}:{self.port}".encode())
+
+    def stop(self) -> None:
+        """Stop the loop and close all connections."""
+        if not self._running:
+            return
+        self._running = False
+        try:
+            self._wakeup[1].send(b"x")
+        except OSError:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    @property
+    def client_count(self) -> int:
+        return len(self._connections)
+
+    # --- event loop ----------------------------------------------------
+
+    def _serve(self) -> None:
+        next_tick = time.monotonic() + TICK_INTERVAL
+        try:
+            while self._running:
+                timeout = max(0.0, next_tick - time.monotonic())
+                for key, events in self._selector.select(timeout):
+                    if key.data is None:
+                        continue  # wakeup from stop()
+                    try:
+                        key.data(key.fileobj, events)
+                    except Exception as e:
+                        _logger.error("LX200 event handler error: %s", e)
+                now = time.monotonic()
+                if now >= next_tick:
+                    self._reap_idle(now)
+                    tracer.set_enabled(settings.lx200.trace)
+                    next_tick = now + TICK_INTERVAL
+        finally:
+            for sock in list(self._connections):
+                self._close(sock, "shutdown")
+            self._selector.close()
+            self._server.close()
+            for sock in self._wakeup:
+                sock.close()
+            tracer.flush()
 
-    def _accept_loop(self) -> None:
+    def _accept(self, server: socket.socket, events: int) -> None:
         while True:
             try:
-                conn, addr = self._server.accept()
-            except Exception as e:
-                _logger.exception("accept failed: %s", e)
-                time.sleep(0.5)
+                conn, addr = server.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                _logger.error("accept failed: %s", e)
+                return
+            if len(self._connections) >= settings.lx200.max_clients:
+                _logger.warning("Rejecting %s:%d: %d clients connected", addr[0], addr[1], len(self._connections))
+                conn.close()
                 continue
+            conn.setblocking(False)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._connections[conn] = _Connection(conn, addr)
+            self._selector.register(conn, selectors.EVENT_READ, self._on_client)
             _logger.debug("Accepted connection from %s:%d", addr[0], addr[1])
-            _record_debug(f"ACCEPT {addr[0]}:{addr[1]}")
-            t = threading.Thread(target=self._client_loop, args=(conn, addr), daemon=True)
-            t.start()
+            if tracer.enabled:
+                tracer.record(TRACE_ACCEPT, addr)
+
+    def _on_client(self, sock: socket.socket, events: int) -> None:
+        client = self._connections.get(sock)
+        if client is None:
+            return
+        if events & selectors.EVENT_READ:
+            self._read(client)
+        if sock in self._connections and events & selectors.EVENT_WRITE:
+            self._flush(client)
 
-    def _client_loop(self, conn: socket.socket, addr) -> None:
-        conn.settimeout(30)  # Increased timeout for SkySafari compatibility
-        buf = ""
+    def _read(self, client: _Connection) -> None:
+        addr = client.addr
         try:
-            # Send initial acknowledgment - some LX200 clients expect this
-            # conn.sendall(b"#")  # Initial handshake for SkySafari compatibility
-            
-            while True:
-                try:
-                    chunk = conn.recv(4096)
-                except socket.timeout:
-                    # continue to keep connection alive; SkySafari often polls
-                    _logger.debug("Socket timeout for %s:%d, continuing", addr[0], addr[1])
-                    continue
-                except Exception as e:
-                    _logger.debug("Socket error for %s:%d: %s", addr[0], addr[1], e)
-                    break
-                if not chunk:
-                    _logger.debug("Client %s:%d sent empty chunk, closing connection", addr[0], addr[1])
-                    _record_debug(f"EMPTY_CHUNK {addr[0]}:{addr[1]}")
-                    break
-                # log raw bytes only at debug level
-                hexb = binascii.hexlify(chunk).decode()
-                txt = chunk.decode(errors="replace")
-                _logger.debug("recv %d bytes from %s:%d -> hex=%s text=%r", len(chunk), addr[0], addr[1], hexb, txt)
-                _record_debug(f"RECV {addr[0]}:{addr[1]} HEX={hexb} TXT={txt!r}")
-
-                buf += txt
-                # process commands delimited by '#'
-                while True:
-                    idx = buf.find("#")
-                    if idx == -1:
-                        break
-                    raw = buf[: idx + 1]
-                    buf = buf[idx + 1 :]
-                    cmd = raw.strip()
-                    if not cmd:
-                        continue
-                    if not cmd.startswith(":"):
-                        cmd = ":" + cmd
-                    _logger.debug("parsed cmd=%r from %s:%d", cmd, addr[0], addr[1])
-                    _record_debug(f"CMD {addr[0]}:{addr[1]} {cmd}")
-                    self._handle_command(conn, cmd)
-        except Exception as e:
-            _logger.error("client loop error for %s:%d: %s", addr[0], addr[1], e)
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
-            _logger.debug("Connection closed %s:%d", addr[0], addr[1])
-            _record_debug(f"CLOSE {addr[0]}:{addr[1]}")
+            chunk = client.sock.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            _logger.debug("Socket error for %s:%d: %s", addr[0], addr[1], e)
+            self._close(client.sock, "error")
+            return
+        if not chunk:
+            _logger.debug("Client %s:%d sent empty chunk, closing connection", addr[0], addr[1])
+            self._close(client.sock, "EMPTY_CHUNK")
+            return
+        client.last_active = time.monotonic()
+        if tracer.enabled:
+            tracer.record(TRACE_RECV, addr, chunk)
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug("recv %d bytes from %s:%d -> hex=%s text=%r", len(chunk), addr[0], addr[1],
+                          binascii.hexlify(chunk).decode(), chunk.decode(errors="replace"))
 
-    def _send_and_log(self, conn: socket.socket, resp: bytes) -> None:
+        client.inbuf += chunk
+        # process commands delimited by '#'
+        while True:
+            idx = client.inbuf.find(b"#")
+            if idx == -1:
+                break
+            raw = bytes(client.inbuf[: idx + 1])
+            del client.inbuf[: idx + 1]
+            cmd = raw.decode(errors="replace").strip()
+            if not cmd:
+                continue
+            if not cmd.startswith(":"):
+                cmd = ":" + cmd
+            reply = self._handle_command(cmd)
+            if tracer.enabled:
+                tracer.record(TRACE_CMD, addr, raw)
+                tracer.record(TRACE_SEND, addr, reply)
+            client.outbuf += reply
+        if len(client.inbuf) > MAX_INPUT_BUFFER:
+            # No '#' in a kilobyte: not LX200, drop the garbage
+            if tracer.enabled:
+                tracer.record(TRACE_INFO, addr, f"overflow: dropped {len(client.inbuf)} bytes".encode())
+            client.inbuf.clear()
+        if client.outbuf:
+            self._flush(client)
+
+    def _flush(self, client: _Connection) -> None:
         try:
-            conn.sendall(resp)
-        except Exception:
+            sent = client.sock.send(client.outbuf)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
             _logger.exception("failed to send reply")
-        _logger.debug("sent %d bytes -> hex=%s text=%r", len(resp), binascii.hexlify(resp).decode(), resp.decode(errors="replace"))
-        _record_debug(f"SEND HEX={binascii.hexlify(resp).decode()} TXT={resp.decode(errors='replace')!r}")
+            self._close(client.sock, "error")
+            return
+        if sent and _logger.isEnabledFor(logging.DEBUG):
+            resp = bytes(client.outbuf[:sent])
+            _logger.debug("sent %d bytes -> hex=%s text=%r", sent, binascii.hexlify(resp).decode(),
+                          resp.decode(errors="replace"))
+        del client.outbuf[:sent]
+        if len(client.outbuf) > MAX_OUTPUT_BUFFER:
+            # Client keeps sending but doesn't read its replies
+            self._close(client.sock, "OUTPUT_OVERFLOW")
+            return
+        wanted = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.outbuf else 0)
+        if self._selector.get_key(client.sock).events != wanted:
+            self._selector.modify(client.sock, wanted, self._on_client)
+
+    def _reap_idle(self, now: float) -> None:
+        idle_timeout = settings.lx200.idle_timeout_s
+        if not idle_timeout or idle_timeout <= 0:
+            return
+        for sock, client in list(self._connections.items()):
+            if now - client.last_active > idle_timeout:
+                self._close(sock, "IDLE")
 
-    def _handle_command(self, conn: socket.socket, cmd: str) -> None:
+    def _close(self, sock: socket.socket, reason: str) -> None:
+        client = self._connections.pop(sock, None)
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            sock.close()
+        except Exception:
+            pass
+        if client is not None:
+            addr = client.addr
+            _logger.debug("Connection closed %s:%d (%s)", addr[0], addr[1], reason)
+            if tracer.enabled:
+                tracer.record(TRACE_CLOSE, addr, reason.encode())
+
+    # --- protocol ------------------------------------------------------
+
+    def _handle_command(self, cmd: str) -> bytes:
+        """Return the reply to one ``#``-terminated command."""
         # READ QUERIES
         # Accept both :GR# and :RS# (SkySafari variations), and lowercase forms.
-        if cmd.upper().startswith(":GR#") or cmd.upper().startswith(":RS#"):  # Get RA
+        upper = cmd.upper()
+        if upper.startswith(":GR#") or upper.startswith(":RS#"):  # Get RA
             # If we haven't published a solve yet, return a benign zero RA (avoid returning '#')
-            ra_val = (self._last.ra_deg if self._last and getattr(self._last, "ra_deg", None) is not None else 0.0)
-            ra = self._format_ra(ra_val)
-            self._send_and_log(conn, (ra + "#").encode())
-            return
-        if cmd.upper().startswith(":GD#"):  # Get Dec
-            dec_val = (self._last.dec_deg if self._last and getattr(self._last, "dec_deg", None) is not None else 0.0)
-            dec = self._format_dec(dec_val)
-            self._send_and_log(conn, (dec + "#").encode())
-            return
+            snapshot = self._snapshot
+            if snapshot.model is not None and settings.lx200.predict:
+                return (self._format_ra(snapshot.model.predict(time.time()).ra_deg) + "#").encode()
+            return snapshot.ra_reply
+        if upper.startswith(":GD#"):  # Get Dec
+            snapshot = self._snapshot
+            if snapshot.model is not None and settings.lx200.predict:
+                return (self._format_dec(snapshot.model.predict(time.time()).dec_deg) + "#").encode()
+            return snapshot.dec_reply
         if cmd.startswith(":GVP#"):
-            self._send_and_log(conn, b"Skysolve Next#")
-            return
+            return b"Skysolve Next#"
         if cmd.startswith(":GVN#"):
-            self._send_and_log(conn, b"0.1#")
-            return
+            return b"0.1#"
         if cmd.startswith(":GVD#") or cmd.startswith(":GC#"):
-            self._send_and_log(conn, time.strftime("%m/%d/%y").encode() + b"#")
-            return
+            return time.strftime("%m/%d/%y").encode() + b"#"
         if cmd.startswith(":GVT#") or cmd.startswith(":GL#"):
-            self._send_and_log(conn, time.strftime("%H:%M:%S").encode() + b"#")
-            return
+            return time.strftime("%H:%M:%S").encode() + b"#"
         if cmd.startswith(":U#"):
             # high precision toggle ack
-            self._send_and_log(conn, b"1")
-            return
+            return b"1"
 
         # SETTERS (ACK ONLY)
         if cmd.startswith(":SC"):   # set date
-            self._send_and_log(conn, b"1")
-            return
+            return b"1"
         if cmd.startswith(":SL"):   # set time
-            self._send_and_log(conn, b"1")
-            return
+            return b"1"
         if cmd.startswith(":St") or cmd.startswith(":Sg"):  # set site lat/long
-            self._send_and_log(conn, b"1")
-            return
+            return b"1"
 
         # SLEW/MOTION (IGNORED)
         if cmd.startswith(":MS#") or cmd.startswith(":Mn#") or cmd.startswith(":Me#") or cmd.startswith(":Ms#") or cmd.startswith(":Mw#"):
-            self._send_and_log(conn, b"0")
-            return
+            return b"0"
 
         # Default reply per Meade: '#'
-        self._send_and_log(conn, b"#")
+        return b"#"
+
+    def current_radec(self, now: Optional[float] = None):
+        """RA/Dec to report at ``now``: predicted if enabled, else the last solve (0, 0 before any)."""
+        snapshot = self._snapshot
+        if snapshot.model is not None and settings.lx200.predict:
+            prediction = snapshot.model.predict(time.time() if now is None else now)
+            return prediction.ra_deg, prediction.dec_deg
+        return snapshot.ra_deg, snapshot.dec_deg
 
-    def publish(self, result: SolveResult) -> None:
+    def publish(self, result: SolveResult, timestamp: Optional[float] = None) -> None:
+        cfg = settings.lx200
         with self._lock:
-            self._last = result
+            self._predictor.configure(cfg.history_s, cfg.max_extrapolate_s, cfg.confidence_half_life_s, cfg.tracking)
+            if result is not None and getattr(result, "ra_deg", None) is not None and getattr(result, "dec_deg", None) is not None:
+                self._last = result
+                self._predictor.add(time.time() if timestamp is None else timestamp,
+                                    result.ra_deg, result.dec_deg, getattr(result, "confidence", None))
+                ra, dec = result.ra_deg, result.dec_deg
+                # Swap in the new snapshot with one assignment; pollers never take the lock
+                self._snapshot = _Snapshot(self._predictor.model(), ra, dec,
+                                           (self._format_ra(ra) + "#").encode(),
+                                           (self._format_dec(dec) + "#").encode())
+            # Failed solves keep reporting (and extrapolating) the last good pointing
+        if tracer.enabled:
             conf_val = getattr(result,'confidence',None)
             conf_str = conf_val if conf_val not in (None, 0.0) else "-"
             ra_str = f"{result.ra_deg:.6f}" if getattr(result, 'ra_deg', None) is not None else "-"
             dec_str = f"{result.dec_deg:.6f}" if getattr(result, 'dec_deg', None) is not None else "-"
-            _record_debug(f"PUB RA={ra_str} DEC={dec_str} CONF={conf_str}")
+            tracer.record(TRACE_PUBLISH, None, f"RA={ra_str} DEC={dec_str} CONF={conf_str}".encode())
 
     @staticmethod
     def _format_ra(ra_deg: float) -> str:
@@ -198,6 +345,6 @@ class LX200Server:
         d = int(v); m = int((v - d) * 60); s = int((((v - d) * 60) - m) * 60)
         return f"{sign}{d:02d}*{m:02d}:{s:02d}"
 
-# Optional helper to dump last debug lines (useful from a shell)
+# Optional helper to dump the last trace records (useful from a shell)
 def dump_debug_tail(n: int = 80):
-    print("\n".join(list(_debug_store)[-n:]))
+    print("\n".join(format_record(record) for record in tracer.tail(n)))
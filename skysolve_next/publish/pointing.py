@@ -0,0 +1,175 @@
+"""
+Predictive pointing between solves.
+
+A solve arrives every few seconds, but planetarium apps poll the LX200
+position several times a second. ``PointingPredictor`` keeps a short history
+of timestamped solves and fits the angular velocity of the pointing on the
+sphere, so queries between fixes get the position extrapolated to query time.
+
+Untracked mounts (a Dobsonian left alone) stay fixed in hour angle, so the
+pointing drifts east in RA at the sidereal rate. With ``tracking`` off the
+fit is done in a frame rotating with the sky: a telescope at rest predicts
+pure sidereal drift, and push-to motion is fitted on top of it. Extrapolation
+of the fitted motion is capped at ``max_extrapolate_s`` and the confidence of
+a prediction halves every ``confidence_half_life_s`` seconds after the solve.
+"""
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+
+# Sidereal rotation rate of the sky (rad/s)
+SIDEREAL_RATE = 2.0 * math.pi / 86164.0905
+MAX_SAMPLES = 64
+
+
+@dataclass
+class PointingPrediction:
+    ra_deg: float
+    dec_deg: float
+    confidence: Optional[float]
+    age_s: float  # seconds since the solve the prediction is based on
+
+
+@dataclass(frozen=True)
+class PointingModel:
+    """Immutable fit of the pointing motion; safe to share between threads."""
+    t_last: float
+    v_last: np.ndarray  # last solve, in the mount's frame at ``epoch``
+    omega: np.ndarray  # fitted angular velocity (rad/s) in the mount's frame
+    epoch: float
+    tracking: bool
+    confidence: Optional[float]
+    max_extrapolate_s: float
+    confidence_half_life_s: float
+
+    def predict(self, t: float) -> PointingPrediction:
+        age = max(0.0, t - self.t_last)
+        v = _rotate(self.v_last, self.omega, min(age, self.max_extrapolate_s))
+        frame_angle = 0.0 if self.tracking else SIDEREAL_RATE * (t - self.epoch)
+        ra, dec = vector_to_radec(_rotate_z(v, frame_angle))
+        conf = self.confidence
+        if conf is not None and self.confidence_half_life_s > 0:
+            conf = conf * 0.5 ** (age / self.confidence_half_life_s)
+        return PointingPrediction(ra, dec, conf, age)
+
+
+def radec_to_vector(ra_deg: float, dec_deg: float) -> np.ndarray:
+    ra, dec = math.radians(ra_deg), math.radians(dec_deg)
+    return np.array([math.cos(dec) * math.cos(ra), math.cos(dec) * math.sin(ra), math.sin(dec)])
+
+
+def vector_to_radec(v: np.ndarray) -> Tuple[float, float]:
+    x, y, z = v / np.linalg.norm(v)
+    ra = math.degrees(math.atan2(y, x)) % 360.0
+    dec = math.degrees(math.asin(max(-1.0, min(1.0, z))))
+    return ra, dec
+
+
+def _rotate_z(v: np.ndarray, angle: float) -> np.ndarray:
+    c, s = math.cos(angle), math.sin(angle)
+    return np.array([c * v[0] - s * v[1], s * v[0] + c * v[1], v[2]])
+
+
+def _rotate(v: np.ndarray, omega: np.ndarray, dt: float) -> np.ndarray:
+    """Rotate ``v`` by angular velocity ``omega`` (rad/s) for ``dt`` seconds (Rodrigues)."""
+    rate = float(np.linalg.norm(omega))
+    if rate == 0.0 or dt == 0.0:
+        return v
+    k = omega / rate
+    angle = rate * dt
+    return (v * math.cos(angle) + np.cross(k, v) * math.sin(angle)
+            + k * float(np.dot(k, v)) * (1.0 - math.cos(angle)))
+
+
+class PointingPredictor:
+    """Extrapolates the pointing from recent solves."""
+
+    def __init__(self, history_s: float = 6.0, max_extrapolate_s: float = 5.0,
+                 confidence_half_life_s: float = 10.0, tracking: bool = False) -> None:
+        self.history_s = history_s
+        self.max_extrapolate_s = max_extrapolate_s
+        self.confidence_half_life_s = confidence_half_life_s
+        self.tracking = tracking
+        # (timestamp, unit vector in the sky-fixed or sky-rotating frame, confidence)
+        self._samples: Deque[Tuple[float, np.ndarray, Optional[float]]] = deque(maxlen=MAX_SAMPLES)
+        self._omega = np.zeros(3)
+        self._epoch: Optional[float] = None  # reference time of the rotating frame
+        self._lock = threading.Lock()
+
+    def _frame_angle(self, t: float) -> float:
+        """Sky rotation since the epoch that the mount doesn't follow."""
+        return 0.0 if self.tracking or self._epoch is None else SIDEREAL_RATE * (t - self._epoch)
+
+    def configure(self, history_s: float, max_extrapolate_s: float, confidence_half_life_s: float,
+                  tracking: bool) -> None:
+        with self._lock:
+            if tracking != self.tracking:
+                self._clear()
+            self.history_s = history_s
+            self.max_extrapolate_s = max_extrapolate_s
+            self.confidence_half_life_s = confidence_half_life_s
+            self.tracking = tracking
+
+    def add(self, t: float, ra_deg: float, dec_deg: float, confidence=None) -> None:
+        """Record a solve taken at time ``t``."""
+        try:
+            conf = float(confidence) if confidence not in (None, "", "-") else None
+        except (TypeError, ValueError):
+            conf = None
+        with self._lock:
+            if self._samples and t <= self._samples[-1][0]:
+                return  # out of order
+            while self._samples and t - self._samples[0][0] > self.history_s:
+                self._samples.popleft()
+            if not self._samples:
+                self._epoch = t
+            # Store in a frame rotating with the sky, where an untracked mount is at rest
+            v = _rotate_z(radec_to_vector(ra_deg, dec_deg), -self._frame_angle(t))
+            self._samples.append((t, v, conf))
+            self._omega = self._fit()
+
+    def _fit(self) -> np.ndarray:
+        """Least-squares angular velocity (rad/s) of the samples in the rotating frame."""
+        if len(self._samples) < 2:
+            return np.zeros(3)
+        times = np.array([s[0] for s in self._samples])
+        vectors = np.array([s[1] for s in self._samples])
+        dt = times - times.mean()
+        denom = float(np.dot(dt, dt))
+        if denom <= 0.0:
+            return np.zeros(3)
+        velocity = dt @ (vectors - vectors.mean(axis=0)) / denom
+        return np.cross(self._samples[-1][1], velocity)
+
+    def _clear(self) -> None:
+        self._samples.clear()
+        self._omega = np.zeros(3)
+        self._epoch = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def model(self) -> Optional[PointingModel]:
+        """Snapshot of the current fit, or None before the first solve."""
+        with self._lock:
+            if not self._samples:
+                return None
+            t_last, v_last, conf = self._samples[-1]
+            return PointingModel(t_last, v_last, self._omega, self._epoch, self.tracking, conf,
+                                 self.max_extrapolate_s, self.confidence_half_life_s)
+
+    def predict(self, t: float) -> Optional[PointingPrediction]:
+        """Return the pointing extrapolated to time ``t``, or None before the first solve."""
+        model = self.model()
+        return model.predict(t) if model is not None else None
+
+    def angular_rate(self) -> float:
+        """Fitted rate of the pointing relative to the mount's frame (deg/s)."""
+        with self._lock:
+            return math.degrees(float(np.linalg.norm(self._omega)))
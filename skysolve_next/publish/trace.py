@@ -0,0 +1,191 @@
+"""
+Binary tracing of LX200 traffic.
+
+Tracing is off by default and then costs one attribute check per call site
+(``if tracer.enabled:``). When enabled, each event (accept, received chunk,
+parsed command, reply, close, publish) is packed into a fixed-size 64-byte
+record in a preallocated ring, with no formatting or I/O on the serving
+thread. A background thread appends new records to ``TRACE_PATH`` once per
+second, rotating it to ``TRACE_PATH + ".1"`` past ``max_file_bytes``; the web
+app decodes the tail of that file for ``GET /lx200/trace``.
+"""
+
+import os
+import socket
+import struct
+import threading
+import time
+from typing import List, Optional, Tuple
+
+TRACE_PATH = "/tmp/skysolve-lx200-trace.bin"
+
+# timestamp, kind, IPv4 address, port, payload length (before truncation, capped at 255), payload
+RECORD = struct.Struct("<dB4sHB48s")
+PAYLOAD_SIZE = 48
+
+TRACE_ACCEPT = 1
+TRACE_RECV = 2
+TRACE_CMD = 3
+TRACE_SEND = 4
+TRACE_CLOSE = 5
+TRACE_PUBLISH = 6
+TRACE_INFO = 7
+
+KIND_NAMES = {
+    TRACE_ACCEPT: "ACCEPT", TRACE_RECV: "RECV", TRACE_CMD: "CMD", TRACE_SEND: "SEND",
+    TRACE_CLOSE: "CLOSE", TRACE_PUBLISH: "PUB", TRACE_INFO: "INFO",
+}
+
+_NO_ADDR = b"\0\0\0\0"
+
+
+def _pack_addr(addr) -> Tuple[bytes, int]:
+    if not addr:
+        return _NO_ADDR, 0
+    try:
+        return socket.inet_aton(addr[0]), addr[1]
+    except (OSError, TypeError, IndexError):
+        return _NO_ADDR, 0
+
+
+class LX200Tracer:
+    """Preallocated ring of trace records with a batching background flusher."""
+
+    def __init__(self, path: str = TRACE_PATH, capacity: int = 4096, max_file_bytes: int = 1 << 20,
+                 flush_interval: float = 1.0) -> None:
+        self.path = path
+        self.capacity = capacity
+        self.max_file_bytes = max_file_bytes
+        self.flush_interval = flush_interval
+        self.enabled = False
+        self.lost = 0  # records overwritten before they were flushed
+        self._ring: Optional[bytearray] = None
+        self._seq = 0  # records written since enabled
+        self._flushed = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_enabled(self, enabled: bool) -> None:
+        if enabled and not self.enabled:
+            self.enable()
+        elif not enabled and self.enabled:
+            self.disable()
+
+    def enable(self) -> None:
+        with self._lock:
+            if self._ring is None:
+                self._ring = bytearray(self.capacity * RECORD.size)
+            self._stop.clear()
+            self.enabled = True
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._flush_loop, name="lx200-trace", daemon=True)
+            self._thread.start()
+
+    def disable(self) -> None:
+        self.enabled = False
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def record(self, kind: int, addr, payload: bytes = b"") -> None:
+        """Append one record; callers check ``enabled`` first."""
+        ip, port = _pack_addr(addr)
+        with self._lock:
+            ring = self._ring
+            if ring is None:
+                return
+            RECORD.pack_into(ring, (self._seq % self.capacity) * RECORD.size, time.time(), kind, ip, port,
+                             min(len(payload), 255), payload[:PAYLOAD_SIZE])
+            self._seq += 1
+
+    def _pending(self) -> bytes:
+        """Records not yet flushed, oldest first (call with the lock held)."""
+        count = self._seq - self._flushed
+        if count > self.capacity:
+            self.lost += count - self.capacity
+            count = self.capacity
+        start = (self._seq - count) % self.capacity
+        size = RECORD.size
+        end = start + count
+        if end <= self.capacity:
+            data = bytes(self._ring[start * size:end * size])
+        else:
+            data = bytes(self._ring[start * size:]) + bytes(self._ring[:(end - self.capacity) * size])
+        self._flushed = self._seq
+        return data
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._ring is None or self._seq == self._flushed:
+                return
+            data = self._pending()
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_file_bytes:
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "ab") as f:
+                f.write(data)
+        except OSError:
+            pass
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def tail(self, limit: int = 100) -> List[tuple]:
+        """Most recent records still in the ring, decoded."""
+        with self._lock:
+            if self._ring is None:
+                return []
+            count = min(self._seq, self.capacity, limit)
+            records = []
+            for seq in range(self._seq - count, self._seq):
+                records.append(RECORD.unpack_from(self._ring, (seq % self.capacity) * RECORD.size))
+        return records
+
+
+def decode(data: bytes) -> List[tuple]:
+    size = RECORD.size
+    return [RECORD.unpack_from(data, offset) for offset in range(0, len(data) - size + 1, size)]
+
+
+def format_record(record: tuple) -> str:
+    ts, kind, ip, port, length, payload = record
+    payload = payload[:min(length, PAYLOAD_SIZE)]
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) + f".{int(ts % 1 * 1000):03d}"
+    line = f"{stamp} {KIND_NAMES.get(kind, kind)}"
+    if ip != _NO_ADDR:
+        line += f" {socket.inet_ntoa(ip)}:{port}"
+    if kind in (TRACE_RECV, TRACE_SEND):
+        line += f" HEX={payload.hex()} TXT={payload.decode(errors='replace')!r}"
+    elif payload:
+        line += " " + payload.decode(errors="replace")
+    if length > PAYLOAD_SIZE:
+        line += f" (+{length - PAYLOAD_SIZE} bytes)"
+    return line
+
+
+def read_trace(path: str = TRACE_PATH, limit: int = 500) -> bytes:
+    """Return the last ``limit`` raw records flushed to disk (including the rotated file)."""
+    size = RECORD.size
+    wanted = limit * size
+    data = b""
+    for candidate in (path, path + ".1"):
+        try:
+            with open(candidate, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                length = f.tell() - f.tell() % size  # ignore a partially written record
+                take = min(length, wanted - len(data))
+                f.seek(length - take)
+                data = f.read(take) + data
+        except OSError:
+            continue
+        if len(data) >= wanted:
+            break
+    return data
+
+
+# Process-wide tracer for the LX200 server
+tracer = LX200Tracer()
@@ -0,0 +1,116 @@
+"""
+Long-lived astrometry.net solving backend.
+
+Spawning ``solve-field`` per frame pays interpreter/shell startup, config
+parsing and index file opening every time. The engine here uses the
+in-process astrometry.net binding (the ``astrometry`` package), which loads
+the index files once and keeps them in memory, so each request only costs
+the actual quad matching.
+"""
+
+import glob
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from skysolve_next.core.models import SolveResult
+from skysolve_next.core.logging_config import get_logger
+from skysolve_next.solver.wcs import cd_orientation
+
+try:
+    import astrometry
+    ASTROMETRY_ENGINE_AVAILABLE = True
+except ImportError:
+    astrometry = None
+    ASTROMETRY_ENGINE_AVAILABLE = False
+
+# Engines keyed by the index files they hold; shared by all solvers in the process
+_engines: Dict[Tuple[str, ...], "AstrometryEngine"] = {}
+_engines_lock = threading.Lock()
+
+
+def find_index_files(index_dirs: Iterable[str]) -> List[str]:
+    """List astrometry.net index files (index-*.fits) in the given directories."""
+    files: List[str] = []
+    for directory in index_dirs:
+        files.extend(sorted(glob.glob(os.path.join(os.path.expanduser(directory), "index-*.fits"))))
+    return files
+
+
+def get_engine(index_files: Sequence[str]) -> "AstrometryEngine":
+    """Return the process-wide engine for ``index_files``, loading the indexes on first use."""
+    key = tuple(sorted(index_files))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = AstrometryEngine(key)
+            _engines[key] = engine
+        return engine
+
+
+def _wcs_value(fields: Dict[str, Any], key: str) -> Optional[float]:
+    value = fields.get(key)
+    # The binding stores header cards as (value, comment) pairs
+    if isinstance(value, (tuple, list)):
+        value = value[0]
+    return float(value) if value is not None else None
+
+
+class AstrometryEngine:
+    """In-process astrometry.net solver with its index files kept loaded."""
+
+    def __init__(self, index_files: Sequence[str]) -> None:
+        if not ASTROMETRY_ENGINE_AVAILABLE:
+            raise RuntimeError("The astrometry package is not installed")
+        if not index_files:
+            raise RuntimeError("No astrometry.net index files found")
+        self.logger = get_logger("astrometry_engine", "solver")
+        self.index_files = list(index_files)
+        start = time.time()
+        self._solver = astrometry.Solver([Path(p) for p in self.index_files])
+        self.logger.info(f"Loaded {len(self.index_files)} index files in {time.time() - start:.2f}s")
+
+    def solve(self, x: np.ndarray, y: np.ndarray, ra_hint: Optional[float] = None,
+              dec_hint: Optional[float] = None, radius_hint: Optional[float] = None,
+              scale_low: Optional[float] = None, scale_high: Optional[float] = None) -> SolveResult:
+        """Solve zero-based pixel star positions (brightest first)."""
+        stars = np.column_stack([np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)])
+        size_hint = None
+        if scale_low is not None and scale_high is not None:
+            size_hint = astrometry.SizeHint(lower_arcsec_per_pixel=scale_low, upper_arcsec_per_pixel=scale_high)
+        position_hint = None
+        if ra_hint is not None and dec_hint is not None:
+            position_hint = astrometry.PositionHint(ra_deg=ra_hint, dec_deg=dec_hint, radius_deg=radius_hint or 20.0)
+
+        solution = self._solver.solve(
+            stars=stars.tolist(),
+            size_hint=size_hint,
+            position_hint=position_hint,
+            # Stop at the first accepted match; we only need the pointing
+            solution_parameters=astrometry.SolutionParameters(logodds_callback=lambda logodds: astrometry.Action.STOP),
+        )
+        if not solution.has_match():
+            return SolveResult(ra_deg=None, dec_deg=None, roll_deg=None, plate_scale_arcsec_px=None, confidence=0.0)
+
+        match = solution.best_match()
+        roll = None
+        fields = getattr(match, "wcs_fields", None) or {}
+        cd = [_wcs_value(fields, k) for k in ("CD1_1", "CD1_2", "CD2_1", "CD2_2")]
+        if None not in cd:
+            roll, _, _ = cd_orientation(*cd)
+        return SolveResult(
+            ra_deg=float(match.center_ra_deg),
+            dec_deg=float(match.center_dec_deg),
+            roll_deg=roll,
+            plate_scale_arcsec_px=float(match.scale_arcsec_per_pixel),
+            # log-odds of a false match being this good; >= ~21 for accepted solutions
+            confidence=1.0 - math.exp(-float(match.logodds)),
+            matched_stars=len(getattr(match, "stars", None) or []) or None,
+        )
+
+    def close(self) -> None:
+        self._solver.close()
@@ -1,18 +1,162 @@
+import math
 import os
+import queue
+import signal
 import subprocess
 import json
 import logging
+import threading
+import numpy as np
+from typing import List, Optional, Sequence, Tuple, Union
 from skysolve_next.solver.base import Solver
+from skysolve_next.solver.astrometry_engine import find_index_files, get_engine
+from skysolve_next.solver.fits import read_header, read_table, write_xylist
+from skysolve_next.solver.index_selector import IndexSelector
+from skysolve_next.solver.starfinder import StarField, find_stars
+from skysolve_next.solver.wcs import WcsSolution
 from skysolve_next.core.models import SolveResult
 from skysolve_next.core.logging_config import get_logger
+from skysolve_next.core.metrics import metrics
+
+# Scratch directory for xylists and solve-field outputs of in-memory frames
+WORK_DIR = "skysolve_next/web/solve"
+# Where astrometry.net source installs and distro packages keep index files
+DEFAULT_INDEX_DIRS = ["/usr/local/astrometry/data", "/usr/share/astrometry"]
+# Consecutive failures with a learned scale before it is forgotten (e.g. lens changed)
+MAX_SCALE_FAILURES = 3
+# Files solve-field writes per run; cleared first so a stale solution is never read back
+SOLVE_OUTPUTS = (".solved", ".wcs", ".match", ".corr")
+# With index sharding, every Nth solve runs unsharded to measure the speedup against
+SHARD_BASELINE_EVERY = 20
 
 class AstrometrySolver(Solver):
-    def __init__(self, solve_field_path: str = "solve-field", timeout: int = 60, max_retries: int = 2) -> None:
+    def __init__(self, solve_field_path: str = "solve-field", timeout: int = 60, max_retries: int = 2,
+                 work_dir: str = WORK_DIR, max_sources: int = 200, backend: str = "solve-field",
+                 index_dirs: Optional[Sequence[str]] = None, plate_scale: Optional[float] = None,
+                 scale_tolerance: float = 0.1, speculative: bool = False, parallel_shards: int = 1) -> None:
         self.solve_field_path = solve_field_path
         self.timeout = timeout
         self.max_retries = max_retries
+        self.work_dir = work_dir
+        self.max_sources = max_sources
+        # "solve-field" spawns a process per phase; "engine" keeps indexes loaded in-process
+        self.backend = backend
+        self.index_dirs = list(index_dirs) if index_dirs is not None else list(DEFAULT_INDEX_DIRS)
+        self._engine_error = None
+        # Configured plate scale (arcsec per unbinned pixel); otherwise learned from the first successful
+        # solve. A frame pixel spans ``pixel_scale`` unbinned pixels, given per solve.
+        self.plate_scale = plate_scale
+        self.scale_tolerance = scale_tolerance
+        self._learned_scale: Optional[float] = None
+        self._scale_failures = 0
+        # Parallel solve workers share this solver; guards the learned scale and its failure count
+        self._scale_lock = threading.Lock()
+        self.index_selector = IndexSelector(self.index_dirs, os.path.join(work_dir, "index_configs"))
+        # Race the hinted and blind solves instead of running them one after the other
+        self.speculative = speculative
+        self._race_lock = threading.Lock()
+        self._race_wins = {"hinted": 0, "blind": 0, "none": 0}
+        self._race_last = None
+        # Split the index files across this many concurrent solve-field processes
+        self.parallel_shards = max(1, int(parallel_shards))
+        self._shard_solves = 0
+        self._solve_times = {"sharded": None, "single": None}
         self.logger = get_logger("astrometry_solver", "solver")
 
+    def stats(self) -> dict:
+        stats = {}
+        with self._race_lock:
+            if any(self._race_wins.values()):
+                stats["speculative"] = dict(self._race_wins, last_winner=self._race_last)
+            if self.parallel_shards > 1:
+                sharded, single = self._solve_times["sharded"], self._solve_times["single"]
+                stats["sharding"] = {
+                    "shards": self.parallel_shards,
+                    "sharded_avg_s": sharded,
+                    "single_avg_s": single,
+                    "speedup": round(single / sharded, 2) if sharded and single else None,
+                }
+        return stats
+
+    def _record_solve_time(self, sharded: bool, elapsed: float) -> None:
+        """Track average successful solve times with and without index sharding."""
+        if self.parallel_shards <= 1:
+            return
+        key = "sharded" if sharded else "single"
+        with self._race_lock:
+            prev = self._solve_times[key]
+            avg = elapsed if prev is None else 0.8 * prev + 0.2 * elapsed
+            self._solve_times[key] = round(avg, 3)
+
+    def _shard_configs(self, image_size, scale) -> List[str]:
+        """Per-shard solve-field configs, or [] when this solve should not be sharded."""
+        if self.parallel_shards <= 1:
+            return []
+        with self._race_lock:
+            self._shard_solves += 1
+            baseline = self._shard_solves % SHARD_BASELINE_EVERY == 0
+        if baseline:
+            return []
+        width, height = image_size if image_size is not None else (None, None)
+        return self.index_selector.shard_configs(self.parallel_shards, width, height, scale)
+
+    def _record_race(self, winner: Optional[str], elapsed: float, _log) -> None:
+        with self._race_lock:
+            self._race_wins[winner or "none"] += 1
+            self._race_last = winner
+            wins = dict(self._race_wins)
+        _log(f"Speculative solve: {winner or 'no'} path won in {elapsed:.2f}s "
+             f"(hinted={wins['hinted']}, blind={wins['blind']}, none={wins['none']})")
+
+    def _scale_bounds(self, pixel_scale: float = 1.0) -> Optional[Tuple[float, float]]:
+        """(low, high) arcsec per pixel of a frame whose pixels span ``pixel_scale`` unbinned pixels."""
+        with self._scale_lock:
+            scale = self.plate_scale or self._learned_scale
+        if not scale:
+            return None
+        scale *= pixel_scale
+        return scale * (1.0 - self.scale_tolerance), scale * (1.0 + self.scale_tolerance)
+
+    def _update_scale(self, result: SolveResult, solved: bool, _log, pixel_scale: float = 1.0,
+                      bounds: Optional[Tuple[float, float]] = None) -> None:
+        """Learn the plate scale from a solve, and forget a learned scale that keeps failing.
+
+        ``bounds`` are the scale bounds the solve ran with; only failures with bounds count against the
+        learned scale, not those of solves started before it was learned.
+        """
+        if self.plate_scale:
+            return
+        with self._scale_lock:
+            if solved:
+                self._scale_failures = 0
+                if self._learned_scale is None and result.plate_scale_arcsec_px:
+                    # Kept per unbinned pixel so it still holds when the binning changes
+                    self._learned_scale = float(result.plate_scale_arcsec_px) / pixel_scale
+                    _log(f"Learned plate scale {self._learned_scale:.3f} arcsec/px; restricting scale search")
+            elif self._learned_scale is not None and bounds is not None:
+                self._scale_failures += 1
+                if self._scale_failures >= MAX_SCALE_FAILURES:
+                    _log(f"{self._scale_failures} failed solves at {self._learned_scale:.3f} arcsec/px; "
+                         "searching all scales again", level="WARNING")
+                    self._learned_scale = None
+                    self._scale_failures = 0
+
+    def _get_engine(self):
+        """Return the shared in-process engine, or None if it can't be used (falls back to solve-field)."""
+        if self._engine_error is not None:
+            return None
+        try:
+            return get_engine(find_index_files(self.index_dirs))
+        except Exception as e:
+            self._engine_error = str(e)
+            self.logger.warning(f"Astrometry engine unavailable, using solve-field: {e}")
+            return None
+
+    def load(self) -> None:
+        """Load the index files now (engine backend) instead of on the first solve."""
+        if self.backend == "engine":
+            self._get_engine()
+
     def _is_solve_successful(self, ra_deg, dec_deg, base_path):
         """Check if solve result is valid by checking .solved file and RA/Dec values"""
         solved_file = base_path + ".solved"
@@ -20,13 +164,77 @@ class AstrometrySolver(Solver):
         # Check if .solved file exists (most reliable indicator)
         solved_exists = os.path.exists(solved_file)
         
-        # Check if RA/Dec are valid numbers
-        coords_valid = (ra_deg is not None and dec_deg is not None and 
-                       ra_deg != 0.0 and dec_deg != 0.0)
+        # RA/Dec of exactly 0 are valid (0h, celestial equator); only missing values are not
+        coords_valid = ra_deg is not None and dec_deg is not None
         
         return solved_exists and coords_valid
 
-    def solve(self, image_path: str, ra_hint: float = None, dec_hint: float = None, radius_hint: float = None, log=None, enable_fallback: bool = True) -> SolveResult:
+    @staticmethod
+    def _failed_result() -> SolveResult:
+        return SolveResult(ra_deg=None, dec_deg=None, roll_deg=None, plate_scale_arcsec_px=None, confidence=0.0)
+
+    @staticmethod
+    def _clear_outputs(out_base: str) -> None:
+        for ext in SOLVE_OUTPUTS:
+            try:
+                os.remove(out_base + ext)
+            except FileNotFoundError:
+                pass
+
+    def _star_field(self, image: Union[np.ndarray, StarField], _log) -> StarField:
+        if isinstance(image, StarField):
+            return image
+        import time
+        start = time.time()
+        field = find_stars(image, max_stars=self.max_sources)
+        elapsed = time.time() - start
+        metrics.observe("star_extraction", elapsed)
+        _log(f"Extracted {len(field)} sources in {elapsed:.3f}s")
+        return field
+
+    def _prepare_xylist(self, field: StarField) -> Tuple[str, str, Tuple[int, int]]:
+        """Write the stars of an in-memory frame as an xylist for solve-field."""
+        os.makedirs(self.work_dir, exist_ok=True)
+        # One scratch file set per thread so parallel solve workers don't collide
+        base_path = os.path.join(self.work_dir, f"frame_{threading.get_ident()}")
+        xy_path = base_path + ".xy"
+        stars = field.stars
+        write_xylist(xy_path, stars["x"], stars["y"], stars["flux"], width=field.width, height=field.height)
+        return xy_path, base_path, (field.width, field.height)
+
+    def _solve_with_engine(self, engine, field: StarField, ra_hint, dec_hint, radius_hint, _log, enable_fallback,
+                           pixel_scale: float = 1.0) -> SolveResult:
+        """Hinted then blind solve on the persistent in-process engine."""
+        import time
+        stars = field.stars
+        scale = self._scale_bounds(pixel_scale)
+        scale_low, scale_high = scale or (None, None)
+        phases = []
+        if ra_hint is not None and dec_hint is not None:
+            phases.append(("Phase 1", ra_hint, dec_hint))
+        if enable_fallback or not phases:
+            phases.append(("Phase 2" if phases else "Phase 1", None, None))
+        result = None
+        for phase_name, ra, dec in phases:
+            start = time.time()
+            result = engine.solve(stars["x"], stars["y"], ra_hint=ra, dec_hint=dec, radius_hint=radius_hint,
+                                  scale_low=scale_low, scale_high=scale_high)
+            elapsed = time.time() - start
+            metrics.observe(f"solve_engine_{phase_name.lower().replace(' ', '')}", elapsed)
+            if result.ra_deg is not None:
+                _log(f"{phase_name} succeeded in {elapsed:.2f}s (engine): RA={result.ra_deg}, DEC={result.dec_deg}, CONF={result.confidence}")
+                self._update_scale(result, True, _log, pixel_scale, scale)
+                return result
+            _log(f"{phase_name} completed in {elapsed:.2f}s (engine) but was unsuccessful", level="WARNING")
+        self._update_scale(result, False, _log, pixel_scale, scale)
+        return result
+
+    def solve(self, image: Union[str, np.ndarray, StarField], ra_hint: float = None, dec_hint: float = None, radius_hint: float = None, log=None, enable_fallback: bool = True,
+              pixel_scale: float = 1.0) -> SolveResult:
+        """Solve an image file, or an in-memory frame / star field via an xylist.
+
+        ``pixel_scale`` is how many unbinned pixels one pixel of the image spans (binning, raw extraction).
+        """
         import re, time, json
         def _log(msg, level="INFO"):
             if log:
@@ -38,33 +246,61 @@ class AstrometrySolver(Solver):
                 log(log_msg)
             getattr(self.logger, level.lower(), self.logger.info)(msg)
 
-        if not (isinstance(image_path, str) and os.path.isfile(image_path)):
-            _log(f"Invalid image path: {image_path}", level="ERROR")
-            raise ValueError("AstrometrySolver expects a valid image file path.")
-        
         overall_start_time = time.time()
+        # solve-field output is only worth splitting into log lines if someone will see them
+        verbose = log is not None or self.logger.isEnabledFor(logging.DEBUG)
+        image_size = None
+        if isinstance(image, (np.ndarray, StarField)):
+            # In-memory frame: stars are extracted here and only the xylist goes to solve-field
+            field = self._star_field(image, _log)
+            engine = self._get_engine() if self.backend == "engine" else None
+            if engine is not None:
+                return self._solve_with_engine(engine, field, ra_hint, dec_hint, radius_hint, _log, enable_fallback,
+                                               pixel_scale)
+            xy_path, base_path, image_size = self._prepare_xylist(field)
+            image_path = xy_path
+        elif isinstance(image, str) and os.path.isfile(image):
+            image_path = image
+            # Get base path without extension for temporary files
+            base_path = os.path.splitext(image_path)[0]
+            xy_path = base_path + ".xy"
+        else:
+            _log(f"Invalid image path: {image}", level="ERROR")
+            raise ValueError("AstrometrySolver expects a valid image file path or a numpy frame.")
+        
         if radius_hint is None:
             radius_hint = 20.0
-        
-        # Get base path without extension for temporary files
-        base_path = os.path.splitext(image_path)[0]
-        xy_path = base_path + ".xy"
+
+        # Known plate scale: tight scale bounds, and only the index files that cover it
+        scale = self._scale_bounds(pixel_scale)
+        config_path = None
+        if scale is not None and image_size is not None:
+            config_path = self.index_selector.config_for(image_size[0], image_size[1], *scale)
         
         # Phase 1: Always solve the image file (with hints if provided) and generate xy file
         has_hints = ra_hint is not None and dec_hint is not None
+
+        shard_configs = self._shard_configs(image_size, scale)
+        if shard_configs or (self.speculative and has_hints and enable_fallback):
+            return self._solve_concurrent(image_path, base_path, ra_hint, dec_hint, radius_hint, image_size, scale,
+                                          shard_configs or [config_path], enable_fallback, _log, pixel_scale)
         
         if has_hints:
             _log(f"Phase 1: Solving image with hints - RA={ra_hint}, Dec={dec_hint}, Radius={radius_hint}")
         else:
             _log("Phase 1: Solving image without hints")
             
-        # Always generate xy file for potential Phase 2 use
-        cmd = self._build_solve_command(image_path, base_path, ra_hint, dec_hint, radius_hint, keep_xy=True)
-        phase1_result = self._execute_solve_field(cmd, base_path, _log, "Phase 1")
+        # Always generate xy file for potential Phase 2 use (an xylist input already is one)
+        cmd = self._build_solve_command(image_path, base_path, ra_hint, dec_hint, radius_hint,
+                                        keep_xy=image_size is None, image_size=image_size,
+                                        scale=scale, config_path=config_path)
+        phase1_result = self._execute_solve_field(cmd, base_path, _log, "Phase 1", verbose)
         
         if self._is_solve_successful(phase1_result.ra_deg, phase1_result.dec_deg, base_path):
             elapsed = time.time() - overall_start_time
             _log(f"Phase 1 succeeded in {elapsed:.2f}s: RA={phase1_result.ra_deg}, DEC={phase1_result.dec_deg}, CONF={phase1_result.confidence}")
+            self._record_solve_time(False, elapsed)
+            self._update_scale(phase1_result, True, _log, pixel_scale, scale)
             return phase1_result
         else:
             _log("Phase 1 failed or returned invalid coordinates", level="WARNING")
@@ -78,27 +314,35 @@ class AstrometrySolver(Solver):
                 _log(f"XY file {xy_path} not found, fallback not possible", level="ERROR")
                 elapsed = time.time() - overall_start_time
                 _log(f"Solve failed in {elapsed:.2f}s - no fallback available", level="ERROR")
+                self._update_scale(phase1_result, False, _log, pixel_scale, scale)
                 return phase1_result
             
             _log(f"Using xy file: {xy_path}")
             # Build an unhinted solve command
-            cmd = self._build_solve_command(xy_path, base_path)
-            result = self._execute_solve_field(cmd, base_path, _log, "Phase 2")
+            cmd = self._build_solve_command(xy_path, base_path, image_size=image_size,
+                                            scale=scale, config_path=config_path)
+            result = self._execute_solve_field(cmd, base_path, _log, "Phase 2", verbose)
             elapsed = time.time() - overall_start_time
             
-            if self._is_solve_successful(result.ra_deg, result.dec_deg, base_path):
+            solved = self._is_solve_successful(result.ra_deg, result.dec_deg, base_path)
+            if solved:
                 _log(f"Phase 2 succeeded in {elapsed:.2f}s: RA={result.ra_deg}, DEC={result.dec_deg}, CONF={result.confidence}")
+                self._record_solve_time(False, elapsed)
             else:
                 _log(f"Phase 2 completed in {elapsed:.2f}s but was unsuccessful", level="WARNING")
+            self._update_scale(result, solved, _log, pixel_scale, scale)
             
             return result
         else:
             # Fallback disabled, return Phase 1 result
             elapsed = time.time() - overall_start_time
             _log(f"Fallback disabled. Solve failed in {elapsed:.2f}s", level="ERROR")
+            self._update_scale(phase1_result, False, _log, pixel_scale, scale)
             return phase1_result
 
-    def _build_solve_command(self, input_path: str, base_path: str, ra_hint: float = None, dec_hint: float = None, radius_hint: float = None, keep_xy: bool = False):
+    def _build_solve_command(self, input_path: str, base_path: str, ra_hint: float = None, dec_hint: float = None, radius_hint: float = None, keep_xy: bool = False, image_size: Optional[Tuple[int, int]] = None,
+                            scale: Optional[Tuple[float, float]] = None, config_path: Optional[str] = None,
+                            out_base: Optional[str] = None, cpulimit: Optional[int] = None):
         """Build solve-field command with common parameters and optional hints"""
         cmd = [
             self.solve_field_path,
@@ -110,15 +354,34 @@ class AstrometrySolver(Solver):
             "--depth", "20",
             "--uniformize", "0",
             "--no-remove-lines",
-            "--match", "none",
-            "--corr", "none",
             "--rdls", "none"
         ]
+        # Match statistics are read back from these (the .wcs is written by default)
+        out = out_base or base_path
+        cmd.extend(["--match", out + ".match", "--corr", out + ".corr"])
         
         # Add hint parameters if provided
         if ra_hint is not None and dec_hint is not None:
             cmd.extend(["--ra", str(ra_hint), "--dec", str(dec_hint), "--radius", str(radius_hint)])
         
+        if scale is not None:
+            cmd.extend(["--scale-units", "arcsecperpix", "--scale-low", f"{scale[0]:.4f}", "--scale-high", f"{scale[1]:.4f}"])
+        if config_path is not None:
+            cmd.extend(["--config", config_path])
+        
+        # Xylist input: solve-field skips source extraction but needs the image geometry
+        if image_size is not None:
+            width, height = image_size
+            cmd.extend(["--width", str(width), "--height", str(height),
+                        "--x-column", "X", "--y-column", "Y", "--sort-column", "FLUX"])
+        
+        if cpulimit is not None:
+            cmd.extend(["--cpulimit", str(cpulimit)])
+        
+        # Separate output names so concurrent runs on the same input don't clobber each other
+        if out_base is not None:
+            cmd.extend(["--dir", os.path.dirname(out_base) or ".", "--out", os.path.basename(out_base)])
+        
         # Add keep-xylist if requested
         if keep_xy:
             xy_path = base_path + ".xy"
@@ -126,71 +389,239 @@ class AstrometrySolver(Solver):
         
         return cmd
 
-    def _execute_solve_field(self, cmd, base_path, _log, phase_name):
-        """Execute solve-field command and parse results"""
-        import re, time
+    def _execute_solve_field(self, cmd, base_path, _log, phase_name, verbose=True):
+        """Execute solve-field command and read the solution it wrote"""
+        import time
         
         phase_start_time = time.time()
         _log(f"{phase_name} command: {' '.join(cmd)}")
+        self._clear_outputs(base_path)
         
         try:
             proc = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
-            for line in proc.stdout.splitlines():
-                _log(line, level="DEBUG")
+            if verbose:
+                for line in proc.stdout.splitlines():
+                    _log(line, level="DEBUG")
             if proc.stderr:
                 for line in proc.stderr.splitlines():
                     _log(line, level="ERROR")
             
             if proc.returncode != 0:
                 _log(f"{phase_name} failed with return code {proc.returncode}: {proc.stderr}", level="ERROR")
-                # Don't raise exception, return zero result to allow fallback
-                return SolveResult(ra_deg=0.0, dec_deg=0.0, roll_deg=None, plate_scale_arcsec_px=None, confidence=0.0)
-            
-            # Parse results
-            ra_deg = dec_deg = confidence = 0.0
-            for line in proc.stdout.splitlines():
-                line_no_ts = re.sub(r"^\[\d{2}:\d{2}:\d{2}\]\s*", "", line)
-                m1 = re.search(r"RA,Dec\s*=\s*\(([-\d.]+),\s*([-\d.]+)\)", line_no_ts)
-                m2 = re.search(r"Field center: \(RA,Dec\) = \(([-\d.]+),\s*([-\d.]+)\)", line_no_ts)
-                if m1:
-                    try:
-                        ra_deg = float(m1.group(1))
-                        dec_deg = float(m1.group(2))
-                    except Exception:
-                        pass
-                elif m2:
-                    try:
-                        ra_deg = float(m2.group(1))
-                        dec_deg = float(m2.group(2))
-                    except Exception:
-                        pass
-                if "Confidence:" in line_no_ts:
-                    try:
-                        confidence = float(line_no_ts.split()[1])
-                    except Exception:
-                        pass
+                # Don't raise exception, return an empty result to allow fallback
+                return self._failed_result()
             
+            result = self._read_solution(base_path, proc.stdout, _log)
             phase_elapsed = time.time() - phase_start_time
-            _log(f"{phase_name} completed in {phase_elapsed:.2f}s: RA={ra_deg}, DEC={dec_deg}, CONF={confidence}")
-            
-            return SolveResult(
-                ra_deg=ra_deg,
-                dec_deg=dec_deg,
-                roll_deg=None,
-                plate_scale_arcsec_px=None,
-                confidence=confidence if confidence not in (None, 0.0) else "-"
-            )
+            metrics.observe(f"solve_{phase_name.lower().replace(' ', '')}", phase_elapsed)
+            _log(f"{phase_name} completed in {phase_elapsed:.2f}s: RA={result.ra_deg}, DEC={result.dec_deg}, CONF={result.confidence}")
+            return result
             
         except subprocess.TimeoutExpired:
             _log(f"{phase_name} timed out after {self.timeout} seconds", level="ERROR")
-            return SolveResult(ra_deg=0.0, dec_deg=0.0, roll_deg=None, plate_scale_arcsec_px=None, confidence=0.0)
+            return self._failed_result()
         except Exception as e:
             _log(f"{phase_name} failed with exception: {e}", level="ERROR")
-            return SolveResult(ra_deg=0.0, dec_deg=0.0, roll_deg=None, plate_scale_arcsec_px=None, confidence=0.0)
+            return self._failed_result()
+
+    def _read_solution(self, out_base: str, stdout: str, _log) -> SolveResult:
+        """Build the result from the .wcs/.match/.corr files of a run.
+
+        Falls back to scraping stdout only when no .wcs was written (e.g. a
+        solve-field wrapper that just prints the field center).
+        """
+        wcs_path = out_base + ".wcs"
+        if not os.path.exists(wcs_path):
+            return self._parse_solve_output(stdout)
+        try:
+            solution = WcsSolution.read(wcs_path)
+        except (OSError, ValueError) as e:
+            _log(f"Could not read {wcs_path}: {e}", level="WARNING")
+            return self._parse_solve_output(stdout)
+        ra_deg, dec_deg = solution.center()
+        roll_deg, plate_scale, _ = solution.orientation()
+        confidence = "-"
+        logodds = self._read_logodds(out_base + ".match")
+        if logodds is not None:
+            # Probability the match isn't a false positive
+            confidence = 1.0 - math.exp(-logodds)
+        return SolveResult(
+            ra_deg=ra_deg,
+            dec_deg=dec_deg,
+            roll_deg=roll_deg,
+            plate_scale_arcsec_px=plate_scale,
+            confidence=confidence,
+            matched_stars=self._count_rows(out_base + ".corr"),
+        )
+
+    @staticmethod
+    def _read_logodds(match_path: str) -> Optional[float]:
+        try:
+            _, table = read_table(match_path)
+            if len(table) and "LOGODDS" in table.dtype.names:
+                return float(table["LOGODDS"][0])
+        except (OSError, ValueError):
+            pass
+        return None
+
+    @staticmethod
+    def _count_rows(table_path: str) -> Optional[int]:
+        try:
+            header = read_header(table_path, hdu=1)
+            return int(header.get("NAXIS2", 0) or 0)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _parse_solve_output(stdout: str) -> SolveResult:
+        """Parse the field center, pixel scale and confidence from solve-field output"""
+        import re
+        ra_deg = dec_deg = None
+        confidence = 0.0
+        plate_scale = None
+        for line in stdout.splitlines():
+            line_no_ts = re.sub(r"^\[\d{2}:\d{2}:\d{2}\]\s*", "", line)
+            m1 = re.search(r"RA,Dec\s*=\s*\(([-\d.]+),\s*([-\d.]+)\)", line_no_ts)
+            m2 = re.search(r"Field center: \(RA,Dec\) = \(([-\d.]+),\s*([-\d.]+)\)", line_no_ts)
+            if m1:
+                try:
+                    ra_deg = float(m1.group(1))
+                    dec_deg = float(m1.group(2))
+                except Exception:
+                    pass
+            elif m2:
+                try:
+                    ra_deg = float(m2.group(1))
+                    dec_deg = float(m2.group(2))
+                except Exception:
+                    pass
+            m3 = re.search(r"pixel scale\s*([\d.]+)\s*arcsec/pix", line_no_ts)
+            if m3:
+                plate_scale = float(m3.group(1))
+            if "Confidence:" in line_no_ts:
+                try:
+                    confidence = float(line_no_ts.split()[1])
+                except Exception:
+                    pass
+        
+        return SolveResult(
+            ra_deg=ra_deg,
+            dec_deg=dec_deg,
+            roll_deg=None,
+            plate_scale_arcsec_px=plate_scale,
+            confidence=confidence if confidence not in (None, 0.0) else "-"
+        )
+
+    def _solve_concurrent(self, image_path, base_path, ra_hint, dec_hint, radius_hint, image_size, scale,
+                          configs, enable_fallback, _log, pixel_scale: float = 1.0) -> SolveResult:
+        """Solve with several solve-field processes at once, keeping the first solution.
+
+        Each phase runs once per index shard in ``configs``. In speculative mode
+        the hinted and blind phases are started together; otherwise the blind
+        phase only starts after every hinted shard has failed.
+        """
+        import time
+        start = time.time()
+        has_hints = ra_hint is not None and dec_hint is not None
+        hinted = ("hinted", (ra_hint, dec_hint, radius_hint))
+        blind = ("blind", (None, None, None))
+        speculative = self.speculative and has_hints and enable_fallback
+        if speculative:
+            phases = [[hinted, blind]]
+        elif has_hints:
+            phases = [[hinted], [blind]] if enable_fallback else [[hinted]]
+        else:
+            phases = [[blind]]
+
+        winner, result = None, None
+        for paths in phases:
+            runs = {}
+            for path, (ra, dec, radius) in paths:
+                for i, config in enumerate(configs):
+                    name = path if len(configs) == 1 else f"{path}/{i}"
+                    runs[name] = self._build_solve_command(
+                        image_path, base_path, ra, dec, radius, image_size=image_size, scale=scale,
+                        config_path=config, out_base=f"{base_path}_{name.replace('/', '_')}",
+                        cpulimit=self.timeout)
+            winner, result = self._race_solve_field(runs, _log)
+            if winner is not None:
+                break
+        elapsed = time.time() - start
+        metrics.observe("solve_concurrent", elapsed)
+
+        path = winner.split("/")[0] if winner else None
+        if speculative:
+            self._record_race(path, elapsed, _log)
+        if winner is None:
+            _log(f"Concurrent solve ({len(configs)} shard(s)) failed in {elapsed:.2f}s", level="WARNING")
+            self._update_scale(result, False, _log, pixel_scale, scale)
+            return result
+        _log(f"Concurrent solve succeeded in {elapsed:.2f}s ({winner}): RA={result.ra_deg}, DEC={result.dec_deg}, CONF={result.confidence}")
+        self._record_solve_time(len(configs) > 1, elapsed)
+        self._update_scale(result, True, _log, pixel_scale, scale)
+        return result
+
+    def _race_solve_field(self, runs, _log):
+        """Run solve-field commands concurrently; return (name, result) of the first to solve.
+
+        The losers are killed with their whole process group, since solve-field
+        hands the actual search to a child astrometry-engine process.
+        """
+        import time
+        failed = self._failed_result()
+        done: "queue.Queue" = queue.Queue()
+        procs = {}
+        for name, cmd in runs.items():
+            out_base = os.path.join(cmd[cmd.index("--dir") + 1], cmd[cmd.index("--out") + 1])
+            self._clear_outputs(out_base)
+            _log(f"Speculative {name} command: {' '.join(cmd)}")
+            try:
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                        start_new_session=True)
+            except Exception as e:
+                _log(f"Speculative {name} solve failed to start: {e}", level="ERROR")
+                continue
+            procs[name] = proc
+
+            def wait(name=name, proc=proc, out_base=out_base):
+                try:
+                    stdout, _ = proc.communicate()
+                except Exception:
+                    stdout = ""
+                done.put((name, proc.returncode, stdout or "", out_base))
+
+            threading.Thread(target=wait, name=f"solve-{name}", daemon=True).start()
+
+        winner, result = None, failed
+        deadline = time.time() + self.timeout
+        pending = len(procs)
+        try:
+            while pending:
+                try:
+                    name, returncode, stdout, out_base = done.get(timeout=max(0.0, deadline - time.time()))
+                except queue.Empty:
+                    _log(f"Speculative solve timed out after {self.timeout} seconds", level="ERROR")
+                    break
+                pending -= 1
+                if returncode != 0:
+                    continue
+                parsed = self._read_solution(out_base, stdout, _log)
+                if self._is_solve_successful(parsed.ra_deg, parsed.dec_deg, out_base):
+                    winner, result = name, parsed
+                    break
+                result = parsed
+        finally:
+            for proc in procs.values():
+                if proc.poll() is None:
+                    try:
+                        os.killpg(proc.pid, signal.SIGKILL)
+                    except (ProcessLookupError, PermissionError):
+                        proc.kill()
+        return winner, result
 
     def _cleanup_temp_files(self, base_path: str):
         """Clean up temporary files generated by solve-field"""
-        temp_extensions = [".xy", ".xyls", ".axy", ".match", ".rdls", ".solved", ".wcs"]
+        temp_extensions = [".xy", ".xyls", ".axy", ".match", ".corr", ".rdls", ".solved", ".wcs"]
         for ext in temp_extensions:
             temp_file = base_path + ext
             try:
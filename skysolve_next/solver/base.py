@@ -5,3 +5,7 @@ from skysolve_next.core.models import SolveResult
 class Solver(ABC):
     @abstractmethod
     def solve(self, image: np.ndarray) -> SolveResult: ...
+
+    def stats(self) -> dict:
+        """Solver-specific statistics for the worker status."""
+        return {}
@@ -0,0 +1,225 @@
+"""
+Minimal FITS support for the solver pipeline.
+
+Only what the solvers need is implemented: writing an astrometry.net style
+xylist (a binary table of star positions) so ``solve-field`` can skip its own
+image decoding and source extraction, and reading headers and binary tables
+(index file scale ranges, ``.wcs``/``.match``/``.corr`` solve outputs).
+"""
+
+import math
+import re
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+BLOCK_SIZE = 2880
+CARD_SIZE = 80
+
+CardValue = Union[bool, int, float, str, None]
+
+
+def _format_card(key: str, value: CardValue = None, comment: Optional[str] = None) -> str:
+    """Format one 80-character header card."""
+    if value is None:
+        card = key.ljust(8)
+    else:
+        if isinstance(value, bool):
+            text = ("T" if value else "F").rjust(20)
+        elif isinstance(value, (int, np.integer)):
+            text = str(int(value)).rjust(20)
+        elif isinstance(value, (float, np.floating)):
+            text = repr(float(value)).upper().rjust(20)
+        else:
+            text = "'" + str(value).replace("'", "''").ljust(8) + "'"
+            text = text.ljust(20)
+        card = f"{key.ljust(8)}= {text}"
+        if comment:
+            card += f" / {comment}"
+    if len(card) > CARD_SIZE:
+        raise ValueError(f"FITS card too long: {card!r}")
+    return card.ljust(CARD_SIZE)
+
+
+def _format_header(cards: Iterable[Tuple[str, CardValue, Optional[str]]]) -> bytes:
+    text = "".join(_format_card(*card) for card in cards) + "END".ljust(CARD_SIZE)
+    return _pad(text.encode("ascii"), b" ")
+
+
+def _pad(data: bytes, fill: bytes) -> bytes:
+    remainder = len(data) % BLOCK_SIZE
+    if remainder:
+        data += fill * (BLOCK_SIZE - remainder)
+    return data
+
+
+def write_xylist(
+    path: str,
+    x: np.ndarray,
+    y: np.ndarray,
+    flux: Optional[np.ndarray] = None,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+) -> None:
+    """Write star positions as an astrometry.net xylist.
+
+    ``x`` and ``y`` are zero-based pixel coordinates; they are stored with the
+    FITS one-based convention used by ``image2xy``. Rows should already be
+    sorted brightest first.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.shape != y.shape or x.ndim != 1:
+        raise ValueError("x and y must be 1-D arrays of the same length")
+
+    columns: List[Tuple[str, np.ndarray]] = [("X", x + 1.0), ("Y", y + 1.0)]
+    if flux is not None:
+        columns.append(("FLUX", np.asarray(flux, dtype=np.float64)))
+
+    table = np.empty(len(x), dtype=[(name, ">f4") for name, _ in columns])
+    for name, values in columns:
+        table[name] = values
+
+    primary: List[Tuple[str, CardValue, Optional[str]]] = [
+        ("SIMPLE", True, "conforms to FITS standard"),
+        ("BITPIX", 8, None),
+        ("NAXIS", 0, None),
+        ("EXTEND", True, None),
+    ]
+    if width is not None and height is not None:
+        primary += [("IMAGEW", int(width), "image width"), ("IMAGEH", int(height), "image height")]
+
+    extension: List[Tuple[str, CardValue, Optional[str]]] = [
+        ("XTENSION", "BINTABLE", "binary table extension"),
+        ("BITPIX", 8, None),
+        ("NAXIS", 2, None),
+        ("NAXIS1", table.dtype.itemsize, "bytes per row"),
+        ("NAXIS2", len(table), "number of rows"),
+        ("PCOUNT", 0, None),
+        ("GCOUNT", 1, None),
+        ("TFIELDS", len(columns), None),
+    ]
+    for i, (name, _) in enumerate(columns, start=1):
+        extension += [(f"TTYPE{i}", name, None), (f"TFORM{i}", "E", None)]
+
+    with open(path, "wb") as f:
+        f.write(_format_header(primary))
+        f.write(_format_header(extension))
+        f.write(_pad(table.tobytes(), b"\0"))
+
+
+def _parse_value(text: str) -> CardValue:
+    text = text.strip()
+    if text.startswith("'"):
+        end = text.find("'", 1)
+        while end != -1 and text[end + 1:end + 2] == "'":
+            end = text.find("'", end + 2)
+        return text[1:end].replace("''", "'").rstrip()
+    text = text.split("/", 1)[0].strip()
+    if text in ("T", "F"):
+        return text == "T"
+    if not text:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text.replace("D", "E"))
+        except ValueError:
+            return text
+
+
+Header = Dict[str, CardValue]
+
+# Binary table TFORM type codes (big-endian, as stored; logicals stay b"T"/b"F")
+_TFORM_DTYPES = {"L": "S1", "B": "u1", "I": ">i2", "J": ">i4", "K": ">i8", "E": ">f4", "D": ">f8"}
+_TFORM = re.compile(r"^\s*(\d*)([A-Z])")
+
+
+def _read_header_blocks(f: BinaryIO) -> Optional[Header]:
+    """Read one header from the current position; None at end of file."""
+    header: Header = {}
+    while True:
+        block = f.read(BLOCK_SIZE)
+        if len(block) < BLOCK_SIZE:
+            if not block and not header:
+                return None
+            raise ValueError(f"Truncated FITS header in {getattr(f, 'name', 'file')}")
+        text = block.decode("ascii", errors="replace")
+        for i in range(0, BLOCK_SIZE, CARD_SIZE):
+            card = text[i:i + CARD_SIZE]
+            key = card[:8].strip()
+            if key == "END":
+                return header
+            if card[8:10] == "= ":
+                header[key] = _parse_value(card[10:])
+
+
+def _data_size(header: Header) -> int:
+    naxis = int(header.get("NAXIS", 0) or 0)
+    if naxis == 0:
+        return 0
+    count = math.prod(int(header.get(f"NAXIS{i}", 0) or 0) for i in range(1, naxis + 1))
+    pcount = int(header.get("PCOUNT", 0) or 0)
+    gcount = int(header.get("GCOUNT", 1) or 1)
+    return abs(int(header["BITPIX"])) // 8 * gcount * (pcount + count)
+
+
+def _iter_hdus(f: BinaryIO) -> Iterator[Tuple[Header, int, int]]:
+    """Yield (header, data offset, data size) for each HDU in the file."""
+    while True:
+        header = _read_header_blocks(f)
+        if header is None:
+            return
+        offset, size = f.tell(), _data_size(header)
+        yield header, offset, size
+        padded = size + (-size % BLOCK_SIZE)
+        f.seek(offset + padded)
+
+
+def read_header(path: str, hdu: int = 0) -> Header:
+    """Read the header of HDU ``hdu`` (0 = primary) into a dict of keyword values."""
+    with open(path, "rb") as f:
+        for i, (header, _, _) in enumerate(_iter_hdus(f)):
+            if i == hdu:
+                return header
+    raise ValueError(f"{path} has no HDU {hdu}")
+
+
+def _table_dtype(header: Header) -> np.dtype:
+    fields = []
+    for i in range(1, int(header["TFIELDS"]) + 1):
+        m = _TFORM.match(str(header[f"TFORM{i}"]))
+        if m is None:
+            raise ValueError(f"Unsupported TFORM{i}: {header[f'TFORM{i}']!r}")
+        repeat = int(m.group(1) or 1)
+        code = m.group(2)
+        name = str(header.get(f"TTYPE{i}") or f"col{i}")
+        if code == "A":
+            fields.append((name, f"S{repeat}"))
+        elif code == "X":
+            fields.append((name, "u1", ((repeat + 7) // 8,)))
+        elif code in _TFORM_DTYPES:
+            fields.append((name, _TFORM_DTYPES[code]) if repeat == 1 else (name, _TFORM_DTYPES[code], (repeat,)))
+        else:
+            raise ValueError(f"Unsupported TFORM{i}: {header[f'TFORM{i}']!r}")
+    dtype = np.dtype(fields)
+    if dtype.itemsize != int(header["NAXIS1"]):
+        raise ValueError(f"Row size {dtype.itemsize} doesn't match NAXIS1={header['NAXIS1']}")
+    return dtype
+
+
+def read_table(path: str, hdu: int = 1) -> Tuple[Header, np.ndarray]:
+    """Read a binary table extension as (header, structured array)."""
+    with open(path, "rb") as f:
+        for i, (header, offset, _) in enumerate(_iter_hdus(f)):
+            if i != hdu:
+                continue
+            if header.get("XTENSION") != "BINTABLE":
+                raise ValueError(f"HDU {hdu} of {path} is not a binary table")
+            dtype = _table_dtype(header)
+            rows = int(header["NAXIS2"])
+            f.seek(offset)
+            data = np.frombuffer(f.read(dtype.itemsize * rows), dtype=dtype, count=rows)
+            return header, data
+    raise ValueError(f"{path} has no HDU {hdu}")
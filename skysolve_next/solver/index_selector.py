@@ -0,0 +1,144 @@
+"""
+Scale-aware selection of astrometry.net index files.
+
+Without scale bounds ``solve-field`` opens and searches every index series on
+disk. Once the plate scale is known, only indexes whose quads are between
+roughly 10% and 100% of the field width can produce a match, so we write a
+small ``solve-field`` config that lists just those files and pass it with
+``--config``. Configs are cached per selected file set.
+
+The index set can also be split into shards, one config each, so several
+``solve-field`` processes search disjoint indexes on different cores.
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from skysolve_next.core.logging_config import get_logger
+from skysolve_next.solver.astrometry_engine import find_index_files
+from skysolve_next.solver.fits import read_header
+
+# Quad diameter range (arcmin) by scale number for the 4100/4200/5200 series,
+# used when an index header can't be read
+SERIES_SCALES_ARCMIN = {
+    0: (2.0, 2.8), 1: (2.8, 4.0), 2: (4.0, 5.6), 3: (5.6, 8.0), 4: (8.0, 11.0),
+    5: (11.0, 16.0), 6: (16.0, 22.0), 7: (22.0, 30.0), 8: (30.0, 42.0), 9: (42.0, 60.0),
+    10: (60.0, 85.0), 11: (85.0, 120.0), 12: (120.0, 170.0), 13: (170.0, 240.0), 14: (240.0, 340.0),
+    15: (340.0, 480.0), 16: (480.0, 680.0), 17: (680.0, 1000.0), 18: (1000.0, 1400.0), 19: (1400.0, 2000.0),
+}
+_INDEX_NAME = re.compile(r"index-\d{2}(\d{2})(?:-\d+)?\.fits$")
+_RAD_TO_ARCMIN = 180.0 / math.pi * 60.0
+
+# Fraction of the field width the smallest useful quad may span
+MIN_QUAD_FRACTION = 0.1
+
+
+def index_scale_range(path: str) -> Optional[Tuple[float, float]]:
+    """Return the (lower, upper) quad size of an index file in arcmin, or None if unknown."""
+    try:
+        header = read_header(path)
+        lower, upper = header.get("SCALE_L"), header.get("SCALE_U")
+        if isinstance(lower, (int, float)) and isinstance(upper, (int, float)) and upper > 0:
+            # Stored in radians
+            return lower * _RAD_TO_ARCMIN, upper * _RAD_TO_ARCMIN
+    except (OSError, ValueError):
+        pass
+    m = _INDEX_NAME.search(os.path.basename(path))
+    if m:
+        return SERIES_SCALES_ARCMIN.get(int(m.group(1)))
+    return None
+
+
+def select_index_files(index_scales: Dict[str, Optional[Tuple[float, float]]], width: int, height: int,
+                       scale_low: float, scale_high: float) -> List[str]:
+    """Pick the index files that can match a field of the given size and plate scale range."""
+    field_low = max(width, height) * scale_low / 60.0
+    field_high = max(width, height) * scale_high / 60.0
+    selected = []
+    for path, scales in index_scales.items():
+        # Unknown scale: keep it rather than risk excluding the only matching index
+        if scales is None or (scales[1] >= MIN_QUAD_FRACTION * field_low and scales[0] <= field_high):
+            selected.append(path)
+    return sorted(selected)
+
+
+class IndexSelector:
+    """Generates (and caches) solve-field configs restricted to the indexes for a plate scale."""
+
+    def __init__(self, index_dirs: Sequence[str], cache_dir: str) -> None:
+        self.index_dirs = list(index_dirs)
+        self.cache_dir = cache_dir
+        self.logger = get_logger("index_selector", "solver")
+        self._index_scales: Optional[Dict[str, Optional[Tuple[float, float]]]] = None
+        self._configs: Dict[Tuple[str, ...], str] = {}
+        self._lock = threading.Lock()
+
+    def index_scales(self) -> Dict[str, Optional[Tuple[float, float]]]:
+        with self._lock:
+            if self._index_scales is None:
+                files = find_index_files(self.index_dirs)
+                self._index_scales = {path: index_scale_range(path) for path in files}
+            return self._index_scales
+
+    def config_for(self, width: int, height: int, scale_low: float, scale_high: float) -> Optional[str]:
+        """Return the path of a config listing only the useful indexes, or None to use the default config."""
+        index_scales = self.index_scales()
+        if not index_scales:
+            return None
+        selected = tuple(select_index_files(index_scales, width, height, scale_low, scale_high))
+        if not selected or len(selected) == len(index_scales):
+            return None
+        with self._lock:
+            path = self._configs.get(selected)
+            if path is None:
+                path = self._write_config(selected, f"{scale_low:.2f}-{scale_high:.2f} arcsec/px")
+                self._configs[selected] = path
+                self.logger.info(f"Using {len(selected)} of {len(index_scales)} index files "
+                                 f"for {scale_low:.2f}-{scale_high:.2f} arcsec/px ({path})")
+            return path
+
+    def shard_configs(self, shards: int, width: Optional[int] = None, height: Optional[int] = None,
+                      scale: Optional[Tuple[float, float]] = None) -> List[str]:
+        """Split the (scale-selected) index files into up to ``shards`` configs.
+
+        Files are ordered by quad scale and dealt out round-robin, so every
+        shard gets a similar mix of the expensive small-scale indexes and of
+        the sky tiles of each scale. Returns [] if there is nothing to split.
+        """
+        index_scales = self.index_scales()
+        if scale is not None and width and height:
+            files = select_index_files(index_scales, width, height, *scale)
+        else:
+            files = sorted(index_scales)
+        shards = min(shards, len(files))
+        if shards < 2:
+            return []
+        files.sort(key=lambda p: (index_scales[p] or (0.0, 0.0), p))
+        groups = [tuple(sorted(files[i::shards])) for i in range(shards)]
+        configs = []
+        with self._lock:
+            for group in groups:
+                path = self._configs.get(group)
+                if path is None:
+                    path = self._write_config(group, f"shard of {len(files)} index files")
+                    self._configs[group] = path
+                configs.append(path)
+        return configs
+
+    def _write_config(self, index_files: Tuple[str, ...], description: str) -> str:
+        digest = hashlib.sha1("\n".join(index_files).encode()).hexdigest()[:12]
+        path = os.path.join(self.cache_dir, f"astrometry_{digest}.cfg")
+        if os.path.exists(path):
+            return path
+        os.makedirs(self.cache_dir, exist_ok=True)
+        lines = [f"# Generated for {description}", "cpulimit 300"]
+        lines += [f"index {os.path.abspath(p)}" for p in index_files]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+        return path
@@ -1,14 +1,122 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
 import numpy as np
 from skysolve_next.solver.base import Solver
+from skysolve_next.solver.starfinder import StarField, find_stars
 from skysolve_next.core.models import SolveResult
 from skysolve_next.core.logging_config import get_logger
+from skysolve_next.core.metrics import metrics
+
+# Tetra3 (lost-in-space pattern-hash solver) is provided by cedar-solve on the Pi
+try:
+    import tetra3
+    TETRA3_AVAILABLE = True
+except ImportError:
+    tetra3 = None
+    TETRA3_AVAILABLE = False
+
+DEFAULT_DATABASE = "default_database"
+
+# Loaded Tetra3 instances keyed by database name. Loading the star/pattern
+# database takes seconds, so it happens once per process and is shared.
+_databases: Dict[str, Any] = {}
+_databases_lock = threading.Lock()
+
+
+def load_database(database: str = DEFAULT_DATABASE) -> Any:
+    """Return the process-wide Tetra3 instance for ``database``, loading it on first use."""
+    if not TETRA3_AVAILABLE:
+        raise RuntimeError("tetra3 (cedar-solve) is not installed")
+    with _databases_lock:
+        t3 = _databases.get(database)
+        if t3 is None:
+            logger = get_logger("tetra3_solver", "solver")
+            logger.info(f"Loading Tetra3 database '{database}'")
+            t3 = tetra3.Tetra3(load_database=database)
+            _databases[database] = t3
+        return t3
+
 
 class Tetra3Solver(Solver):
-    def __init__(self) -> None:
+    """Fast lost-in-space solver that works from star centroids.
+
+    Accepts a numpy frame (stars are extracted with the star finder), a
+    pre-extracted StarField, or an image path. Position hints are not needed
+    by Tetra3 and are accepted only for interface compatibility.
+    """
+
+    def __init__(self, database: str = DEFAULT_DATABASE, fov_estimate: Optional[float] = None,
+                 fov_max_error: Optional[float] = None, max_stars: int = 30,
+                 solve_timeout_ms: int = 1000) -> None:
+        self.database = database
+        self.fov_estimate = fov_estimate
+        self.fov_max_error = fov_max_error
+        self.max_stars = max_stars
+        self.solve_timeout_ms = solve_timeout_ms
         self.logger = get_logger("tetra3_solver", "solver")
 
-    def solve(self, image: np.ndarray) -> SolveResult:
-        self.logger.info("Starting Tetra3 solve (placeholder implementation)")
-        result = SolveResult(ra_deg=180.0, dec_deg=45.0, roll_deg=0.0, plate_scale_arcsec_px=12.3, confidence=0.95 if 0.95 not in (None, 0.0) else "-")
-        self.logger.info(f"Tetra3 solve completed: RA={result.ra_deg}, Dec={result.dec_deg}, Confidence={result.confidence}")
+    def load(self) -> None:
+        """Load the database now (e.g. at worker startup) instead of on the first solve."""
+        load_database(self.database)
+
+    def solve(self, image: Union[str, np.ndarray, StarField], ra_hint: float = None, dec_hint: float = None,
+              radius_hint: float = None, log=None, pixel_scale: float = 1.0) -> SolveResult:
+        # The field of view doesn't depend on binning, so pixel_scale isn't needed here
+        if isinstance(image, StarField):
+            field = image
+        elif isinstance(image, np.ndarray):
+            with metrics.timer("star_extraction"):
+                field = find_stars(image, max_stars=self.max_stars)
+        elif isinstance(image, str):
+            import cv2
+            frame = cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+            if frame is None:
+                raise ValueError(f"Tetra3Solver could not read image: {image}")
+            field = find_stars(frame, max_stars=self.max_stars)
+        else:
+            raise ValueError("Tetra3Solver expects a numpy frame, a StarField or an image path.")
+        stars = field.stars[: self.max_stars]
+        return self.solve_centroids(stars["x"], stars["y"], field.width, field.height)
+
+    def solve_centroids(self, x: np.ndarray, y: np.ndarray, width: int, height: int) -> SolveResult:
+        """Solve from zero-based pixel centroids, brightest first."""
+        if len(x) < 4:
+            self.logger.warning(f"Tetra3 solve skipped: only {len(x)} stars")
+            return self._failed()
+        t3 = load_database(self.database)
+        # Tetra3 expects (y, x) centroids and a (height, width) image size
+        centroids = np.column_stack([np.asarray(y, dtype=np.float64), np.asarray(x, dtype=np.float64)])
+        start = time.perf_counter()
+        solution = t3.solve_from_centroids(
+            centroids, (height, width),
+            fov_estimate=self.fov_estimate,
+            fov_max_error=self.fov_max_error,
+            solve_timeout=self.solve_timeout_ms,
+        )
+        metrics.observe("solve_tetra3", time.perf_counter() - start)
+        if solution.get("RA") is None:
+            self.logger.info(f"Tetra3 found no match from {len(x)} stars (T_solve={solution.get('T_solve')} ms)")
+            return self._failed()
+
+        prob = solution.get("Prob")
+        confidence = 1.0 - float(prob) if prob is not None else "-"
+        fov = solution.get("FOV")
+        result = SolveResult(
+            ra_deg=float(solution["RA"]),
+            dec_deg=float(solution["Dec"]),
+            roll_deg=float(solution["Roll"]) if solution.get("Roll") is not None else None,
+            plate_scale_arcsec_px=float(fov) * 3600.0 / width if fov else None,
+            confidence=confidence,
+        )
+        self.logger.info(
+            f"Tetra3 solve completed in {solution.get('T_solve', 0):.1f} ms: RA={result.ra_deg:.4f}, "
+            f"Dec={result.dec_deg:.4f}, Roll={result.roll_deg}, Matches={solution.get('Matches')}, "
+            f"Confidence={result.confidence}"
+        )
         return result
+
+    @staticmethod
+    def _failed() -> SolveResult:
+        return SolveResult(ra_deg=None, dec_deg=None, roll_deg=None, plate_scale_arcsec_px=None, confidence=0.0)
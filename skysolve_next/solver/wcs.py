@@ -0,0 +1,96 @@
+"""
+Helpers for turning astrometry.net WCS solutions into pointing values.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from skysolve_next.solver.fits import read_header
+
+
+def cd_orientation(cd11: float, cd12: float, cd21: float, cd22: float) -> Tuple[float, float, int]:
+    """Return (roll_deg, plate_scale_arcsec_px, parity) for a TAN CD matrix.
+
+    The roll follows astrometry.net's "up is N degrees E of N" convention
+    (``tan_get_orientation``); parity is +1 or -1 from the sign of det(CD).
+    """
+    det = cd11 * cd22 - cd12 * cd21
+    parity = 1 if det >= 0 else -1
+    t = parity * cd11 + cd22
+    a = parity * cd21 - cd12
+    roll = -math.degrees(math.atan2(a, t))
+    scale = math.sqrt(abs(det)) * 3600.0
+    return roll, scale, parity
+
+
+@dataclass(frozen=True)
+class WcsSolution:
+    """A TAN(-SIP) solution as written by solve-field to ``<base>.wcs``."""
+    crval: Tuple[float, float]
+    crpix: Tuple[float, float]
+    cd: Tuple[float, float, float, float]
+    image_size: Optional[Tuple[int, int]] = None
+    sip_a: Optional[Dict[Tuple[int, int], float]] = None
+    sip_b: Optional[Dict[Tuple[int, int], float]] = None
+
+    @classmethod
+    def from_header(cls, header: dict) -> "WcsSolution":
+        try:
+            crval = (float(header["CRVAL1"]), float(header["CRVAL2"]))
+            crpix = (float(header["CRPIX1"]), float(header["CRPIX2"]))
+            cd = tuple(float(header[k]) for k in ("CD1_1", "CD1_2", "CD2_1", "CD2_2"))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Not a TAN WCS header: {e}") from None
+        size = None
+        if header.get("IMAGEW") and header.get("IMAGEH"):
+            size = (int(header["IMAGEW"]), int(header["IMAGEH"]))
+        sip_a = sip_b = None
+        if str(header.get("CTYPE1", "")).endswith("-SIP"):
+            sip_a = _sip_terms(header, "A", int(header.get("A_ORDER", 0) or 0))
+            sip_b = _sip_terms(header, "B", int(header.get("B_ORDER", 0) or 0))
+        return cls(crval, crpix, cd, size, sip_a, sip_b)
+
+    @classmethod
+    def read(cls, path: str) -> "WcsSolution":
+        return cls.from_header(read_header(path))
+
+    def pixel_to_radec(self, x: float, y: float) -> Tuple[float, float]:
+        """Convert one-based FITS pixel coordinates to (RA, Dec) in degrees."""
+        u, v = x - self.crpix[0], y - self.crpix[1]
+        if self.sip_a is not None and self.sip_b is not None:
+            u, v = u + _sip_poly(self.sip_a, u, v), v + _sip_poly(self.sip_b, u, v)
+        cd11, cd12, cd21, cd22 = self.cd
+        xi = math.radians(cd11 * u + cd12 * v)
+        eta = math.radians(cd21 * u + cd22 * v)
+        ra0, dec0 = math.radians(self.crval[0]), math.radians(self.crval[1])
+        # Inverse gnomonic projection
+        den = math.cos(dec0) - eta * math.sin(dec0)
+        ra = ra0 + math.atan2(xi, den)
+        dec = math.atan2(math.sin(dec0) + eta * math.cos(dec0), math.hypot(xi, den))
+        return math.degrees(ra) % 360.0, math.degrees(dec)
+
+    def center(self) -> Tuple[float, float]:
+        """(RA, Dec) of the image center, or of the reference pixel if the size is unknown."""
+        if self.image_size is None:
+            return self.pixel_to_radec(*self.crpix)
+        width, height = self.image_size
+        return self.pixel_to_radec(0.5 + width / 2.0, 0.5 + height / 2.0)
+
+    def orientation(self) -> Tuple[float, float, int]:
+        """(roll_deg, plate_scale_arcsec_px, parity) of the linear part of the solution."""
+        return cd_orientation(*self.cd)
+
+
+def _sip_terms(header: dict, prefix: str, order: int) -> Dict[Tuple[int, int], float]:
+    terms = {}
+    for p in range(order + 1):
+        for q in range(order + 1 - p):
+            value = header.get(f"{prefix}_{p}_{q}")
+            if isinstance(value, (int, float)) and value:
+                terms[(p, q)] = float(value)
+    return terms
+
+
+def _sip_poly(terms: Dict[Tuple[int, int], float], u: float, v: float) -> float:
+    return sum(c * u ** p * v ** q for (p, q), c in terms.items())
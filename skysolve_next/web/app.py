@@ -9,13 +9,17 @@ import asyncio
 import threading
 from threading import Lock
 from fastapi import FastAPI, WebSocket, Request, Body, status as http_status, HTTPException, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 from skysolve_next.core.config import settings
 from skysolve_next.core.models import SolveResult
-from pydantic_settings import BaseSettings
+from pydantic import ValidationError
 from skysolve_next.solver.astrometry_solver import AstrometrySolver
 from skysolve_next.core.logging_config import get_logger, get_recent_logs, add_log_listener, remove_log_listener
+from skysolve_next.core.metrics import metrics, read_metrics, to_prometheus
+from skysolve_next.core.shm import shared_preview, shared_status
+from skysolve_next.core.events import COMMAND_SOCKET, EventHub, EventPublisher, event_publisher
+from skysolve_next.publish.trace import TRACE_PATH, decode, format_record, read_trace
 
 # --- Core app and globals ---
 app = FastAPI(title="Skysolve Next", version="0.1.0")
@@ -94,6 +98,13 @@ def write_status(mode, ra, dec, confidence, error=None):
         }
     with open(status_path, "w") as f:
         json.dump(status, f)
+    # Keep the shared-memory status (read by /worker-status) in step
+    shared_status.publish(mode, SolveResult(ra, dec, None, None, confidence), error)
+    snapshot = shared_status.read()
+    if snapshot is not None:
+        event_publisher.publish("solve" if ra is not None and dec is not None else "status", snapshot)
+    if error:
+        event_publisher.publish("error", {"mode": mode, "error": error})
 
 @app.post("/solve")
 def solve(request: Request):
@@ -111,8 +122,9 @@ def solve(request: Request):
     # Determine if we should use a hint
     now = time.time()
     hint = None
-    hint_timeout = getattr(settings.solver, "hint_timeout", 10)
-    solve_radius = getattr(settings.solver, "solve_radius", 20.0)
+    solver_settings = settings.snapshot().solver
+    hint_timeout = getattr(solver_settings, "hint_timeout", 10)
+    solve_radius = getattr(solver_settings, "solve_radius", 20.0)
     if LAST_SOLVE["ra"] is not None and LAST_SOLVE["dec"] is not None and LAST_SOLVE["timestamp"] is not None:
         if now - LAST_SOLVE["timestamp"] <= hint_timeout:
             hint = {"ra": LAST_SOLVE["ra"], "dec": LAST_SOLVE["dec"]}
@@ -126,9 +138,8 @@ def solve(request: Request):
         confidence = result.confidence
         stderr = None
         
-        # Check if solve was actually successful (valid coordinates)
-        solve_successful = (ra_deg is not None and dec_deg is not None and 
-                          ra_deg != 0.0 and dec_deg != 0.0)
+        # Check if solve was actually successful (RA/Dec of 0 are valid coordinates)
+        solve_successful = ra_deg is not None and dec_deg is not None
         
     except Exception as e:
         ra_deg = dec_deg = confidence = None
@@ -136,6 +147,7 @@ def solve(request: Request):
         solve_successful = False
         
     elapsed = time.time() - start_time
+    metrics.observe("web_solve", elapsed)
     mode = STATUS.get("mode", "solve")
     error = stderr if not solve_successful else None
     write_status(mode, ra_deg, dec_deg, confidence, error)
@@ -160,19 +172,27 @@ def solve(request: Request):
 
 from fastapi import HTTPException
 
-@app.get("/solve/image.jpg")
-def get_solve_image():
-    import os
-    if not os.path.exists(SOLVE_IMAGE_PATH):
+def _solve_image_response():
+    # The worker's live preview is in shared memory; an image solved via POST /solve (demo/upload) is on disk.
+    # Serve whichever is newer.
+    preview = shared_preview.read()
+    try:
+        file_mtime = os.path.getmtime(SOLVE_IMAGE_PATH)
+    except OSError:
+        file_mtime = None
+    if preview is not None and (file_mtime is None or preview[1] >= file_mtime):
+        return Response(content=preview[0], media_type="image/jpeg", headers={"Cache-Control": "no-store"})
+    if file_mtime is None:
         raise HTTPException(status_code=404, detail="Solve image not found.")
     return FileResponse(SOLVE_IMAGE_PATH)
 
+@app.get("/solve/image.jpg")
+def get_solve_image():
+    return _solve_image_response()
+
 @app.get("/solve")
 def get_solve_image_legacy():
-    import os
-    if not os.path.exists(SOLVE_IMAGE_PATH):
-        raise HTTPException(status_code=404, detail="Solve image not found.")
-    return FileResponse(SOLVE_IMAGE_PATH)
+    return _solve_image_response()
 
 
 
@@ -204,6 +224,28 @@ def push_onstep():
     # Dummy response for OnStep push
     return {"result": "success", "message": "OnStep push endpoint called."}
 
+# Commands to the worker (goto-and-center runs there, next to the OnStep connection)
+command_publisher = EventPublisher(COMMAND_SOCKET)
+
+@app.post("/onstep/goto", status_code=http_status.HTTP_202_ACCEPTED)
+def onstep_goto(payload: dict = Body(...)):
+    """Start a closed-loop goto-and-center; progress arrives as "goto" events and in /status."""
+    try:
+        ra, dec = float(payload["ra"]), float(payload["dec"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="ra and dec (degrees) are required")
+    if not (0.0 <= ra < 360.0 and -90.0 <= dec <= 90.0):
+        raise HTTPException(status_code=400, detail="ra must be in [0, 360) and dec in [-90, 90]")
+    if not command_publisher.publish("goto", {"ra": ra, "dec": dec}):
+        raise HTTPException(status_code=503, detail="Worker is not accepting mount commands (is OnStep enabled?)")
+    return {"result": "accepted", "ra": ra, "dec": dec}
+
+@app.post("/onstep/goto/cancel", status_code=http_status.HTTP_202_ACCEPTED)
+def onstep_goto_cancel():
+    if not command_publisher.publish("goto_cancel", {}):
+        raise HTTPException(status_code=503, detail="Worker is not accepting mount commands (is OnStep enabled?)")
+    return {"result": "accepted"}
+
 @app.post("/auto-solve")
 def auto_solve(payload: dict):
     # Dummy response for auto-solve toggle
@@ -226,41 +268,47 @@ def get_settings():
 def update_settings(new_settings: dict = Body(...)):
     # Merge each section instead of overwriting
     settings.reload_if_changed()
+    data = settings.model_dump()
     for section, values in new_settings.items():
-        if hasattr(settings, section):
-            current = getattr(settings, section)
-            # If it's a nested Pydantic model and values is a dict, merge fields
-            if isinstance(current, BaseSettings) and isinstance(values, dict):
-                for k, v in values.items():
-                    # Special case for onstep.enabled: always cast to bool
-                    if section == "onstep" and k == "enabled":
-                        setattr(current, k, bool(v) if not isinstance(v, bool) else v)
-                    elif hasattr(current, k):
-                        setattr(current, k, v)
-            else:
-                setattr(settings, section, values)
-    # Special case: ensure onstep.enabled is always merged, even if only 'enabled' is present
-    if 'onstep' in new_settings and isinstance(new_settings['onstep'], dict):
-        if 'enabled' in new_settings['onstep']:
-            settings.onstep.enabled = bool(new_settings['onstep']['enabled'])
-    # Save to settings.json
-    import json
+        if section not in data:
+            continue
+        if isinstance(data[section], dict) and isinstance(values, dict):
+            data[section].update({k: v for k, v in values.items() if k in data[section]})
+        else:
+            data[section] = values
+    # onstep.enabled is always a bool
+    if isinstance(new_settings.get("onstep"), dict) and "enabled" in new_settings["onstep"]:
+        data["onstep"]["enabled"] = bool(new_settings["onstep"]["enabled"])
+    try:
+        validated = type(settings).model_validate(data)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json()))
+    # Written atomically, and the new snapshot is published to this process right away
+    settings.save(validated)
     # Only dump nested structure, not flattened keys
-    def settings_dump():
-        return {
-            "mode": settings.mode,
-            "web_port": settings.web_port,
-            "lx200_port": settings.lx200_port,
-            "solver": settings.solver.model_dump(),
-            "camera": settings.camera.model_dump(),
-            "onstep": settings.onstep.model_dump()
-        }
-    with open("skysolve_next/settings.json", "w") as f:
-        json.dump(settings_dump(), f, indent=2)
-    return settings_dump()
+    return {
+        "mode": settings.mode,
+        "web_port": settings.web_port,
+        "lx200_port": settings.lx200_port,
+        "solver": settings.solver.model_dump(),
+        "camera": settings.camera.model_dump(),
+        "pipeline": settings.pipeline.model_dump(),
+        "onstep": settings.onstep.model_dump(),
+        "lx200": settings.lx200.model_dump()
+    }
+
+# Status older than this means the worker has probably stopped
+WORKER_STATUS_STALE_S = 30
 
 @app.get("/worker-status")
 def worker_status():
+    # Shared-memory status: no file I/O or JSON parsing on the poll path
+    status = shared_status.read()
+    if status is not None:
+        if time.time() - status["updated_at"] > WORKER_STATUS_STALE_S:
+            status["error"] = 'Worker status is stale - worker may not be running'
+        return status
+
     status_path = "skysolve_next/web/worker_status.json"
     if not os.path.exists(status_path):
         return {"error": "No worker status available"}
@@ -274,12 +322,11 @@ def worker_status():
     # Check if status file is recent (updated within last 30 seconds)
     # This is more reliable than process detection for systemd services
     try:
-        import time
         file_mtime = os.path.getmtime(status_path)
         current_time = time.time()
         file_age = current_time - file_mtime
         
-        if file_age > 30:  # File is stale (older than 30 seconds)
+        if file_age > WORKER_STATUS_STALE_S:  # File is stale (older than 30 seconds)
             status['error'] = 'Worker status file is stale - worker may not be running'
         
     except OSError:
@@ -287,14 +334,66 @@ def worker_status():
     
     return status
 
+@app.get("/metrics")
+def get_metrics(format: str = "prometheus"):
+    """Per-stage latency percentiles from the worker and the web process."""
+    worker = read_metrics()
+    worker_stages = worker.get("stages", {}) if worker else {}
+    web_stages = metrics.snapshot()
+    if format == "json":
+        return {
+            "worker": {"timestamp": worker.get("timestamp") if worker else None, "stages": worker_stages},
+            "web": {"stages": web_stages},
+        }
+    lines = [
+        "# HELP skysolve_stage_seconds Duration of each fix stage over the most recent samples.",
+        "# TYPE skysolve_stage_seconds summary",
+    ]
+    for process, stages in (("worker", worker_stages), ("web", web_stages)):
+        if stages:
+            lines.append(to_prometheus(stages, process))
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+@app.get("/lx200/trace")
+def get_lx200_trace(limit: int = 500, format: str = "text"):
+    """Tail of the LX200 traffic trace flushed by the worker (enable with lx200.trace)."""
+    limit = max(1, min(limit, 100000))
+    data = read_trace(TRACE_PATH, limit)
+    if not data and not os.path.exists(TRACE_PATH):
+        raise HTTPException(status_code=404, detail="No LX200 trace recorded; enable lx200.trace in settings")
+    if format == "binary":
+        return Response(content=data, media_type="application/octet-stream",
+                        headers={"Content-Disposition": "attachment; filename=lx200-trace.bin"})
+    lines = [format_record(record) for record in decode(data)]
+    return PlainTextResponse("\n".join(lines) + ("\n" if lines else ""))
+
 @app.get("/status")
 def get_status():
     """Get current application status including mode"""
     settings.reload_if_changed()
-    return {
-        "mode": settings.mode,
+    status = {
+        "mode": settings.snapshot().mode,
         "status": "running"
     }
+    # Solver statistics published by the worker (speculative wins, sharding speedup)
+    worker = shared_status.read()
+    if worker is None:
+        try:
+            with open("skysolve_next/web/worker_status.json", "r") as f:
+                worker = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            worker = {}
+    if worker.get("solver"):
+        status["solver"] = worker["solver"]
+    # OnStep sync state: last delta/outcome and counts
+    if worker.get("onstep"):
+        status["onstep"] = worker["onstep"]
+    if worker.get("goto"):
+        status["goto"] = worker["goto"]
+    # Exposure/gain and binning in use (they change on their own with auto exposure/binning)
+    if worker.get("camera"):
+        status["camera"] = worker["camera"]
+    return status
 
 @app.post("/mode")
 def set_mode(payload: dict = Body(...)):
@@ -323,6 +422,34 @@ def get_logs(count: int = 100):
         traceback.print_exc()
         return {"logs": [], "error": str(e)}
 
+# Worker events, fanned out to /ws/events clients; bound on the first connection
+event_hub = EventHub()
+
+@app.websocket("/ws/events")
+@app.websocket("/events")
+async def websocket_events(websocket: WebSocket):
+    """WebSocket endpoint pushing solve results, status changes and errors as they happen"""
+    await websocket.accept()
+    await event_hub.start()
+    subscription = event_hub.subscribe()
+    try:
+        # Current state first, so the client doesn't wait for the next change
+        status = shared_status.read()
+        if status is not None:
+            await websocket.send_json({"type": "status", "ts": time.time(), "data": status})
+        while True:
+            try:
+                events = await asyncio.wait_for(subscription.next(), timeout=15.0)
+            except asyncio.TimeoutError:
+                await websocket.send_json({"type": "ping"})
+                continue
+            for event in events:
+                await websocket.send_json(event)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        event_hub.unsubscribe(subscription)
+
 @app.websocket("/ws/logs")
 async def websocket_logs(websocket: WebSocket):
     """WebSocket endpoint for real-time log streaming"""
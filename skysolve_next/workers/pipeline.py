@@ -0,0 +1,242 @@
+"""
+Staged capture → solve → publish pipeline for the solve worker.
+
+Each stage runs in its own thread (the solve stage in a small pool of threads)
+and hands work to the next stage through a bounded queue that drops the oldest
+item when full. A new exposure therefore starts as soon as the previous frame
+has been handed off, and a slow solver never builds up a backlog of stale
+frames (see docs/camera_capture_requirements.md, section 1.5).
+
+Per-stage queue depth, drop counts, queue dwell time and service time are
+tracked so the bottleneck stage is visible in the worker status.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from skysolve_next.core.logging_config import get_logger
+
+T = TypeVar("T")
+
+# Smoothing factor for the exponentially weighted stage timings
+_EWMA_ALPHA = 0.2
+
+
+class DropOldestQueue(Generic[T]):
+    """Bounded thread-safe queue that discards the oldest item when full.
+
+    Items are stored together with their enqueue time so the consumer can
+    measure how long they waited (dwell time).
+    """
+
+    def __init__(self, maxsize: int = 1) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items: Deque[Tuple[float, T]] = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item: T) -> Optional[T]:
+        """Enqueue ``item``; returns the item that was dropped to make room, if any."""
+        dropped = None
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()[1]
+                self.dropped += 1
+            self._items.append((time.monotonic(), item))
+            self._cond.notify()
+        return dropped
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[T, float]]:
+        """Dequeue the oldest item and its dwell time in seconds, or None on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout=timeout):
+                return None
+            enqueued_at, item = self._items.popleft()
+        return item, time.monotonic() - enqueued_at
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+
+class StageStats:
+    """Throughput and latency counters for one pipeline stage."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.processed = 0
+        self.errors = 0
+        self.last_service_s: Optional[float] = None
+        self.avg_service_s: Optional[float] = None
+        self.avg_dwell_s: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _ewma(prev: Optional[float], value: float) -> float:
+        return value if prev is None else prev + _EWMA_ALPHA * (value - prev)
+
+    def record(self, service_s: float, dwell_s: Optional[float] = None, error: bool = False) -> None:
+        with self._lock:
+            self.processed += 1
+            if error:
+                self.errors += 1
+            self.last_service_s = service_s
+            self.avg_service_s = self._ewma(self.avg_service_s, service_s)
+            if dwell_s is not None:
+                self.avg_dwell_s = self._ewma(self.avg_dwell_s, dwell_s)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "processed": self.processed,
+                "errors": self.errors,
+                "last_service_s": _round(self.last_service_s),
+                "avg_service_s": _round(self.avg_service_s),
+                "avg_dwell_s": _round(self.avg_dwell_s),
+            }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 4)
+
+
+@dataclass
+class PipelineItem:
+    """Envelope carrying a payload through the pipeline in capture order."""
+    seq: int
+    created_at: float
+    payload: Any
+
+
+class SolvePipeline:
+    """Runs capture, solve and publish callables as overlapping stages.
+
+    ``capture`` is called repeatedly by the capture thread and returns a payload
+    to solve, or None when there is nothing to hand off (e.g. in test mode).
+    ``solve`` runs on one of ``solve_workers`` threads and its return value is
+    passed to ``publish`` on the publish thread. Results that complete out of
+    order are discarded in favour of the newest one already published.
+    """
+
+    def __init__(
+        self,
+        capture: Callable[[], Any],
+        solve: Callable[[Any], Any],
+        publish: Callable[[Any], None],
+        solve_workers: int = 1,
+        solve_queue_size: int = 1,
+        publish_queue_size: int = 4,
+    ) -> None:
+        self._capture = capture
+        self._solve = solve
+        self._publish = publish
+        self.solve_workers = max(1, int(solve_workers))
+        self.solve_queue: DropOldestQueue[PipelineItem] = DropOldestQueue(solve_queue_size)
+        self.publish_queue: DropOldestQueue[PipelineItem] = DropOldestQueue(publish_queue_size)
+        self.stages = {name: StageStats(name) for name in ("capture", "solve", "publish")}
+        self.stale_results = 0
+        self._seq = 0
+        self._last_published_seq = -1
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.logger = get_logger("pipeline", "worker")
+
+    def start(self) -> None:
+        """Start the capture, solve and publish threads."""
+        self._stop.clear()
+        targets = [("capture", self._capture_loop)]
+        targets += [(f"solve-{i}", self._solve_loop) for i in range(self.solve_workers)]
+        targets += [("publish", self._publish_loop)]
+        for name, target in targets:
+            t = threading.Thread(target=target, name=f"pipeline-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        self.logger.info(f"Pipeline started with {self.solve_workers} solve worker(s)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal all stages to stop and wait for their threads to exit."""
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+
+    def run_forever(self) -> None:
+        """Start the pipeline and block the calling thread until stopped."""
+        self.start()
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        finally:
+            self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage queue depth, drops, dwell and service times."""
+        snap = {name: stage.snapshot() for name, stage in self.stages.items()}
+        snap["solve"].update(queue_depth=self.solve_queue.qsize(), dropped=self.solve_queue.dropped)
+        snap["publish"].update(
+            queue_depth=self.publish_queue.qsize(),
+            dropped=self.publish_queue.dropped,
+            stale=self.stale_results,
+        )
+        return snap
+
+    def _capture_loop(self) -> None:
+        stats = self.stages["capture"]
+        while not self._stop.is_set():
+            start = time.monotonic()
+            try:
+                payload = self._capture()
+            except Exception as e:
+                self.logger.error(f"Capture stage error: {e}", exc_info=True)
+                stats.record(time.monotonic() - start, error=True)
+                self._stop.wait(1.0)
+                continue
+            if payload is None:
+                continue
+            stats.record(time.monotonic() - start)
+            item = PipelineItem(seq=self._seq, created_at=time.time(), payload=payload)
+            self._seq += 1
+            if self.solve_queue.put(item) is not None:
+                self.logger.debug("Solve stage busy; dropped oldest pending frame")
+
+    def _solve_loop(self) -> None:
+        stats = self.stages["solve"]
+        while not self._stop.is_set():
+            got = self.solve_queue.get(timeout=0.5)
+            if got is None:
+                continue
+            item, dwell = got
+            start = time.monotonic()
+            try:
+                result = self._solve(item.payload)
+            except Exception as e:
+                self.logger.error(f"Solve stage error: {e}", exc_info=True)
+                stats.record(time.monotonic() - start, dwell, error=True)
+                continue
+            stats.record(time.monotonic() - start, dwell)
+            self.publish_queue.put(PipelineItem(item.seq, item.created_at, result))
+
+    def _publish_loop(self) -> None:
+        stats = self.stages["publish"]
+        while not self._stop.is_set():
+            got = self.publish_queue.get(timeout=0.5)
+            if got is None:
+                continue
+            item, dwell = got
+            if item.seq < self._last_published_seq:
+                self.stale_results += 1
+                continue
+            self._last_published_seq = item.seq
+            start = time.monotonic()
+            try:
+                self._publish(item.payload)
+            except Exception as e:
+                self.logger.error(f"Publish stage error: {e}", exc_info=True)
+                stats.record(time.monotonic() - start, dwell, error=True)
+                continue
+            stats.record(time.monotonic() - start, dwell)
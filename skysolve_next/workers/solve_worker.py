@@ -1,15 +1,31 @@
 import time, math, os, sys
 import logging
+import threading
 import numpy as np
 import json
 import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple
 from skysolve_next.core.config import settings
+from skysolve_next.camera.controls import CameraControlManager
+from skysolve_next.camera.preview import PreviewEncoder, fit_size, preview_size, yuv420_luma
+from skysolve_next.camera.stream import FrameStream
+from skysolve_next.camera.binning import AutoBinning, bin_frame, output_size, parse_size, pick_sensor_mode, scaler_crop
+from skysolve_next.camera import raw
+from skysolve_next.camera.autoexposure import AutoExposure
 from skysolve_next.core.models import SolveResult
 from skysolve_next.solver.tetra3_solver import Tetra3Solver
 from skysolve_next.solver.astrometry_solver import AstrometrySolver
+from skysolve_next.solver.starfinder import StarField, find_stars
 from skysolve_next.publish.lx200_server import LX200Server
 from skysolve_next.mounts.onstep.lx200 import OnStepClient
+from skysolve_next.mounts.onstep.sync import SyncScheduler
+from skysolve_next.mounts.onstep.goto import GotoCenter, LatestSolve
 from skysolve_next.core.logging_config import get_logger, set_log_level
+from skysolve_next.core.metrics import metrics
+from skysolve_next.core.shm import shared_status
+from skysolve_next.core.events import CommandListener, event_publisher
+from skysolve_next.workers.pipeline import SolvePipeline
 
 # Initialize centralized logging
 set_log_level(getattr(settings.logging, 'level', settings.log_level))
@@ -26,8 +42,6 @@ except ImportError as e:
 print(f"[DIAG] PICAMERA2_AVAILABLE: {PICAMERA2_AVAILABLE}")
 print(f"[DIAG] sys.platform: {sys.platform}")
 
-IMAGE_PATH = "skysolve_next/web/solve/last_image.jpg"
-PREVIEW_PATH = "skysolve_next/web/solve/image.jpg"
 STATUS_PATH = "skysolve_next/web/worker_status.json"
 
 class CameraCapture:
@@ -36,34 +50,190 @@ class CameraCapture:
         self.latest_frame = None
         self.last_error = None
         self.picam = None
+        self.controls = None
+        self.stream = None
+        self._stream_seq = 0
+        self.last_captured_at = None
+        self._controls_dirty = False
+        self._reconfigure = False
+        self.binning = getattr(self._camera_settings(), "binning", 1)
+        self._configured_binning = self.binning  # binning of the running camera configuration
+        self.frame_binning = self.binning  # binning of the frame capture() last returned
+        self.frame_scale = float(self.binning)  # image_size pixels per pixel of that frame
+        self.frame_saturation = None  # saturated pixel value of that frame, when not the dtype's maximum
+        self._streams = ("main", "lores")  # (frame, preview)
+        self._raw_mode = None
+        self._config = None  # last configuration the camera accepted
+        self._preview_size = preview_size()
+        self.auto_exposure = AutoExposure(*self._manual_exposure())
+        self.frame_exposure = None  # (seconds, gain) the frame capture() last returned was taken with
+        self.auto_binning = AutoBinning(self.binning)
         self.is_pi = PICAMERA2_AVAILABLE and sys.platform.startswith("linux")
         self.logger = get_logger("camera_capture", "camera")
+        self.preview = PreviewEncoder()
+        self.preview.start()
         self.logger.info(f"[DIAG] CameraCapture init: is_pi={self.is_pi}, PICAMERA2_AVAILABLE={PICAMERA2_AVAILABLE}, sys.platform={sys.platform}")
         if self.is_pi:
             try:
                 from picamera2 import Picamera2
                 self.picam = Picamera2()
-                cam_settings = self.settings.camera
-                size = tuple(map(int, cam_settings.image_size.split("x")))
-                config = self.picam.create_still_configuration(main={"size": size, "format": "RGB888"}, buffer_count=2)
-                # config = self.picam.create_still_configuration(main={"size": size, "format": "RGB888"})
-                self.picam.configure(config)
-                self.picam.set_controls({
-                    "ExposureTime": int(float(cam_settings.shutter_speed) * 1e6),
-                    "AnalogueGain": float(cam_settings.iso_speed) / 100.0,
-                    "AeEnable": False
-                })
+                self._configure()
                 try:
                     self.picam.exposure_mode = 'off'
                 except Exception as e:
                     self.logger.warning(f"exposure_mode could not be set: {e}")
-                self.picam.start()
+                self._start()
+                # Push new exposure/gain only when the camera section actually changes
+                self.settings.subscribe(self._on_camera_settings, "camera")
                 self.logger.info("Picamera2 initialized and started successfully.")
             except Exception as e:
                 self.last_error = f"Picamera2 init failed: {e}"
                 self.is_pi = False
                 self.logger.error(f"[DIAG] {self.last_error}")
 
+    def _camera_settings(self):
+        """Camera section of the current settings snapshot, read once per use so its values belong together."""
+        snapshot = getattr(self.settings, "snapshot", None)
+        return (snapshot() if snapshot is not None else self.settings).camera
+
+    def _configure(self):
+        cam_settings = self._camera_settings()
+        binning = self.binning
+        full_size = parse_size(cam_settings.image_size)
+        size = output_size(full_size, binning, cam_settings.roi)
+        if cam_settings.format == "raw":
+            streams, names, raw_mode = self._raw_streams(full_size, binning)
+            mode, preview = raw_mode, preview_size()
+        else:
+            # Main stream for solving, small lores stream (YUV420) for the UI preview, never larger than main
+            preview = fit_size(preview_size(), size)
+            streams = {"main": {"size": size, "format": "RGB888"},
+                       "lores": {"size": preview, "format": "YUV420"}}
+            names, raw_mode = ("main", "lores"), None
+            # Read out a binned sensor mode when one covers the (uncropped) binned frame
+            mode = pick_sensor_mode(self.picam.sensor_modes, output_size(full_size, binning))
+        if mode is not None:
+            streams["sensor"] = {"output_size": mode["size"], "bit_depth": mode["bit_depth"]}
+        if cam_settings.continuous:
+            # Free-running sensor with a buffer ring: exposures continue while frames are solved
+            config = self.picam.create_video_configuration(**streams, buffer_count=cam_settings.buffer_count)
+        else:
+            config = self.picam.create_still_configuration(**streams, buffer_count=2)
+        self.picam.configure(config)
+        # Only a configuration the camera accepted describes the frames from now on
+        self._config = config
+        self._streams, self._raw_mode, self._preview_size = names, raw_mode, preview
+        self._configured_binning = binning
+        # A new configuration starts from scratch, so every control is sent again
+        self.controls = CameraControlManager(self.picam)
+        self.controls.apply(self._requested_controls())
+        self.logger.info(f"Camera configured: {cam_settings.format} {size[0]}x{size[1]}, "
+                         f"binning {binning}x{binning}, sensor mode {mode['size'] if mode else 'default'}, "
+                         f"roi {cam_settings.roi}")
+
+    def _raw_streams(self, full_size, binning):
+        """Raw stream for solving; the ISP only produces the small main stream, for the preview."""
+        modes = self.picam.sensor_modes
+        colour = raw.bayer_order(modes[0]["unpacked"]) is not None
+        # A Bayer frame is reduced 2x2, so read out a mode twice the binned size when there is one
+        factor = 2 if colour else 1
+        width, height = output_size(full_size, binning)
+        mode = pick_sensor_mode(modes, (width * factor, height * factor)) or \
+            max(modes, key=lambda m: m["size"][0] * m["size"][1])
+        streams = {"main": {"size": preview_size(), "format": "YUV420"},
+                   "raw": {"size": mode["size"], "format": mode["unpacked"]}}
+        return streams, ("raw", "main"), mode
+
+    def _start(self):
+        self.picam.start()
+        if self._camera_settings().continuous:
+            self.stream = FrameStream(self.picam, self.controls, self._streams)
+            self.stream.start()
+            self._stream_seq = 0
+
+    def _restart(self):
+        """Reconfigure for a new binning/ROI/size; the sensor has to stop for a mode change."""
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+        self.picam.stop()
+        try:
+            self._configure()
+        except Exception as e:
+            if self._config is None:
+                raise
+            # Keep running with the last configuration the camera accepted rather than stay stopped
+            self.logger.error(f"Camera reconfiguration failed, keeping binning "
+                              f"{self._configured_binning}x{self._configured_binning}: {e}")
+            self.binning = self.auto_binning.binning = self._configured_binning
+            self.picam.configure(self._config)
+            self.controls = CameraControlManager(self.picam)
+            self.controls.apply(self._requested_controls())
+        self._start()
+
+    def _on_camera_settings(self, changes):
+        self.logger.debug(f"Camera settings changed: {sorted(changes)}")
+        if "camera.binning" in changes:
+            self.binning = self._camera_settings().binning
+            self.auto_binning.binning = self.binning
+        if any(path in changes for path in ("camera.shutter_speed", "camera.iso_speed", "camera.auto_exposure")):
+            # Auto exposure starts over from the manual values
+            self.auto_exposure = AutoExposure(*self._manual_exposure())
+        if any(path in changes for path in ("camera.binning", "camera.roi", "camera.image_size", "camera.format",
+                                            "camera.preview_size", "camera.continuous", "camera.buffer_count")):
+            self._reconfigure = True
+        else:
+            self._controls_dirty = True
+
+    def observe_frame(self, binning, field, solved, white_level, exposure):
+        """Feed the stars of a solved frame to auto binning and auto exposure."""
+        cam_settings = self._camera_settings()
+        if getattr(cam_settings, "auto_binning", False):
+            target = self.auto_binning.observe(binning, len(field))
+            if target is not None:
+                self.binning = target
+                self._reconfigure = True
+        if getattr(cam_settings, "auto_exposure", False):
+            if self.auto_exposure.observe(field, solved, white_level, exposure) is not None:
+                self._controls_dirty = True
+
+    def _manual_exposure(self):
+        cam_settings = self._camera_settings()
+        # Parse shutter and ISO
+        shutter = self._parse_shutter(getattr(cam_settings, "shutter_speed", 1))
+        iso_val = getattr(cam_settings, "iso_speed", 100)
+        return shutter, float(iso_val) / 100.0
+
+    def current_exposure(self):
+        """(seconds, analogue gain) requested from the sensor: auto exposure's, or the manual settings."""
+        if getattr(self._camera_settings(), "auto_exposure", False):
+            return self.auto_exposure.exposure_s, self.auto_exposure.gain
+        return self._manual_exposure()
+
+    def stats(self):
+        exposure_s, gain = self.current_exposure()
+        return {"binning": self.binning, "exposure_s": exposure_s, "gain": gain,
+                "auto_exposure": self.auto_exposure.last_decision
+                if getattr(self._camera_settings(), "auto_exposure", False) else None}
+
+    def _requested_controls(self):
+        cam_settings = self._camera_settings()
+        shutter, gain = self.current_exposure()
+        controls = {
+            "ExposureTime": int(shutter * 1e6),
+            "AnalogueGain": gain,
+            "AeEnable": False
+        }
+        if getattr(cam_settings, "continuous", False):
+            # Video configurations cap the frame duration (and so the exposure) at the video frame rate
+            controls["FrameDurationLimits"] = (controls["ExposureTime"], controls["ExposureTime"])
+        roi = getattr(cam_settings, "roi", None)
+        if roi and self.picam is not None:
+            props = self.picam.camera_properties
+            crop_max = props.get("ScalerCropMaximum") or (0, 0, *props["PixelArraySize"])
+            controls["ScalerCrop"] = scaler_crop(roi, crop_max)
+        return controls
+
     def configure_camera(self):
         # No longer used; configuration is done once in __init__
         pass
@@ -86,23 +256,35 @@ class CameraCapture:
         self.logger.debug("Starting image capture...")
         if self.is_pi and self.picam:
             try:
-                # Reload camera settings before each capture
+                # Cheap unless settings.json changed; marks the controls dirty via _on_camera_settings
                 self.settings.reload_if_changed()
-                cam_settings = self.settings.camera
-                # Parse shutter and ISO
-                shutter_val = getattr(cam_settings, "shutter_speed", 1)
-                shutter = self._parse_shutter(shutter_val)
-                iso_val = getattr(cam_settings, "iso_speed", 100)
-                # Update controls if changed
-                controls = {
-                    "ExposureTime": int(shutter * 1e6),
-                    "AnalogueGain": float(iso_val) / 100.0,
-                    "AeEnable": False
-                }
-                self.picam.set_controls(controls)
-                self.logger.debug(f"Set camera controls: {controls}")
-                frame = self.picam.capture_array()
-                self.save_frame(frame)
+                if self._reconfigure:
+                    # Cleared only once the camera runs again, so a failed restart is retried
+                    self._restart()
+                    self._reconfigure = self._controls_dirty = False
+                if self._controls_dirty:
+                    self._controls_dirty = False
+                    # Only the controls that differ from the active ones are sent
+                    self.controls.apply(self._requested_controls())
+                if self.stream is not None:
+                    arrays, metadata = self._take_from_stream()
+                else:
+                    # Frames still in flight from before a change have the old exposure; skip them
+                    captured, metadata = self.controls.capture(self._streams)
+                    while captured is None:
+                        captured, metadata = self.controls.capture(self._streams)
+                    arrays = dict(zip(self._streams, captured))
+                    self.last_captured_at = time.time()
+                frame = self._frame_from(arrays[self._streams[0]])
+                # self.binning may already name the next mode (auto binning runs on the publish thread)
+                self.frame_binning = self._configured_binning
+                if "ExposureTime" in metadata and "AnalogueGain" in metadata:
+                    self.frame_exposure = (metadata["ExposureTime"] / 1e6, float(metadata["AnalogueGain"]))
+                else:
+                    self.frame_exposure = None
+                self.logger.debug(f"Frame metadata: ExposureTime={metadata.get('ExposureTime')}, "
+                                  f"AnalogueGain={metadata.get('AnalogueGain')}")
+                self.save_frame(yuv420_luma(arrays[self._streams[1]], *self._preview_size))
                 self.latest_frame = frame
                 self.last_error = None
                 self.logger.info("Image captured successfully.")
@@ -121,10 +303,15 @@ class CameraCapture:
                 if frame is None:
                     raise Exception("Demo image not found or unreadable")
                 # Simulate shutter speed delay
-                shutter = float(getattr(self.settings.camera, "shutter_speed", "1"))
-                time.sleep(max(0.01, shutter))
+                self.frame_exposure = self.current_exposure()
+                time.sleep(max(0.01, self.frame_exposure[0]))
+                binning = self.binning
+                frame = bin_frame(frame, binning, getattr(self._camera_settings(), "roi", None))
+                self.frame_binning = binning
+                self.frame_scale, self.frame_saturation = float(binning), None
                 self.save_frame(frame)
                 self.latest_frame = frame
+                self.last_captured_at = time.time()
                 self.logger.info("Demo image loaded successfully.")
             except Exception as e:
                 self.last_error = f"Demo image load failed: {e}"
@@ -133,35 +320,32 @@ class CameraCapture:
                 self.latest_frame = frame
             return frame
 
+    def _take_from_stream(self):
+        """The freshest frame not handed out yet; waits only if the ring has nothing new."""
+        # Auto exposure may run longer than the manual shutter speed
+        timeout = max(5.0, 3 * self.current_exposure()[0])
+        taken = self.stream.latest(self._stream_seq, timeout=timeout)
+        if taken is None:
+            raise RuntimeError(self.stream.last_error or f"No frame from the camera within {timeout:.0f} s")
+        self._stream_seq = taken.seq
+        self.last_captured_at = taken.captured_at
+        return taken.arrays, taken.metadata
+
+    def _frame_from(self, data):
+        """The frame for the solver from the captured frame stream (RGB888 main or raw)."""
+        if self._raw_mode is None:
+            self.frame_scale, self.frame_saturation = float(self._configured_binning), None
+            return data
+        cam_settings = self._camera_settings()
+        mode_width = self._raw_mode["size"][0]
+        frame, self.frame_saturation, factor = raw.extract(data, self._raw_mode["unpacked"], mode_width,
+                                                           cam_settings.raw_extraction, cam_settings.roi)
+        self.frame_scale = parse_size(cam_settings.image_size)[0] / mode_width * factor
+        return frame
+
     def save_frame(self, frame):
-        try:
-            import cv2
-            import shutil
-            cv2.imwrite(IMAGE_PATH, frame)
-            self.logger.debug(f"Preview image saved to {IMAGE_PATH}")
-            # Also copy to image.jpg for UI preview
-            try:
-                shutil.copyfile(IMAGE_PATH, PREVIEW_PATH)
-                self.logger.debug(f"Preview image copied to {PREVIEW_PATH}")
-            except Exception as copy_e:
-                self.logger.error(f"Failed to copy preview to {PREVIEW_PATH}: {copy_e}")
-        except Exception as e:
-            self.last_error = f"Preview save failed: {e}"
-            self.logger.error(self.last_error)
-            # Fallback: save as raw bytes
-            try:
-                with open(IMAGE_PATH, "wb") as f:
-                    f.write(frame.tobytes())
-                self.logger.debug(f"Preview image saved as raw bytes to {IMAGE_PATH}")
-                # Also try to copy as raw bytes
-                try:
-                    shutil.copyfile(IMAGE_PATH, PREVIEW_PATH)
-                    self.logger.debug(f"Raw preview image copied to {PREVIEW_PATH}")
-                except Exception as copy_e:
-                    self.logger.error(f"Failed to copy raw preview to {PREVIEW_PATH}: {copy_e}")
-            except Exception as e2:
-                self.last_error = f"Preview save failed: {e}; fallback failed: {e2}"
-                self.logger.error(self.last_error)
+        """Hand a frame to the UI preview; it is encoded and published off the capture path."""
+        self.preview.submit(frame)
 
     def get_latest_frame(self):
         return self.latest_frame
@@ -169,7 +353,47 @@ class CameraCapture:
     def get_last_error(self):
         return self.last_error
 
-def write_status(mode, res, error=None):
+# Capture (test mode) and publish stages may both write the status file
+_status_lock = threading.Lock()
+# The JSON status file is only a fallback for readers without the shared-memory status
+STATUS_FILE_INTERVAL = 5.0
+_status_file_written = {"at": 0.0}
+# Mode/error last announced on the event bus
+_last_event = {"mode": None, "error": None}
+
+def write_status(mode, res, error=None, pipeline=None, solver=None, onstep=None, goto=None, camera=None):
+    with _status_lock, metrics.timer("status_write"):
+        stats = {k: v for k, v in (("pipeline", pipeline), ("solver", solver), ("onstep", onstep), ("goto", goto),
+                                   ("camera", camera))
+                 if v is not None}
+        shared_status.publish(mode, res, error, stats or None)
+        _publish_events(mode, res, error)
+        now = time.time()
+        if now - _status_file_written["at"] >= STATUS_FILE_INTERVAL:
+            _status_file_written["at"] = now
+            snapshot = shared_status.read()
+            if snapshot is None:
+                _write_status(mode, res, error, pipeline, solver, onstep)
+            else:
+                # Mirror the shared-memory status, which already carries the last good pointing
+                tmp_path = STATUS_PATH + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, STATUS_PATH)
+
+def _publish_events(mode, res, error):
+    """Push new solves, mode/error changes and errors to the web UI."""
+    solved = mode == "solve" and getattr(res, "ra_deg", None) is not None
+    changed = mode != _last_event["mode"] or error != _last_event["error"]
+    if solved or changed:
+        snapshot = shared_status.read()
+        if snapshot is not None:
+            event_publisher.publish("solve" if solved else "status", snapshot)
+    if error and error != _last_event["error"]:
+        event_publisher.publish("error", {"mode": mode, "error": error})
+    _last_event.update(mode=mode, error=error)
+
+def _write_status(mode, res, error, pipeline, solver, onstep=None):
     import os
     # Load previous status if exists
     if os.path.exists(STATUS_PATH):
@@ -200,38 +424,174 @@ def write_status(mode, res, error=None):
             "confidence": prev.get("confidence"),
             "error": error
         }
+    # Per-stage pipeline statistics (queue depth, dwell/service times)
+    status["pipeline"] = pipeline if pipeline is not None else prev.get("pipeline")
+    # Solver statistics (e.g. which speculative path wins)
+    status["solver"] = solver if solver is not None else prev.get("solver")
+    status["onstep"] = onstep if onstep is not None else prev.get("onstep")
     with open(STATUS_PATH, "w") as f:
         json.dump(status, f)
 
 
-    pass  # Removed for single-threaded mode
+@dataclass
+class CapturedFrame:
+    """A frame handed from the capture stage to the solve stage."""
+    image: np.ndarray
+    mode: str
+    capture_error: Optional[str] = None
+    captured_at: Optional[float] = None
+    binning: int = 1
+    pixel_scale: Optional[float] = None  # camera.image_size pixels per frame pixel (plate scale factor)
+    saturation: Optional[float] = None  # saturated pixel value, if not the dtype's maximum
+    exposure: Optional[Tuple[float, float]] = None  # (seconds, analogue gain) the frame was taken with
+
+
+@dataclass
+class SolveOutcome:
+    """Result handed from the solve stage to the publish stage."""
+    mode: str
+    result: SolveResult
+    error: Optional[str]
+    confidence: float
+    captured_at: Optional[float] = None  # when the solved frame was taken
+    binning: int = 1
+    field: Optional[StarField] = None  # stars found in the frame
+    white_level: Optional[float] = None  # value of a saturated pixel in the frame
+    exposure: Optional[Tuple[float, float]] = None
+
+
+class SolveHints:
+    """Last good solve position, shared by the solve and publish stages."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ra = None
+        self.dec = None
+
+    def get(self):
+        with self._lock:
+            return self.ra, self.dec
+
+    def update(self, ra, dec):
+        with self._lock:
+            self.ra = ra
+            self.dec = dec
+
+
+def _empty_result():
+    return SolveResult(ra_deg=None, dec_deg=None, roll_deg=None, plate_scale_arcsec_px=None, confidence=None)
+
+
+_solvers = {"key": None, "primary": None, "fallback": None}
+_solvers_lock = threading.Lock()
+# Stars extracted per frame; each solver uses the brightest of these it needs
+STAR_LIMIT = 200
+
+def expected_fov():
+    """Horizontal field of view (deg) for Tetra3, narrowed by the camera ROI."""
+    cfg = settings.snapshot()
+    fov = cfg.solver.fov_estimate
+    if fov and cfg.camera.roi:
+        fov *= cfg.camera.roi[2]
+    return fov
+
+def _make_tetra3_solver():
+    solver_settings = settings.snapshot().solver
+    return Tetra3Solver(
+        database=solver_settings.tetra3_database,
+        fov_estimate=expected_fov(),
+        fov_max_error=solver_settings.fov_max_error,
+    )
+
+def expected_plate_scale(pixel_scale=1):
+    """Plate scale (arcsec/px) from settings, or from the camera's focal length and pixel size.
+
+    Both describe ``camera.image_size`` pixels; a pixel of a binned or raw frame spans ``pixel_scale`` of them.
+    """
+    cfg = settings.snapshot()
+    if cfg.solver.plate_scale:
+        return cfg.solver.plate_scale * pixel_scale
+    focal_length, pixel_size = cfg.camera.focal_length_mm, cfg.camera.pixel_size_um
+    if focal_length and pixel_size:
+        return 206.265 * pixel_size * pixel_scale / focal_length
+    return None
+
+def _make_astrometry_solver():
+    solver_settings = settings.snapshot().solver
+    return AstrometrySolver(
+        backend=solver_settings.astrometry_backend,
+        index_dirs=solver_settings.index_dirs,
+        # Per camera.image_size pixel; each solve passes the frame's pixel scale
+        plate_scale=expected_plate_scale(),
+        scale_tolerance=solver_settings.scale_tolerance,
+        speculative=solver_settings.speculative,
+        parallel_shards=solver_settings.parallel_shards,
+    )
 
-def process_solve_mode(camera, last_ra, last_dec):
+def _solver_key():
+    solver_settings = settings.snapshot().solver
+    return (solver_settings.type, solver_settings.astrometry_backend, tuple(solver_settings.index_dirs),
+            expected_plate_scale(), expected_fov(), solver_settings.scale_tolerance,
+            solver_settings.speculative, solver_settings.parallel_shards)
+
+def get_solvers():
+    """Return the (primary, fallback) solvers, built once and rebuilt only when solver settings change.
+
+    Binning doesn't rebuild them: the frame's pixel scale is passed to every solve, so a plate scale
+    the astrometry solver learned still holds after a switch.
+    """
+    with _solvers_lock:
+        solver_type = settings.snapshot().solver.type
+        key = _solver_key()
+        if _solvers["key"] != key:
+            if solver_type == "tetra3":
+                primary = _make_tetra3_solver()
+                fallback = _make_astrometry_solver()
+            else:
+                primary = _make_astrometry_solver()
+                fallback = _make_tetra3_solver()
+            # Load the pattern database / index files up front so the first frame doesn't pay for it
+            primary.load()
+            _solvers.update(key=key, primary=primary, fallback=fallback)
+        return _solvers["primary"], _solvers["fallback"]
+
+def solver_stats():
+    """Stats of the primary solver if it's built; never builds or loads one."""
+    primary = _solvers["primary"]
+    if primary is None:
+        return None
+    try:
+        return primary.stats()
+    except Exception as e:
+        get_logger("solve_worker_main", "worker").warning(f"Solver stats unavailable: {e}")
+        return None
+
+def extract_stars(frame, saturation=None):
+    """Find the stars of a frame once, for the solver and for auto binning."""
+    with metrics.timer("star_extraction"):
+        return find_stars(frame, max_stars=STAR_LIMIT, saturation=saturation)
+
+def solve_frame(frame, last_ra, last_dec, pixel_scale=1):
+    """Run the configured solver on an already captured frame (or its extracted StarField)."""
     logger = get_logger("solve_worker_main", "worker")
-    
-    logger.info("Solve mode: capturing frame and running solver.")
-    frame = camera.capture()
     error = None
     # initialize solve result
-    res = SolveResult(ra_deg=None, dec_deg=None, roll_deg=None, plate_scale_arcsec_px=None, confidence=None)
+    res = _empty_result()
     
     try:
         # Choose primary and fallback solvers
-        if settings.solver.type == "tetra3":
-            primary = Tetra3Solver()
-            fallback = AstrometrySolver()
-        else:
-            primary = AstrometrySolver()
-            fallback = Tetra3Solver()
+        primary, fallback = get_solvers()
         
         logger.info("Running primary solver...")
-        input_data = IMAGE_PATH
+        # Hand the numpy frame straight to the solver (no JPEG round-trip)
+        input_data = frame
         
         # Use hints if available
         if last_ra is not None and last_dec is not None:
-            res = primary.solve(input_data, ra_hint=last_ra, dec_hint=last_dec, radius_hint=settings.solver.solve_radius)
+            res = primary.solve(input_data, ra_hint=last_ra, dec_hint=last_dec, radius_hint=settings.snapshot().solver.solve_radius,
+                                pixel_scale=pixel_scale)
         else:
-            res = primary.solve(input_data)
+            res = primary.solve(input_data, pixel_scale=pixel_scale)
         
         logger.info(f"Primary solver result: confidence={getattr(res, 'confidence', None)}")
         
@@ -246,72 +606,127 @@ def process_solve_mode(camera, last_ra, last_dec):
         
     except Exception as e:
         error = f"Solver error: {e}"
-        camera.last_error = error
         logger.error(error)
         conf_val = 0.0
     
     return res, error, conf_val
 
 
-def run_solve_loop(camera, lx200, onstep):
+def build_pipeline(camera, lx200, sync, goto=None, solves=None):
+    """Wire the capture, solve and publish stages of the worker into a SolvePipeline."""
     logger = get_logger("solve_worker_main", "worker")
-    
-    last_ra = None
-    last_dec = None
-    last_mode = settings.mode
-    
-    while True:
+    hints = SolveHints()
+    state = {"mode": settings.mode, "pipeline": None}
+
+    def capture_stage():
+        settings.reload_if_changed()
+        mode = settings.snapshot().mode.lower()
+        
+        # Check for mode changes
+        if mode != state["mode"]:
+            logger.info(f"Mode changed: {state['mode']} -> {mode}")
+            state["mode"] = mode
+        
+        if mode == "test":
+            write_status(mode, _empty_result(), None, state["pipeline"].stats())
+            time.sleep(1.0)
+            return None
+        
+        with metrics.timer("capture"):
+            frame = camera.capture()
+        # With continuous capture the frame may have completed before capture() was called
+        captured_at = getattr(camera, "last_captured_at", None) or time.time()
+        return CapturedFrame(image=frame, mode=mode, capture_error=camera.get_last_error(),
+                             captured_at=captured_at, binning=getattr(camera, "frame_binning", 1),
+                             pixel_scale=getattr(camera, "frame_scale", None),
+                             saturation=getattr(camera, "frame_saturation", None),
+                             exposure=getattr(camera, "frame_exposure", None))
+
+    def solve_stage(captured):
+        if captured.mode != "solve":
+            # Align mode: frame is only captured for the preview
+            return SolveOutcome(captured.mode, _empty_result(), None, 0.0)
+        last_ra, last_dec = hints.get()
+        with metrics.timer("solve_total"):
+            field = extract_stars(captured.image, captured.saturation)
+            res, error, conf_val = solve_frame(field, last_ra, last_dec, captured.pixel_scale or captured.binning)
+        white_level = captured.saturation
+        if white_level is None:
+            image = captured.image
+            white_level = float(np.iinfo(image.dtype).max) if np.issubdtype(image.dtype, np.integer) else 1.0
+        return SolveOutcome(captured.mode, res, error or captured.capture_error, conf_val, captured.captured_at,
+                            captured.binning, field, white_level, captured.exposure)
+
+    def publish_stage(outcome):
+        with metrics.timer("publish"):
+            _publish(outcome)
         try:
-            settings.reload_if_changed()
-            mode = settings.mode.lower()
-            error = None
-            res = SolveResult(ra_deg=None, dec_deg=None, roll_deg=None, plate_scale_arcsec_px=None, confidence=None)
-            
-            # Check for mode changes
-            if mode != last_mode:
-                logger.info(f"Mode changed: {last_mode} -> {mode}")
-                last_mode = mode
-            
-            # Process different modes
-            if mode == "test":
-                write_status(mode, res, error)
-                time.sleep(1.0)
-                continue
-                
-            elif mode == "align":
-                frame = camera.capture()
-                res = SolveResult(ra_deg=None, dec_deg=None, roll_deg=None, plate_scale_arcsec_px=None, confidence=None)
-                conf_val = 0.0
-                
-            else:  # solve mode
-                res, error, conf_val = process_solve_mode(camera, last_ra, last_dec)
-                
-                # Update hints if we have a good solve
-                if res and conf_val > 0.5:
-                    last_ra = res.ra_deg
-                    last_dec = res.dec_deg
-                    logger.info(f"Updated last RA/Dec: RA={last_ra}, Dec={last_dec}")
-            
-            # Update status and publish results
-            write_status(mode, res, error or camera.get_last_error())
-            
-            if lx200:
-                lx200.publish(res)
-                
-            if onstep:
-                try:
-                    if settings.onstep_sync_mode == "slew_then_sync":
-                        onstep.slew_then_sync(res)
-                    else:
-                        onstep.sync_pointing(res)
-                except Exception as e:
-                    logger.error(f"OnStep sync error: {e}")
-            
-            time.sleep(0.1)
+            metrics.write()
+        except OSError as e:
+            logger.warning(f"Could not write metrics: {e}")
+
+    def _publish(outcome):
+        res = outcome.result
+        
+        if outcome.field is not None and hasattr(camera, "observe_frame"):
+            solved = res is not None and res.ra_deg is not None and res.dec_deg is not None
+            camera.observe_frame(outcome.binning, outcome.field, solved, outcome.white_level, outcome.exposure)
+
+        # Update hints if we have a good solve
+        if res and outcome.confidence > 0.5:
+            hints.update(res.ra_deg, res.dec_deg)
+            logger.info(f"Updated last RA/Dec: RA={res.ra_deg}, Dec={res.dec_deg}")
+        
+        # Update status and publish results
+        write_status(outcome.mode, res, outcome.error or camera.get_last_error(), state["pipeline"].stats(),
+                     solver_stats(), sync.stats() if sync else None, goto.stats() if goto else None,
+                     camera.stats() if hasattr(camera, "stats") else None)
+        
+        if lx200:
+            # Timestamp with the capture time so the LX200 extrapolation accounts for solve latency
+            lx200.publish(res, outcome.captured_at)
             
-        except Exception as loop_exc:
-            logger.error(f"[UNHANDLED EXCEPTION in main loop]: {loop_exc}", exc_info=True)
-            time.sleep(1.0)
+        if solves and outcome.mode == "solve":
+            solves.update(res, outcome.captured_at)
+
+        if sync and outcome.mode == "solve" and not (goto and goto.active):
+            # Gating, rate limiting and the mount I/O happen on the scheduler's thread
+            sync.submit(res, outcome.confidence, outcome.captured_at)
+
+    pipeline_settings = settings.pipeline
+    pipeline = SolvePipeline(
+        capture_stage,
+        solve_stage,
+        publish_stage,
+        solve_workers=pipeline_settings.solve_workers,
+        solve_queue_size=pipeline_settings.solve_queue_size,
+        publish_queue_size=pipeline_settings.publish_queue_size,
+    )
+    state["pipeline"] = pipeline
+    return pipeline
+
+
+def run_solve_loop(camera, lx200, sync, goto=None, solves=None):
+    """Run capture, solve and publish as overlapping pipeline stages until interrupted."""
+    build_pipeline(camera, lx200, sync, goto, solves).run_forever()
+
+
+def start_goto_commands(goto):
+    """Accept goto-and-center start/cancel commands from the web app."""
+    logger = get_logger("solve_worker_main", "worker")
+    listener = CommandListener()
+
+    def on_goto(data):
+        if not goto.start(float(data["ra"]), float(data["dec"])):
+            logger.warning("Goto-and-center already running; request ignored")
+
+    listener.on("goto", on_goto)
+    listener.on("goto_cancel", lambda data: goto.cancel())
+    try:
+        listener.start()
+    except OSError as e:
+        logger.error(f"Command socket unavailable: {e}")
+    return listener
 
 
 def main():
@@ -324,16 +739,29 @@ def main():
 
     # Initialize OnStep client if enabled
     onstep = OnStepClient() if settings.onstep.enabled else None
+    sync = goto = solves = None
     if onstep:
         logger.info("OnStep client enabled.")
+        sync = SyncScheduler(onstep)
+        sync.add_listener(lambda state: event_publisher.publish("sync", state))
+        sync.start()
+        solves = LatestSolve()
+        goto = GotoCenter(onstep, solves, listener=lambda state: event_publisher.publish("goto", state))
+        start_goto_commands(goto)
 
     logger.info(f"Mode: {settings.mode}")
 
     # Initialize camera
     camera = CameraCapture(settings)
+
+    # Build solvers (and load the Tetra3 database) once, before the first frame
+    try:
+        get_solvers()
+    except Exception as e:
+        logger.error(f"Solver initialization failed: {e}")
     
     # Start the main solve loop
-    run_solve_loop(camera, lx200, onstep)
+    run_solve_loop(camera, lx200, sync, goto, solves)
 
 if __name__ == "__main__":
     main()
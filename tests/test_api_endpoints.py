@@ -114,6 +114,17 @@ class TestSettingsEndpoints:
         updated_settings = updated_response.json()
         assert updated_settings["solver"]["solve_radius"] == 25.0
 
+    def test_post_settings_validates_and_publishes_snapshot(self):
+        """Invalid values are rejected; valid ones are visible in the snapshot right away"""
+        from skysolve_next.core.config import settings
+        original = client.get("/settings").json()["solver"]["solve_radius"]
+        response = client.post("/settings", json={"onstep": {"port": "not a port"}})
+        assert response.status_code == 422
+        response = client.post("/settings", json={"solver": {"solve_radius": original + 1.0}})
+        assert response.status_code == 200
+        assert settings.snapshot().solver.solve_radius == original + 1.0
+        client.post("/settings", json={"solver": {"solve_radius": original}})
+
 class TestSolveEndpoints:
     """Test solve-related endpoints"""
     
@@ -0,0 +1,137 @@
+import math
+import numpy as np
+import pytest
+from skysolve_next.solver import astrometry_engine
+from skysolve_next.solver.astrometry_solver import AstrometrySolver
+from skysolve_next.solver.starfinder import find_stars
+from skysolve_next.solver.wcs import cd_orientation
+
+
+def _star_frame(width=320, height=240):
+    yy, xx = np.mgrid[0:height, 0:width]
+    rng = np.random.default_rng(1)
+    frame = 10.0 + rng.normal(0.0, 1.0, (height, width))
+    for x, y, amp in ((50.3, 60.7, 200.0), (200.0, 120.0, 120.0), (280.5, 30.2, 80.0)):
+        frame += amp * np.exp(-((xx - x) ** 2 + (yy - y) ** 2) / (2 * 1.5 ** 2))
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+class FakeMatch:
+    center_ra_deg = 83.8
+    center_dec_deg = -5.4
+    scale_arcsec_per_pixel = 30.0
+    logodds = 40.0
+    # 30"/px, rotated 10 degrees
+    wcs_fields = {
+        "CD1_1": (-30.0 / 3600 * math.cos(math.radians(10)), ""),
+        "CD1_2": (30.0 / 3600 * math.sin(math.radians(10)), ""),
+        "CD2_1": (30.0 / 3600 * math.sin(math.radians(10)), ""),
+        "CD2_2": (30.0 / 3600 * math.cos(math.radians(10)), ""),
+    }
+
+
+class FakeSolution:
+    def __init__(self, matched):
+        self.matched = matched
+
+    def has_match(self):
+        return self.matched
+
+    def best_match(self):
+        return FakeMatch()
+
+
+class FakeSolver:
+    instances = 0
+
+    def __init__(self, index_files):
+        FakeSolver.instances += 1
+        self.index_files = index_files
+        self.calls = []
+
+    def solve(self, stars, size_hint, position_hint, solution_parameters):
+        self.calls.append(position_hint)
+        # Only the blind pass finds the field
+        return FakeSolution(position_hint is None)
+
+    def close(self):
+        pass
+
+
+class FakeModule:
+    Solver = FakeSolver
+
+    class Action:
+        STOP = "stop"
+
+    @staticmethod
+    def SizeHint(**kwargs):
+        return kwargs
+
+    @staticmethod
+    def PositionHint(**kwargs):
+        return kwargs
+
+    @staticmethod
+    def SolutionParameters(**kwargs):
+        return kwargs
+
+
+@pytest.fixture
+def fake_engine(monkeypatch, tmp_path):
+    FakeSolver.instances = 0
+    monkeypatch.setattr(astrometry_engine, "astrometry", FakeModule)
+    monkeypatch.setattr(astrometry_engine, "ASTROMETRY_ENGINE_AVAILABLE", True)
+    monkeypatch.setattr(astrometry_engine, "_engines", {})
+    (tmp_path / "index-4110.fits").write_bytes(b"")
+    (tmp_path / "index-4111.fits").write_bytes(b"")
+    return tmp_path
+
+
+def test_cd_orientation():
+    roll, scale, parity = cd_orientation(*(v for v, _ in FakeMatch.wcs_fields.values()))
+    assert roll == pytest.approx(10.0)
+    assert scale == pytest.approx(30.0)
+    assert parity == -1
+
+
+def test_engine_is_loaded_once_and_reused(fake_engine, monkeypatch):
+    def no_subprocess(*args, **kwargs):
+        raise AssertionError("solve-field should not be spawned")
+
+    monkeypatch.setattr("subprocess.run", no_subprocess)
+    solver = AstrometrySolver(backend="engine", index_dirs=[str(fake_engine)])
+    solver.load()
+    assert FakeSolver.instances == 1
+
+    field = find_stars(_star_frame())
+    for _ in range(3):
+        result = solver.solve(field, ra_hint=80.0, dec_hint=-5.0, radius_hint=5.0)
+        assert result.ra_deg == pytest.approx(83.8)
+        assert result.roll_deg == pytest.approx(10.0)
+        assert result.confidence == pytest.approx(1.0)
+    assert FakeSolver.instances == 1
+
+    engine = astrometry_engine.get_engine(astrometry_engine.find_index_files([str(fake_engine)]))
+    # Hinted pass first, then the blind fallback
+    assert engine._solver.calls[:2] == [{"ra_deg": 80.0, "dec_deg": -5.0, "radius_deg": 5.0}, None]
+
+
+def test_missing_engine_falls_back_to_solve_field(monkeypatch, tmp_path):
+    monkeypatch.setattr(astrometry_engine, "ASTROMETRY_ENGINE_AVAILABLE", False)
+    monkeypatch.setattr(astrometry_engine, "_engines", {})
+    commands = []
+
+    def fake_run(cmd, capture_output, text, timeout):
+        commands.append(cmd)
+
+        class Result:
+            returncode = 0
+            stdout = "Field center: (RA,Dec) = (10.5, 20.25) deg."
+            stderr = ""
+        return Result()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    solver = AstrometrySolver(work_dir=str(tmp_path), backend="engine", index_dirs=[str(tmp_path)])
+    solver.solve(_star_frame(), ra_hint=10.0, dec_hint=20.0, radius_hint=5.0)
+    assert commands and commands[0][0] == "solve-field"
@@ -0,0 +1,123 @@
+import os
+import numpy as np
+import pytest
+from skysolve_next.solver.astrometry_solver import AstrometrySolver
+from skysolve_next.solver.starfinder import find_stars
+
+
+def _star_frame(width=320, height=240, stars=((50.3, 60.7, 200.0), (200.0, 120.0, 120.0), (280.5, 30.2, 80.0))):
+    yy, xx = np.mgrid[0:height, 0:width]
+    rng = np.random.default_rng(1)
+    frame = 10.0 + rng.normal(0.0, 1.0, (height, width))
+    for x, y, amp in stars:
+        frame += amp * np.exp(-((xx - x) ** 2 + (yy - y) ** 2) / (2 * 1.5 ** 2))
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def test_frame_is_solved_from_xylist(monkeypatch, tmp_path):
+    commands = []
+
+    def fake_run(cmd, capture_output, text, timeout):
+        commands.append(cmd)
+        base_path = os.path.splitext(cmd[1])[0]
+        with open(base_path + ".solved", "w") as f:
+            f.write("solved")
+
+        class Result:
+            returncode = 0
+            stdout = "Field center: (RA,Dec) = (10.5, 20.25) deg."
+            stderr = ""
+        return Result()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    solver = AstrometrySolver(work_dir=str(tmp_path))
+    result = solver.solve(_star_frame(), ra_hint=10.0, dec_hint=20.0, radius_hint=5.0)
+
+    assert (result.ra_deg, result.dec_deg) == (10.5, 20.25)
+    cmd = commands[0]
+    assert cmd[1].endswith(".xy") and os.path.dirname(cmd[1]) == str(tmp_path)
+    assert cmd[cmd.index("--width") + 1] == "320"
+    assert cmd[cmd.index("--height") + 1] == "240"
+    assert "--keep-xylist" not in cmd
+    # The xylist is a FITS file, not an encoded image
+    with open(cmd[1], "rb") as f:
+        assert f.read(30).startswith(b"SIMPLE  =")
+    assert not list(tmp_path.glob("*.jpg"))
+
+
+def test_star_field_is_written_without_reextracting(monkeypatch, tmp_path):
+    commands = []
+
+    def fake_run(cmd, capture_output, text, timeout):
+        commands.append(cmd)
+
+        class Result:
+            returncode = 1
+            stdout = ""
+            stderr = "no solution"
+        return Result()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    field = find_stars(_star_frame())
+    solver = AstrometrySolver(work_dir=str(tmp_path))
+    solver.solve(field, enable_fallback=False)
+    assert commands[0][1].endswith(".xy")
+    assert os.path.getsize(commands[0][1]) == 2 * 2880 + 2880  # two headers + one data block
+
+
+def test_invalid_input_raises():
+    with pytest.raises(ValueError):
+        AstrometrySolver().solve("does/not/exist.jpg")
+
+
+FAKE_SOLVE_FIELD = """#!{python}
+import os, sys, time
+args = sys.argv[1:]
+out = os.path.join(args[args.index("--dir") + 1], args[args.index("--out") + 1])
+if "--ra" in args:
+    time.sleep(30)  # hinted search that never finds the field
+open(out + ".solved", "w").close()
+print("Field center: (RA,Dec) = (150.25, 2.5) deg.")
+"""
+
+
+def test_speculative_solve_takes_first_solution(tmp_path):
+    import sys
+    import time
+    script = tmp_path / "solve-field"
+    script.write_text(FAKE_SOLVE_FIELD.format(python=sys.executable))
+    script.chmod(0o755)
+
+    solver = AstrometrySolver(solve_field_path=str(script), work_dir=str(tmp_path), speculative=True, timeout=20)
+    start = time.time()
+    result = solver.solve(_star_frame(), ra_hint=10.0, dec_hint=20.0, radius_hint=5.0)
+
+    assert time.time() - start < 10
+    assert (result.ra_deg, result.dec_deg) == (150.25, 2.5)
+    assert solver.stats() == {"speculative": {"hinted": 0, "blind": 1, "none": 0, "last_winner": "blind"}}
+
+
+def test_learned_scale_is_shared_safely_by_parallel_solves():
+    import threading
+    from skysolve_next.core.models import SolveResult
+    from skysolve_next.solver.astrometry_solver import MAX_SCALE_FAILURES
+    solver = AstrometrySolver()
+    log = lambda *args, **kwargs: None
+    failed = SolveResult(ra_deg=None, dec_deg=None, roll_deg=None, plate_scale_arcsec_px=None, confidence=0.0)
+    solved = SolveResult(ra_deg=1.0, dec_deg=2.0, roll_deg=0.0, plate_scale_arcsec_px=30.0, confidence=1.0)
+    solver._update_scale(solved, True, log)
+    # Failures of solves that started before the scale was learned don't count against it
+    for _ in range(MAX_SCALE_FAILURES):
+        solver._update_scale(failed, False, log, 1.0, None)
+    assert solver._learned_scale == 30.0
+
+    bounds = solver._scale_bounds()
+    threads = [threading.Thread(target=solver._update_scale, args=(failed, False, log, 1.0, bounds))
+               for _ in range(MAX_SCALE_FAILURES - 1)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert solver._scale_failures == MAX_SCALE_FAILURES - 1 and solver._learned_scale == 30.0
+    solver._update_scale(failed, False, log, 1.0, bounds)
+    assert solver._learned_scale is None and solver._scale_failures == 0
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from skysolve_next.camera.autoexposure import AutoExposure
+from skysolve_next.core.config import settings
+from skysolve_next.solver.starfinder import STAR_DTYPE, StarField
+
+
+@pytest.fixture(autouse=True)
+def ae_settings(monkeypatch):
+    for name, value in (("ae_min_exposure_s", 0.05), ("ae_max_exposure_s", 2.0), ("ae_min_gain", 1.0),
+                        ("ae_max_gain", 8.0), ("ae_target_stars", 20), ("ae_max_background", 0.25),
+                        ("ae_window", 2)):
+        monkeypatch.setattr(settings.camera, name, value)
+    monkeypatch.setattr(settings, "_snapshot", settings.frozen_copy())  # what the camera code reads
+
+
+def _field(stars, background=10.0, saturated=0):
+    return StarField(np.zeros(stars, dtype=STAR_DTYPE), 640, 480, background, 2.0, 200.0, saturated)
+
+
+def _run(ae, field, solved=True, frames=2):
+    change = None
+    for _ in range(frames):
+        change = ae.observe(field, solved, 255.0, (ae.exposure_s, ae.gain)) or change
+    return change
+
+
+def test_raises_gain_before_exposure_when_short_of_stars():
+    ae = AutoExposure(1.0, 4.0)
+    assert _run(ae, _field(5), solved=False) == (1.0, 6.0)
+    assert _run(ae, _field(5), solved=False) == (1.125, 8.0)
+
+
+def test_shortens_exposure_while_solving_comfortably():
+    ae = AutoExposure(1.0, 8.0)
+    assert _run(ae, _field(60)) == (0.7, 8.0)
+    # Too bright: background above the limit
+    assert _run(ae, _field(60, background=100.0)) == (0.49, 8.0)
+
+
+def test_ignores_frames_from_old_settings_and_settles_above_failure():
+    ae = AutoExposure(1.0, 8.0)
+    assert ae.observe(_field(5), False, 255.0, (2.0, 8.0)) is None
+    assert _run(ae, _field(60)) == (0.7, 8.0)
+    assert _run(ae, _field(5), solved=False) == (1.05, 8.0)  # gain already at its limit
+    # One step back down, then hold above the level that failed
+    assert _run(ae, _field(60)) == (0.735, 8.0)
+    for _ in range(5):
+        assert _run(ae, _field(60)) is None
+
+
+def test_stream_timeout_follows_auto_exposure():
+    from skysolve_next.workers.solve_worker import CameraCapture
+
+    class Settings:
+        camera = type("Camera", (), {"shutter_speed": "0.01", "iso_speed": "100", "image_size": "1280x960",
+                                     "auto_exposure": True})()
+
+    class Stream:
+        def latest(self, after, timeout):
+            self.timeout = timeout
+            return type("Frame", (), {"seq": 1, "captured_at": 0.0, "arrays": {}, "metadata": {}})()
+
+    camera = CameraCapture(Settings())
+    camera.auto_exposure.exposure_s = 8.0  # as if raised toward a large ae_max_exposure_s
+    camera.stream = Stream()
+    camera._take_from_stream()
+    assert camera.stream.timeout == 24.0
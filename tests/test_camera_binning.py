@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+from skysolve_next.camera.binning import AutoBinning, bin_frame, output_size, pick_sensor_mode, scaler_crop
+from skysolve_next.core.config import settings
+from skysolve_next.core.models import SolveResult
+from skysolve_next.workers import solve_worker
+from skysolve_next.workers.solve_worker import expected_plate_scale
+
+MODES = [{"size": (4056, 3040), "bit_depth": 12}, {"size": (2028, 1520), "bit_depth": 12},
+         {"size": (2028, 1080), "bit_depth": 12}, {"size": (1332, 990), "bit_depth": 10}]
+
+
+@pytest.fixture(autouse=True)
+def binning_settings(monkeypatch):
+    for name, value in (("min_stars", 10), ("binning_window", 3), ("max_binning", 4)):
+        monkeypatch.setattr(settings.camera, name, value)
+    monkeypatch.setattr(settings, "_snapshot", settings.frozen_copy())  # what the camera code reads
+
+
+def test_sizes_and_modes():
+    assert output_size((4056, 3040), 2) == (2028, 1520)
+    assert output_size((4056, 3040), 4, [0.25, 0.25, 0.5, 0.5]) == (506, 380)
+    assert pick_sensor_mode(MODES, (2028, 1520))["size"] == (2028, 1520)
+    assert pick_sensor_mode(MODES, (1014, 760))["size"] == (1332, 990)
+    assert pick_sensor_mode(MODES, (8000, 6000)) is None
+    assert scaler_crop([0.25, 0.25, 0.5, 0.5], (0, 0, 4056, 3040)) == (1014, 760, 2028, 1520)
+
+
+def test_bin_frame_averages_blocks():
+    frame = np.arange(16, dtype=np.uint8).reshape(4, 4)
+    assert bin_frame(frame, 2).tolist() == [[2, 4], [10, 12]]
+    assert bin_frame(frame, 1, [0.5, 0.0, 0.5, 0.5]).tolist() == [[2, 3], [6, 7]]
+
+
+def test_plate_scale_follows_binning(monkeypatch):
+    monkeypatch.setattr(settings.solver, "plate_scale", 30.0)
+    monkeypatch.setattr(settings, "_snapshot", settings.frozen_copy())
+    assert expected_plate_scale(1) == 30.0 and expected_plate_scale(4) == 120.0
+
+
+def test_learned_plate_scale_survives_binning_switch(monkeypatch):
+    # No plate scale and no optics configured: the solver learns it
+    for name, value in (("type", "astrometry"), ("astrometry_backend", "solve-field"), ("plate_scale", None)):
+        monkeypatch.setattr(settings.solver, name, value)
+    monkeypatch.setattr(settings.camera, "focal_length_mm", None)
+    monkeypatch.setattr(settings, "_snapshot", settings.frozen_copy())
+    monkeypatch.setitem(solve_worker._solvers, "key", None)
+    primary, _ = solve_worker.get_solvers()
+    solved = SolveResult(ra_deg=10.0, dec_deg=20.0, roll_deg=0.0, plate_scale_arcsec_px=60.0, confidence=1.0)
+    pixel_scales = []
+
+    def fake_solve(image, pixel_scale=1.0, **kwargs):
+        pixel_scales.append(pixel_scale)
+        primary._update_scale(solved, True, lambda *args, **kw: None, pixel_scale)
+        return solved
+
+    monkeypatch.setattr(primary, "solve", fake_solve)
+    solve_worker.solve_frame(np.zeros((8, 8)), None, None, pixel_scale=2)
+    assert primary._learned_scale == 30.0  # per camera.image_size pixel
+
+    # Auto binning switches to 4x4: same solver, and its bounds follow the frame
+    solve_worker.solve_frame(np.zeros((8, 8)), None, None, pixel_scale=4)
+    assert solve_worker.get_solvers()[0] is primary
+    assert pixel_scales == [2, 4]
+    assert primary._scale_bounds(4) == pytest.approx((108.0, 132.0))
+    assert primary._scale_bounds(1) == pytest.approx((27.0, 33.0))
+
+
+def test_auto_binning_steps_up_and_backs_off():
+    auto = AutoBinning(1)
+    assert [auto.observe(1, 50) for _ in range(3)] == [None, None, 2]
+    assert auto.observe(1, 50) is None  # frames from before the switch are ignored
+    assert [auto.observe(2, 40) for _ in range(3)] == [None, None, 4]
+    # Too few stars at 4x4: back to 2x2, and 4x4 isn't retried right away
+    assert [auto.observe(4, 5) for _ in range(3)] == [None, None, 2]
+    assert [auto.observe(2, 40) for _ in range(6)] == [None] * 6
+
+
+class FakePicam:
+    sensor_modes = MODES
+    camera_properties = {"PixelArraySize": (4056, 3040)}
+
+    def __init__(self):
+        self.configured = None
+        self.fail_sizes = set()
+        self.on_capture = None
+
+    def create_still_configuration(self, **streams):
+        return streams
+
+    def configure(self, config):
+        main, lores = config["main"]["size"], config["lores"]["size"]
+        if lores[0] > main[0] or lores[1] > main[1]:
+            raise RuntimeError("lores stream larger than main")
+        if main in self.fail_sizes:
+            raise RuntimeError(f"can't configure {main}")
+        self.configured = config
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def set_controls(self, controls):
+        pass
+
+    def capture_arrays(self, names):
+        if self.on_capture:
+            self.on_capture()
+        main = self.configured["main"]["size"]
+        lores = self.configured["lores"]["size"]
+        return [np.zeros((main[1], main[0], 3), np.uint8), np.zeros((lores[1] * 3 // 2, lores[0]), np.uint8)], {}
+
+
+def _pi_camera(binning):
+    from skysolve_next.workers.solve_worker import CameraCapture
+
+    class Settings:
+        camera = type("Camera", (), {"shutter_speed": "0.01", "iso_speed": "100", "image_size": "1280x960",
+                                     "binning": binning, "roi": None, "format": "rgb", "continuous": False,
+                                     "preview_size": "640x480"})()
+
+        def reload_if_changed(self):
+            pass
+
+    camera = CameraCapture(Settings())
+    camera.picam, camera.is_pi = FakePicam(), True
+    camera._configure()
+    camera._start()
+    return camera
+
+
+def test_preview_stream_never_exceeds_the_binned_frame():
+    camera = _pi_camera(4)
+    assert camera.picam.configured["main"]["size"] == (320, 240)
+    assert camera.picam.configured["lores"]["size"] == (320, 240)
+    assert camera.capture().shape[:2] == (240, 320)
+
+
+def test_failed_reconfigure_keeps_the_previous_mode():
+    camera = _pi_camera(2)
+    camera.picam.fail_sizes.add((320, 240))
+    camera.binning, camera._reconfigure = 4, True
+    camera.capture()
+    assert camera.picam.configured["main"]["size"] == (640, 480)
+    assert (camera.binning, camera.frame_binning, camera._reconfigure) == (2, 2, False)
+
+
+def test_frame_is_labelled_with_the_configured_binning():
+    camera = _pi_camera(2)
+    # Auto binning switches on the publish thread while this frame is being captured
+    camera.picam.on_capture = lambda: setattr(camera, "binning", 4)
+    camera.capture()
+    assert (camera.frame_binning, camera.frame_scale) == (2, 2.0)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from skysolve_next.camera.controls import CameraControlManager
+from skysolve_next.core.config import settings
+
+
+class FakePicam:
+    """Applies new controls ``latency`` frames after they are set, like libcamera's request queue."""
+
+    def __init__(self, latency=2):
+        self.latency = latency
+        self.set_calls = []
+        self.queue = []
+        self.current = {"ExposureTime": 0, "AnalogueGain": 0.0}
+        self.frame_no = 0
+
+    def set_controls(self, controls):
+        self.set_calls.append(dict(controls))
+        self.queue.append((self.frame_no + self.latency, dict(controls)))
+
+    def capture_arrays(self, names):
+        for due, controls in list(self.queue):
+            if self.frame_no >= due:
+                self.current.update({k: v for k, v in controls.items() if k in self.current})
+                self.queue.remove((due, controls))
+        self.frame_no += 1
+        return [np.full((4, 4), self.frame_no, dtype=np.uint8)], dict(self.current)
+
+
+@pytest.fixture(autouse=True)
+def control_settings(monkeypatch):
+    monkeypatch.setattr(settings.camera, "control_tolerance", 0.02)
+    monkeypatch.setattr(settings.camera, "max_stale_frames", 4)
+    monkeypatch.setattr(settings, "_snapshot", settings.frozen_copy())  # what the camera code reads
+
+
+def test_only_changed_controls_are_sent():
+    cam = FakePicam()
+    manager = CameraControlManager(cam)
+    manager.apply({"ExposureTime": 1000000, "AnalogueGain": 10.0, "AeEnable": False})
+    assert manager.apply({"ExposureTime": 1000000, "AnalogueGain": 10.0, "AeEnable": False}) == {}
+    assert manager.apply({"ExposureTime": 500000, "AnalogueGain": 10.0, "AeEnable": False}) == {"ExposureTime": 500000}
+    assert len(cam.set_calls) == 2 and manager.generation == 2
+
+
+def test_frames_before_a_change_are_dropped():
+    cam = FakePicam(latency=2)
+    manager = CameraControlManager(cam)
+    manager.apply({"ExposureTime": 1000000, "AnalogueGain": 10.0})
+    frames = [manager.capture()[0] for _ in range(4)]
+    assert [f is None for f in frames] == [True, True, False, False]
+    assert manager.settled and manager.dropped == 2
+    assert manager.stats()["ExposureTime"] == 1000000
+
+
+def test_unconfirmed_controls_are_accepted_after_max_stale_frames():
+    cam = FakePicam(latency=100)  # never reports the new values
+    manager = CameraControlManager(cam)
+    manager.apply({"ExposureTime": 1000000, "AnalogueGain": 10.0})
+    frames = [manager.capture()[0] for _ in range(5)]
+    assert [f is None for f in frames] == [True] * 4 + [False]
+    assert manager.settled
@@ -0,0 +1,38 @@
+import time
+import numpy as np
+import cv2
+from skysolve_next.camera.preview import PreviewEncoder, yuv420_luma
+from skysolve_next.core.config import settings
+from skysolve_next.core.shm import SharedPreview
+
+
+def test_encoder_publishes_downscaled_latest_frame(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings.camera, "preview_size", "320x240")
+    monkeypatch.setattr(settings.camera, "preview_fps", 50.0)
+    monkeypatch.setattr(settings, "_snapshot", settings.frozen_copy())
+    target = SharedPreview(str(tmp_path / "preview"))
+    encoder = PreviewEncoder(target)
+    encoder.start()
+    try:
+        encoder.submit(np.full((960, 1280), 200, dtype=np.uint8))
+        deadline = time.time() + 5
+        while encoder.encoded == 0 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        encoder.stop()
+    jpeg, _ = SharedPreview(target.path).read()
+    image = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    assert image.shape == (240, 320)
+    assert abs(int(image.mean()) - 200) <= 2
+
+
+def test_submit_keeps_only_the_newest_frame(tmp_path):
+    encoder = PreviewEncoder(SharedPreview(str(tmp_path / "preview")))  # not started
+    for value in range(3):
+        encoder.submit(np.full((8, 8), value, dtype=np.uint8))
+    assert encoder.skipped == 2
+
+
+def test_yuv420_luma_strips_chroma_and_padding():
+    frame = np.zeros((240 * 3 // 2, 336), dtype=np.uint8)
+    assert yuv420_luma(frame, 320, 240).shape == (240, 320)
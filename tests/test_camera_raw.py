@@ -0,0 +1,45 @@
+import numpy as np
+from skysolve_next.camera import raw
+from skysolve_next.solver.starfinder import find_stars
+
+
+def _buffer(data, pad=8):
+    """Unpacked raw buffer as Picamera2 returns it: uint8 rows with stride padding."""
+    rows = np.zeros((data.shape[0], data.shape[1] * 2 + pad), dtype=np.uint8)
+    rows[:, :data.shape[1] * 2] = data.astype("<u2").view(np.uint8)
+    return rows
+
+
+def test_formats():
+    assert raw.bayer_order("SRGGB12") == "RGGB" and raw.bayer_order("SGBRG10") == "GBRG"
+    assert raw.bayer_order("R12") is None
+    assert raw.bit_depth("SRGGB12") == 12 and raw.bit_depth("R10") == 10
+
+
+def test_superpixel_and_green():
+    cell = np.array([[1, 2], [3, 4]], dtype=np.uint16)  # R G / G B
+    data = np.tile(cell, (2, 3))
+    frame, saturation, factor = raw.extract(_buffer(data), "SRGGB12", 6)
+    assert frame.dtype == np.uint16 and frame.shape == (2, 3)
+    assert (frame == 10).all() and saturation == 4 * 4095 and factor == 2
+    frame, saturation, _ = raw.extract(_buffer(data), "SRGGB12", 6, method="green")
+    assert (frame == 5).all() and saturation == 2 * 4095
+    frame, saturation, factor = raw.extract(_buffer(data), "R12", 6)
+    assert frame.shape == (4, 6) and factor == 1
+
+
+def test_roi_keeps_bayer_phase():
+    data = np.tile(np.array([[1, 2], [3, 4]], dtype=np.uint16), (4, 4))
+    frame, _, _ = raw.extract(_buffer(data), "SRGGB12", 8, method="green", roi=[0.3, 0.3, 0.5, 0.5])
+    assert (frame == 5).all()
+
+
+def test_star_survives_superpixel():
+    rng = np.random.default_rng(1)
+    data = rng.normal(200, 5, (128, 128)).clip(0).astype(np.uint16)
+    yy, xx = np.mgrid[:128, :128]
+    data += (3000 * np.exp(-((xx - 64.5) ** 2 + (yy - 40.5) ** 2) / 8.0)).astype(np.uint16)
+    frame, saturation, _ = raw.extract(_buffer(data), "SBGGR12", 128)
+    field = find_stars(frame, saturation=saturation)
+    assert len(field) >= 1
+    assert abs(field.stars[0]["x"] - 32.0) < 0.5 and abs(field.stars[0]["y"] - 20.0) < 0.5
@@ -0,0 +1,71 @@
+import time
+import numpy as np
+from skysolve_next.camera.controls import CameraControlManager
+from skysolve_next.camera.stream import FrameStream
+from skysolve_next.core.config import settings
+
+
+class FakeRequest:
+    def __init__(self, cam, n):
+        self.cam, self.n = cam, n
+
+    def get_metadata(self):
+        return {"ExposureTime": self.cam.exposure, "AnalogueGain": 1.0}
+
+    def make_array(self, name):
+        return np.full((4, 4), self.n % 256, dtype=np.uint8)
+
+    def release(self):
+        self.cam.outstanding -= 1
+
+
+class FakePicam:
+    """Free-running camera completing a request every ``interval`` seconds."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.exposure = 1000
+        self.n = 0
+        self.outstanding = 0
+
+    def set_controls(self, controls):
+        pass
+
+    def capture_request(self):
+        time.sleep(self.interval)
+        self.n += 1
+        self.outstanding += 1
+        return FakeRequest(self, self.n)
+
+
+def test_latest_returns_fresh_frames_without_repeats():
+    cam = FakePicam()
+    stream = FrameStream(cam, CameraControlManager(cam))
+    stream.start()
+    try:
+        first = stream.latest(0, timeout=2)
+        time.sleep(0.1)  # several frames complete meanwhile
+        second = stream.latest(first.seq, timeout=2)
+        assert second.seq > first.seq + 1
+        assert stream.stats()["overwritten"] >= 1
+        # Every buffer went back to the ring
+        assert cam.outstanding <= 1
+    finally:
+        stream.stop()
+
+
+def test_frames_from_before_a_control_change_are_skipped(monkeypatch):
+    monkeypatch.setattr(settings.camera, "max_stale_frames", 1000)
+    monkeypatch.setattr(settings, "_snapshot", settings.frozen_copy())
+    cam = FakePicam()
+    controls = CameraControlManager(cam)
+    stream = FrameStream(cam, controls)
+    controls.apply({"ExposureTime": 2000, "AnalogueGain": 1.0})
+    stream.start()
+    try:
+        assert stream.latest(0, timeout=0.1) is None  # still exposing with the old value
+        cam.exposure = 2000
+        frame = stream.latest(0, timeout=2)
+        assert frame.metadata["ExposureTime"] == 2000
+    finally:
+        stream.stop()
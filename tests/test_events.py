@@ -0,0 +1,53 @@
+import asyncio
+from fastapi.testclient import TestClient
+from skysolve_next.core.events import EventHub, EventPublisher
+from skysolve_next.core.models import SolveResult
+from skysolve_next.core.shm import SharedStatus
+
+
+def test_publish_without_listener_is_dropped(tmp_path):
+    publisher = EventPublisher(str(tmp_path / "none.sock"))
+    assert publisher.publish("status", {"mode": "solve"}) is False
+    assert publisher.dropped == 1
+
+
+def test_hub_coalesces_per_type(tmp_path):
+    path = str(tmp_path / "ev.sock")
+
+    async def run():
+        hub = EventHub(path)
+        await hub.start()
+        subscription = hub.subscribe()
+        publisher = EventPublisher(path)
+        for i in range(50):
+            publisher.publish("status", {"n": i})
+        publisher.publish("solve", {"ra": 10.0})
+        # The receive queue holds only a few datagrams; the rest wait in the publisher
+        await asyncio.sleep(0.05)
+        assert publisher.flush()
+        await asyncio.sleep(0.05)
+        events = await asyncio.wait_for(subscription.next(), timeout=1.0)
+        hub.stop()
+        return events, subscription.coalesced
+
+    events, coalesced = asyncio.run(run())
+    assert [e["type"] for e in events] == ["status", "solve"]
+    assert events[0]["data"] == {"n": 49}
+    assert coalesced > 0
+
+
+def test_events_websocket_pushes_solves(monkeypatch, tmp_path):
+    from skysolve_next.web import app as app_module
+    path = str(tmp_path / "ev.sock")
+    status = SharedStatus(str(tmp_path / "status"))
+    status.publish("solve", SolveResult(1.0, 2.0, None, None, 0.9))
+    monkeypatch.setattr(app_module, "event_hub", EventHub(path))
+    monkeypatch.setattr(app_module, "shared_status", status)
+
+    with TestClient(app_module.app).websocket_connect("/ws/events") as ws:
+        first = ws.receive_json()
+        assert first["type"] == "status" and first["data"]["ra"] == 1.0
+        EventPublisher(path).publish("solve", {"ra": 3.0, "dec": 4.0})
+        event = ws.receive_json()
+        assert event["type"] == "solve" and event["data"] == {"ra": 3.0, "dec": 4.0}
+    app_module.event_hub.stop()
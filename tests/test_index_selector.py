@@ -0,0 +1,124 @@
+import math
+import os
+import numpy as np
+import pytest
+from skysolve_next.solver.astrometry_solver import AstrometrySolver
+from skysolve_next.solver.fits import _format_header, read_header
+from skysolve_next.solver.index_selector import IndexSelector, index_scale_range
+
+
+def _write_index(path, scale_arcmin=None):
+    cards = [("SIMPLE", True, None), ("BITPIX", 8, None), ("NAXIS", 0, None)]
+    if scale_arcmin is not None:
+        # Index files store their quad scale range in radians
+        lower, upper = (math.radians(v / 60.0) for v in scale_arcmin)
+        cards += [("SCALE_L", lower, "Lower-bound index scale (radians)."),
+                  ("SCALE_U", upper, "Upper-bound index scale (radians).")]
+    with open(path, "wb") as f:
+        f.write(_format_header(cards))
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    directory = tmp_path / "indexes"
+    directory.mkdir()
+    for name in ("index-4107.fits", "index-4110.fits", "index-4115.fits", "index-4119.fits"):
+        (directory / name).write_bytes(b"")  # unreadable header: scale from the file name
+    _write_index(directory / "index-5206-03.fits", (16.0, 22.0))
+    _write_index(directory / "index-5212-03.fits", (120.0, 170.0))
+    return directory
+
+
+def test_read_header_values(tmp_path):
+    path = tmp_path / "index.fits"
+    _write_index(path, (60.0, 85.0))
+    header = read_header(str(path))
+    assert header["SIMPLE"] is True
+    assert header["NAXIS"] == 0
+    assert math.degrees(header["SCALE_U"]) * 60.0 == pytest.approx(85.0)
+    assert index_scale_range(str(path)) == pytest.approx((60.0, 85.0))
+
+
+def test_config_lists_only_indexes_matching_scale(index_dir, tmp_path):
+    selector = IndexSelector([str(index_dir)], str(tmp_path / "configs"))
+    # 1280 px at 30"/px is a 640' field: quads from ~64' up to the field width are useful
+    path = selector.config_for(1280, 960, 27.0, 33.0)
+    with open(path) as f:
+        indexes = [os.path.basename(line.split()[1]) for line in f if line.startswith("index ")]
+    assert indexes == ["index-4110.fits", "index-4115.fits", "index-5212-03.fits"]
+    assert selector.config_for(1280, 960, 27.0, 33.0) == path
+
+
+def test_learned_scale_restricts_later_solves(monkeypatch, tmp_path, index_dir):
+    commands = []
+
+    def fake_run(cmd, capture_output, text, timeout):
+        commands.append(cmd)
+        base_path = os.path.splitext(cmd[1])[0]
+        with open(base_path + ".solved", "w") as f:
+            f.write("solved")
+
+        class Result:
+            returncode = 0
+            stdout = "RA,Dec = (10.5, 20.25), pixel scale 30.1 arcsec/pix."
+            stderr = ""
+        return Result()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    solver = AstrometrySolver(work_dir=str(tmp_path), index_dirs=[str(index_dir)])
+    frame = np.zeros((960, 1280), dtype=np.uint8)
+    frame[100:103, 100:103] = 200
+    frame[500:503, 700:703] = 150
+
+    first = solver.solve(frame)
+    assert first.plate_scale_arcsec_px == pytest.approx(30.1)
+    assert "--scale-low" not in commands[0]
+
+    solver.solve(frame, ra_hint=10.5, dec_hint=20.25, radius_hint=5.0)
+    cmd = commands[1]
+    assert float(cmd[cmd.index("--scale-low") + 1]) == pytest.approx(30.1 * 0.9)
+    assert float(cmd[cmd.index("--scale-high") + 1]) == pytest.approx(30.1 * 1.1)
+    assert "--config" in cmd
+
+
+def test_shards_split_index_files(index_dir, tmp_path):
+    selector = IndexSelector([str(index_dir)], str(tmp_path / "configs"))
+    shards = selector.shard_configs(3)
+    assert len(shards) == 3
+    seen = []
+    for path in shards:
+        with open(path) as f:
+            seen += [line.split()[1] for line in f if line.startswith("index ")]
+    assert sorted(os.path.basename(p) for p in seen) == sorted(os.listdir(index_dir))
+
+
+FAKE_SHARDED_SOLVE_FIELD = """#!{python}
+import os, sys, time
+args = sys.argv[1:]
+out = os.path.join(args[args.index("--dir") + 1], args[args.index("--out") + 1])
+with open(args[args.index("--config") + 1]) as f:
+    if "index-4110.fits" not in f.read():
+        time.sleep(30)  # this shard doesn't cover the field
+open(out + ".solved", "w").close()
+print("Field center: (RA,Dec) = (150.25, 2.5) deg.")
+"""
+
+
+def test_sharded_solve_first_shard_wins(index_dir, tmp_path):
+    import sys
+    import time
+    script = tmp_path / "solve-field"
+    script.write_text(FAKE_SHARDED_SOLVE_FIELD.format(python=sys.executable))
+    script.chmod(0o755)
+    solver = AstrometrySolver(solve_field_path=str(script), work_dir=str(tmp_path), index_dirs=[str(index_dir)],
+                              parallel_shards=3, timeout=20)
+    frame = np.zeros((240, 320), dtype=np.uint8)
+
+    start = time.time()
+    result = solver.solve(frame)
+    assert time.time() - start < 10
+    assert (result.ra_deg, result.dec_deg) == (150.25, 2.5)
+    sharding = solver.stats()["sharding"]
+    assert sharding["shards"] == 3
+    assert sharding["sharded_avg_s"] is not None
+    assert sharding["speedup"] is None  # no unsharded baseline yet
@@ -0,0 +1,115 @@
+import socket
+import time
+import pytest
+from skysolve_next.core.config import settings
+from skysolve_next.core.models import SolveResult
+from skysolve_next.publish import lx200_server
+from skysolve_next.publish.lx200_server import LX200Server
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(settings.lx200, "predict", False)
+    monkeypatch.setattr(settings.lx200, "trace", False)
+    srv = LX200Server(host="127.0.0.1", port=0)
+    srv.start()
+    yield srv
+    srv.stop()
+
+
+def _connect(srv):
+    sock = socket.create_connection(("127.0.0.1", srv.port), timeout=5)
+    return sock
+
+
+def _recv_exactly(sock, n):
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def test_many_clients_poll_concurrently(server):
+    server.publish(SolveResult(ra_deg=150.0, dec_deg=-20.5, roll_deg=0.0, plate_scale_arcsec_px=30.0,
+                               confidence=0.9))
+    clients = [_connect(server) for _ in range(8)]
+    for sock in clients:
+        sock.sendall(b":GR#:GD#")  # pipelined, as SkySafari sends them
+    for sock in clients:
+        expected = b"10:00:00#-20*30:00#"
+        assert _recv_exactly(sock, len(expected)) == expected
+    # Commands split across packets are reassembled
+    clients[0].sendall(b":G")
+    time.sleep(0.05)
+    clients[0].sendall(b"VP#")
+    assert _recv_exactly(clients[0], 14) == b"Skysolve Next#"
+    for sock in clients:
+        sock.close()
+
+
+def test_idle_clients_are_reaped(server, monkeypatch):
+    monkeypatch.setattr(settings.lx200, "idle_timeout_s", 0.2)
+    idle = _connect(server)
+    deadline = time.time() + 5
+    while server.client_count == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert server.client_count == 1
+    # The reaper runs once per tick
+    assert idle.recv(16) == b""
+    assert server.client_count == 0
+
+
+def test_input_buffer_is_bounded(server):
+    sock = _connect(server)
+    sock.sendall(b"x" * (lx200_server.MAX_INPUT_BUFFER + 100))
+    time.sleep(0.1)
+    sock.sendall(b":GVN#")
+    # Garbage without a terminator is discarded and the connection keeps working
+    assert _recv_exactly(sock, 4) == b"0.1#"
+    sock.close()
+
+
+def test_trace_records_traffic_when_enabled(server, monkeypatch, tmp_path):
+    from skysolve_next.publish.trace import LX200Tracer, decode, format_record, read_trace
+    tracer = LX200Tracer(path=str(tmp_path / "trace.bin"), capacity=8, flush_interval=60.0)
+    monkeypatch.setattr(lx200_server, "tracer", tracer)
+    sock = _connect(server)
+    sock.sendall(b":GVN#")
+    assert _recv_exactly(sock, 4) == b"0.1#"
+    assert tracer.tail() == []  # disabled: nothing recorded
+
+    monkeypatch.setattr(settings.lx200, "trace", True)  # keeps the server's tick from disabling it
+    tracer.enable()
+    for _ in range(3):
+        sock.sendall(b":GVN#")
+        assert _recv_exactly(sock, 4) == b"0.1#"
+    tracer.disable()
+    sock.close()
+    # Nine records (RECV, CMD, SEND per poll) in a ring of eight: the oldest is lost
+    assert tracer.lost == 1
+    lines = [format_record(r) for r in decode(read_trace(tracer.path, limit=100))]
+    assert len(lines) == 8
+    assert "CMD 127.0.0.1:" in lines[-2] and lines[-2].endswith(":GVN#")
+    assert "SEND" in lines[-1] and "TXT='0.1#'" in lines[-1]
+
+
+def test_trace_endpoint(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+    import skysolve_next.web.app as app_module
+    from skysolve_next.publish.trace import TRACE_CMD, LX200Tracer
+    path = str(tmp_path / "trace.bin")
+    monkeypatch.setattr(app_module, "TRACE_PATH", path)
+    client = TestClient(app_module.app)
+    assert client.get("/lx200/trace").status_code == 404
+
+    tracer = LX200Tracer(path=path)
+    tracer.enable()
+    tracer.record(TRACE_CMD, ("10.0.0.2", 4030), b":GR#")
+    tracer.disable()
+    response = client.get("/lx200/trace")
+    assert response.status_code == 200
+    assert response.text.rstrip().endswith("CMD 10.0.0.2:4030 :GR#")
+    assert len(client.get("/lx200/trace?format=binary").content) == 64
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+from skysolve_next.core import metrics as metrics_module
+from skysolve_next.core.metrics import LatencyHistogram, MetricsRegistry, to_prometheus
+
+
+def test_histogram_window_and_totals():
+    histogram = LatencyHistogram(window=100)
+    for i in range(1, 201):
+        histogram.observe(i / 1000.0)
+    snap = histogram.snapshot()
+    assert snap["count"] == 200
+    assert snap["window"] == 100
+    assert snap["sum"] == pytest.approx(sum(range(1, 201)) / 1000.0)
+    # Only the latest 100 samples (0.101 .. 0.200) are in the window
+    assert snap["p50"] == pytest.approx(0.1505, abs=1e-3)
+    assert snap["max"] == pytest.approx(0.2)
+
+
+def test_registry_timer_and_prometheus():
+    registry = MetricsRegistry()
+    with registry.timer("capture"):
+        pass
+    registry.observe("solve_phase1", 2.5)
+    snap = registry.snapshot()
+    assert set(snap) == {"capture", "solve_phase1"}
+    text = to_prometheus(snap, "worker")
+    assert 'skysolve_stage_seconds{process="worker",stage="solve_phase1",quantile="0.99"} 2.5' in text
+    assert 'skysolve_stage_seconds_count{process="worker",stage="capture"} 1' in text
+
+
+def test_metrics_endpoint(monkeypatch, tmp_path):
+    from skysolve_next.web.app import app
+    path = tmp_path / "worker_metrics.json"
+    worker = MetricsRegistry()
+    worker.observe("capture", 1.0)
+    worker.write(str(path))
+    monkeypatch.setattr("skysolve_next.web.app.read_metrics", lambda: metrics_module.read_metrics(str(path)))
+
+    client = TestClient(app)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'stage="capture",quantile="0.5"} 1.0' in response.text
+
+    data = client.get("/metrics?format=json").json()
+    assert data["worker"]["stages"]["capture"]["count"] == 1
@@ -0,0 +1,131 @@
+import socket
+import threading
+import pytest
+from skysolve_next.core.models import SolveResult
+from skysolve_next.mounts.onstep.lx200 import OnStepClient, OnStepError
+
+
+class FakeOnStep:
+    """Minimal OnStep over TCP: acks :Sr/:Sd with '1', :CM# with 'N/A#', :MS# with the goto code."""
+
+    def __init__(self, goto_reply=b"0", dec_reply=b"1"):
+        self.goto_reply = goto_reply
+        self.sync_reply = b"N/A#"
+        self.dec_reply = dec_reply
+        self.commands = []
+        self.connections = 0
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(4)
+        self.port = self.server.getsockname()[1]
+        self._conns = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            self._conns.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        buf = b""
+        while True:
+            try:
+                chunk = conn.recv(1024)
+            except OSError:
+                return
+            if not chunk:
+                return
+            buf += chunk
+            while b"#" in buf:
+                cmd, buf = buf.split(b"#", 1)
+                cmd = cmd.decode() + "#"
+                self.commands.append(cmd)
+                if cmd.startswith(":Sr"):
+                    conn.sendall(b"1")
+                elif cmd.startswith(":Sd"):
+                    conn.sendall(self.dec_reply)
+                elif cmd == ":CM#":
+                    conn.sendall(self.sync_reply)
+                elif cmd == ":D#":
+                    conn.sendall(b"#")  # not slewing
+                elif cmd == ":MS#":
+                    conn.sendall(self.goto_reply)
+
+    def drop_connections(self):
+        for conn in self._conns:
+            conn.shutdown(socket.SHUT_RDWR)
+            conn.close()
+        self._conns.clear()
+
+    def close(self):
+        self.drop_connections()
+        self.server.close()
+
+
+@pytest.fixture
+def mount():
+    fake = FakeOnStep()
+    yield fake
+    fake.close()
+
+
+RESULT = SolveResult(ra_deg=83.8221, dec_deg=-5.3911, roll_deg=0.0, plate_scale_arcsec_px=30.0, confidence=0.9)
+
+
+def test_syncs_reuse_one_connection(mount):
+    client = OnStepClient("127.0.0.1", mount.port, timeout=2)
+    for _ in range(3):
+        client.sync_pointing(RESULT)
+    assert mount.connections == 1
+    assert mount.commands[:3] == [":Sr05:35:17#", ":Sd-05*23:27#", ":CM#"]
+    assert len(mount.commands) == 9
+    client.close()
+
+
+def test_reconnects_after_connection_loss(mount):
+    client = OnStepClient("127.0.0.1", mount.port, timeout=2)
+    client.sync_pointing(RESULT)
+    mount.drop_connections()
+    client.sync_pointing(RESULT)
+    assert mount.connections == 2
+    client.close()
+
+
+def test_rejected_replies_raise(mount):
+    client = OnStepClient("127.0.0.1", mount.port, timeout=0.5)
+    mount.dec_reply = b"0"
+    with pytest.raises(OnStepError, match="Dec"):
+        client.sync_pointing(RESULT)
+    mount.dec_reply = b"1"
+    mount.goto_reply = b"1"  # below the horizon
+    with pytest.raises(OnStepError, match="goto"):
+        client.sync_then_slew(RESULT, 10.0, 20.0)
+    assert mount.commands[-3:][-1] == ":MS#"
+    client.close()
+
+
+def test_unreachable_mount_raises():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    with pytest.raises(OnStepError):
+        OnStepClient("127.0.0.1", port, timeout=1).sync_pointing(RESULT)
+
+
+def test_sync_then_slew_corrects_pointing_before_slewing(mount):
+    client = OnStepClient("127.0.0.1", mount.port, timeout=2)
+    client.sync_then_slew(RESULT, 90.0, -5.0)
+    assert mount.commands[:6] == [":Sr05:35:17#", ":Sd-05*23:27#", ":CM#", ":Sr06:00:00#", ":Sd-05*00:00#", ":MS#"]
+    # A failed sync never moves the scope
+    mount.commands.clear()
+    mount.sync_reply = b"E1#"
+    with pytest.raises(OnStepError, match="sync failed"):
+        client.sync_then_slew(RESULT, 90.0, -5.0)
+    assert ":MS#" not in mount.commands
+    client.close()
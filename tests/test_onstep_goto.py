@@ -0,0 +1,99 @@
+import threading
+import time
+import pytest
+from skysolve_next.core.config import settings
+from skysolve_next.core.events import CommandListener, EventPublisher
+from skysolve_next.core.models import SolveResult
+from skysolve_next.mounts.onstep.goto import GotoCenter, LatestSolve
+
+
+class FakeMount:
+    """Mount whose pointing model is off by ``error`` degrees in RA until synced."""
+
+    def __init__(self, error=0.5):
+        self.error = error
+        self.actual = (0.0, 0.0)
+        self.gotos = 0
+        self.syncs = 0
+        self.aborted = False
+
+    def goto(self, ra, dec):
+        self.gotos += 1
+        self.actual = (ra + self.error, dec)
+
+    def wait_for_slew(self, timeout, poll_interval=0.5, cancelled=None):
+        return not (cancelled and cancelled.is_set())
+
+    def sync_pointing(self, result):
+        self.syncs += 1
+        self.error *= 0.01  # the mount's model now mostly matches the sky
+
+    def abort(self):
+        self.aborted = True
+
+
+@pytest.fixture(autouse=True)
+def goto_settings(monkeypatch):
+    for name, value in (("settle_s", 0.0), ("slew_poll_s", 0.01), ("center_tolerance_arcmin", 1.0),
+                        ("center_max_iterations", 4), ("center_solve_timeout_s", 2.0)):
+        monkeypatch.setattr(settings.onstep, name, value)
+
+
+def _feed(mount, solves, stop):
+    # Stands in for the solve pipeline: solves the current sky position every 20 ms
+    while not stop.is_set():
+        ra, dec = mount.actual
+        solves.update(SolveResult(ra, dec, 0.0, 30.0, 0.9), time.time())
+        time.sleep(0.02)
+
+
+def test_iterates_until_centered():
+    mount, solves, events = FakeMount(error=0.5), LatestSolve(), []
+    task = GotoCenter(mount, solves, listener=events.append)
+    stop = threading.Event()
+    feeder = threading.Thread(target=_feed, args=(mount, solves, stop), daemon=True)
+    feeder.start()
+    try:
+        assert task.start(150.0, 10.0)
+        assert not task.start(150.0, 10.0)  # one run at a time
+        task.join(5)
+    finally:
+        stop.set()
+    state = task.stats()
+    assert state["state"] == "centered"
+    assert state["iteration"] == 2 and (mount.gotos, mount.syncs) == (2, 1)
+    assert state["residuals_arcmin"][0] == pytest.approx(0.5 * 60 * 0.9848, rel=1e-3)
+    assert state["residuals_arcmin"][1] < 1.0
+    assert state["time_to_center_s"] > 0
+    states = [e["state"] for e in events]
+    steps = [s for i, s in enumerate(states) if i == 0 or s != states[i - 1]]
+    assert steps == ["slewing", "solving", "syncing", "slewing", "solving", "centered"]
+
+
+def test_cancel_stops_the_mount():
+    mount = FakeMount()
+    task = GotoCenter(mount, LatestSolve())  # no solves arrive
+    task.start(150.0, 10.0)
+    time.sleep(0.1)
+    assert task.cancel()
+    task.join(5)
+    assert task.stats()["state"] == "cancelled"
+    assert mount.aborted
+
+
+def test_commands_reach_the_worker(tmp_path):
+    path = str(tmp_path / "commands.sock")
+    received = threading.Event()
+    commands = []
+    listener = CommandListener(path)
+    listener.on("goto", lambda data: (commands.append(data), received.set()))
+    publisher = EventPublisher(path)
+    assert not publisher.publish("goto", {"ra": 1.0, "dec": 2.0})  # nobody listening yet
+    listener.start()
+    try:
+        assert publisher.publish("goto", {"ra": 10.0, "dec": 20.0})
+        assert received.wait(2)
+        assert commands == [{"ra": 10.0, "dec": 20.0}]
+    finally:
+        listener.stop()
+        publisher.close()
@@ -0,0 +1,96 @@
+import time
+import pytest
+from skysolve_next.core.config import settings
+from skysolve_next.core.models import SolveResult
+from skysolve_next.mounts.onstep.lx200 import OnStepError
+from skysolve_next.mounts.onstep.sync import SyncScheduler, angular_separation
+
+
+class FakeClient:
+    def __init__(self, ra=100.0, dec=20.0):
+        self.position = (ra, dec)
+        self.synced = []
+        self.fail = False
+
+    def get_position(self):
+        if self.fail:
+            raise OnStepError("OnStep :GR#:GD# failed: timed out")
+        return self.position
+
+    def sync_pointing(self, result):
+        self.synced.append((result.ra_deg, result.dec_deg))
+        self.position = (result.ra_deg, result.dec_deg)
+
+    def sync_then_slew(self, result, ra, dec):
+        self.sync_pointing(result)
+        self.slewed_to = (ra, dec)
+        self.position = (ra, dec)
+
+
+def _result(ra, dec):
+    return SolveResult(ra_deg=ra, dec_deg=dec, roll_deg=0.0, plate_scale_arcsec_px=30.0, confidence=0.9)
+
+
+@pytest.fixture(autouse=True)
+def sync_settings(monkeypatch):
+    monkeypatch.setattr(settings.onstep, "min_confidence", 0.5)
+    monkeypatch.setattr(settings.onstep, "tolerance_arcmin", 2.0)
+    monkeypatch.setattr(settings.onstep, "max_sync_deg", 5.0)
+    monkeypatch.setattr(settings.onstep, "min_interval_s", 0.0)
+    monkeypatch.setattr(settings.onstep, "sync_mode", "sync")
+
+
+def test_angular_separation():
+    assert angular_separation(10.0, 0.0, 11.0, 0.0) == pytest.approx(1.0)
+    assert angular_separation(0.0, 60.0, 180.0, 60.0) == pytest.approx(60.0)
+
+
+def test_outcomes_follow_delta_and_confidence():
+    client = FakeClient(100.0, 20.0)
+    scheduler = SyncScheduler(client)
+    assert scheduler.process(_result(100.01, 20.01), 0.9, time.time()) == "in_tolerance"
+    assert scheduler.process(_result(101.0, 20.0), 0.9, time.time()) == "synced"
+    assert client.synced == [(101.0, 20.0)]
+    assert scheduler.process(_result(120.0, 20.0), 0.9, time.time()) == "blocked"
+    client.fail = True
+    assert scheduler.process(_result(101.5, 20.0), 0.9, time.time()) == "failed"
+
+    state = scheduler.stats()
+    assert (state["syncs"], state["skipped"], state["failures"]) == (1, 2, 1)
+    assert state["last_outcome"] == "failed" and "timed out" in state["last_error"]
+
+    # Failed solves and low-confidence solves never reach the mount
+    assert not scheduler.submit(_result(None, None), 0.0)
+    assert not scheduler.submit(_result(101.0, 20.0), 0.2)
+
+
+def test_sync_then_slew_returns_to_the_mount_target(monkeypatch):
+    monkeypatch.setattr(settings.onstep, "sync_mode", "sync_then_slew")
+    client = FakeClient(100.0, 20.0)
+    assert SyncScheduler(client).process(_result(101.0, 20.0), 0.9, time.time()) == "synced"
+    assert client.synced == [(101.0, 20.0)] and client.slewed_to == (100.0, 20.0)
+
+
+def test_background_thread_rate_limits_syncs(monkeypatch):
+    monkeypatch.setattr(settings.onstep, "min_interval_s", 0.5)
+    client = FakeClient(100.0, 20.0)
+    scheduler = SyncScheduler(client)
+    events = []
+    scheduler.add_listener(events.append)
+    scheduler.start()
+    try:
+        scheduler.submit(_result(101.0, 20.0), 0.9)
+        deadline = time.time() + 5
+        while not client.synced and time.time() < deadline:
+            time.sleep(0.01)
+        # Within the interval: only the latest of these is used, after the interval has passed
+        scheduler.submit(_result(102.0, 20.0), 0.9)
+        scheduler.submit(_result(103.0, 20.0), 0.9)
+        time.sleep(0.2)
+        assert client.synced == [(101.0, 20.0)]
+        while len(client.synced) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert client.synced == [(101.0, 20.0), (103.0, 20.0)]
+        assert events[-1]["last_outcome"] == "synced"
+    finally:
+        scheduler.stop()
@@ -0,0 +1,105 @@
+import threading
+import time
+import pytest
+from skysolve_next.workers.pipeline import DropOldestQueue, SolvePipeline
+
+
+def test_drop_oldest_queue_discards_oldest():
+    q = DropOldestQueue(maxsize=2)
+    assert q.put(1) is None
+    assert q.put(2) is None
+    assert q.put(3) == 1
+    assert q.dropped == 1
+    assert q.qsize() == 2
+    item, dwell = q.get(timeout=0.1)
+    assert item == 2
+    assert dwell >= 0.0
+    assert q.get(timeout=0.1)[0] == 3
+    assert q.get(timeout=0.01) is None
+
+
+def test_drop_oldest_queue_rejects_zero_size():
+    with pytest.raises(ValueError):
+        DropOldestQueue(maxsize=0)
+
+
+def test_capture_overlaps_slow_solve():
+    """Captures keep running while the solver is busy; stale frames are dropped."""
+    counter = {"n": 0}
+    published = []
+    done = threading.Event()
+
+    def capture():
+        time.sleep(0.01)
+        counter["n"] += 1
+        return counter["n"]
+
+    def solve(frame):
+        time.sleep(0.1)
+        return frame * 10
+
+    def publish(result):
+        published.append(result)
+        if len(published) >= 3:
+            done.set()
+
+    pipeline = SolvePipeline(capture, solve, publish)
+    pipeline.start()
+    try:
+        assert done.wait(5.0)
+    finally:
+        pipeline.stop()
+
+    stats = pipeline.stats()
+    # Capture ran many more times than the solver could keep up with
+    assert stats["capture"]["processed"] > stats["solve"]["processed"]
+    assert stats["solve"]["dropped"] > 0
+    assert stats["solve"]["avg_service_s"] >= 0.09
+    assert "queue_depth" in stats["solve"] and "avg_dwell_s" in stats["publish"]
+    assert published == sorted(published)
+
+
+def test_capture_returning_none_is_not_solved():
+    solved = []
+
+    def capture():
+        time.sleep(0.01)
+        return None
+
+    pipeline = SolvePipeline(capture, solved.append, lambda r: None)
+    pipeline.start()
+    time.sleep(0.1)
+    pipeline.stop()
+    assert solved == []
+
+
+def test_stage_errors_are_counted():
+    def capture():
+        time.sleep(0.01)
+        return 1
+
+    def solve(frame):
+        raise RuntimeError("boom")
+
+    pipeline = SolvePipeline(capture, solve, lambda r: None)
+    pipeline.start()
+    time.sleep(0.2)
+    pipeline.stop()
+    assert pipeline.stats()["solve"]["errors"] > 0
+
+
+def test_solver_stats_never_builds_solvers(monkeypatch):
+    from skysolve_next.workers import solve_worker
+
+    def fail():
+        raise AssertionError("publish must not build solvers")
+
+    class BrokenSolver:
+        def stats(self):
+            raise RuntimeError("database not loaded")
+
+    monkeypatch.setattr(solve_worker, "get_solvers", fail)
+    monkeypatch.setitem(solve_worker._solvers, "primary", None)
+    assert solve_worker.solver_stats() is None
+    monkeypatch.setitem(solve_worker._solvers, "primary", BrokenSolver())
+    assert solve_worker.solver_stats() is None
@@ -0,0 +1,65 @@
+import math
+import pytest
+from skysolve_next.core.config import settings
+from skysolve_next.core.models import SolveResult
+from skysolve_next.publish.lx200_server import LX200Server
+from skysolve_next.publish.pointing import SIDEREAL_RATE, PointingPredictor
+
+
+def _ra_diff(a, b):
+    return (a - b + 180.0) % 360.0 - 180.0
+
+
+def test_single_solve_drifts_at_sidereal_rate():
+    predictor = PointingPredictor(tracking=False)
+    predictor.add(1000.0, 100.0, 30.0, 0.9)
+    prediction = predictor.predict(1060.0)
+    # An untracked telescope stays put in hour angle: RA grows by 15.04"/s, Dec unchanged
+    assert _ra_diff(prediction.ra_deg, 100.0) == pytest.approx(math.degrees(SIDEREAL_RATE) * 60.0, rel=1e-3)
+    assert prediction.dec_deg == pytest.approx(30.0, abs=1e-6)
+    assert prediction.age_s == pytest.approx(60.0)
+
+    tracked = PointingPredictor(tracking=True)
+    tracked.add(1000.0, 100.0, 30.0)
+    assert tracked.predict(1060.0).ra_deg == pytest.approx(100.0)
+
+
+def test_push_to_motion_is_extrapolated_and_capped():
+    predictor = PointingPredictor(tracking=True, max_extrapolate_s=3.0, confidence_half_life_s=1.0)
+    # Slewing north at 0.5 deg/s, one solve every 2 s
+    for i in range(4):
+        predictor.add(100.0 + 2.0 * i, 50.0, 10.0 + 1.0 * i, 0.8)
+    assert predictor.angular_rate() == pytest.approx(0.5, rel=1e-3)
+
+    prediction = predictor.predict(107.0)
+    assert prediction.dec_deg == pytest.approx(13.5, abs=1e-3)
+    assert prediction.ra_deg == pytest.approx(50.0, abs=1e-3)
+    assert prediction.confidence == pytest.approx(0.4)
+    # Beyond the cap the fitted motion stops
+    assert predictor.predict(120.0).dec_deg == pytest.approx(14.5, abs=1e-3)
+
+
+def test_history_window_forgets_old_motion():
+    predictor = PointingPredictor(tracking=True, history_s=5.0)
+    predictor.add(0.0, 10.0, 0.0)
+    predictor.add(2.0, 12.0, 0.0)
+    predictor.add(30.0, 20.0, 0.0)  # telescope now at rest
+    assert predictor.angular_rate() == 0.0
+    assert predictor.predict(32.0).ra_deg == pytest.approx(20.0)
+
+
+def test_lx200_answers_with_predicted_position(monkeypatch):
+    monkeypatch.setattr(settings.lx200, "predict", True)
+    monkeypatch.setattr(settings.lx200, "tracking", True)
+    server = LX200Server(port=1)
+    assert server.current_radec(0.0) == (0.0, 0.0)
+
+    server.publish(SolveResult(30.0, 0.0, 0.0, 30.0, 0.9), timestamp=10.0)
+    server.publish(SolveResult(31.0, 0.0, 0.0, 30.0, 0.9), timestamp=12.0)
+    server.publish(SolveResult(None, None, None, None, None), timestamp=14.0)  # failed solve is ignored
+    ra, dec = server.current_radec(13.0)
+    assert ra == pytest.approx(31.5, abs=1e-3)
+    assert dec == pytest.approx(0.0, abs=1e-6)
+
+    monkeypatch.setattr(settings.lx200, "predict", False)
+    assert server.current_radec(13.0) == (31.0, 0.0)
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+import pytest
+from skysolve_next.core.config import Settings, SettingsWatcher
+
+
+def _settings(tmp_path):
+    s = Settings()
+    s._config_path = str(tmp_path / "settings.json")
+    s.save()
+    return s
+
+
+def _write(s, **sections):
+    data = s.model_dump()
+    for section, values in sections.items():
+        data[section].update(values)
+    with open(s._config_path, "w") as f:
+        json.dump(data, f)
+
+
+def _wait_dirty(s, timeout=3.0):
+    deadline = time.time() + timeout
+    while not s._dirty.is_set() and time.time() < deadline:
+        time.sleep(0.01)
+    return s._dirty.is_set()
+
+
+def test_reload_applies_only_changes_and_notifies(tmp_path):
+    s = _settings(tmp_path)
+    seen = []
+    s.subscribe(seen.append, "camera")
+    s.reload_if_changed()  # starts the watcher and reads the file once
+    seen.clear()
+
+    _write(s, camera={"shutter_speed": "0.5"}, onstep={"port": 9997})
+    assert _wait_dirty(s)
+    s.reload_if_changed()
+    assert s.camera.shutter_speed == "0.5" and s.onstep.port == 9997
+    assert seen == [{"camera.shutter_speed": ("1", "0.5")}]  # only the camera change, only once
+    assert s.snapshot().onstep.port == 9997
+
+    # Nothing changed: no reload, no notification
+    seen.clear()
+    s.reload_if_changed()
+    assert seen == []
+
+
+def test_reload_swaps_in_a_new_read_only_snapshot(tmp_path):
+    s = _settings(tmp_path)
+    s.reload_if_changed()
+    before = s.snapshot()
+    _write(s, camera={"binning": 2, "roi": [0.25, 0.25, 0.5, 0.5]})
+    assert _wait_dirty(s)
+    s.reload_if_changed()
+    after = s.snapshot()
+    # A reader holding the old snapshot never sees half of an update
+    assert (before.camera.binning, before.camera.roi) == (1, None)
+    assert (after.camera.binning, after.camera.roi) == (2, [0.25, 0.25, 0.5, 0.5])
+    assert s.camera.binning == 2 and s.camera is not after.camera
+    with pytest.raises(TypeError):
+        after.camera.binning = 4
+
+
+def test_invalid_file_keeps_previous_values(tmp_path):
+    s = _settings(tmp_path)
+    s.reload_if_changed()
+    _write(s, onstep={"port": "not a port"})
+    assert _wait_dirty(s)
+    s.reload_if_changed()
+    assert s.onstep.port == Settings().onstep.port
+
+
+def test_missing_file_keeps_values_and_is_not_recreated(tmp_path):
+    s = _settings(tmp_path)
+    s.reload_if_changed()
+    _write(s, onstep={"port": 9997})
+    assert _wait_dirty(s)
+    s.reload_if_changed()
+    os.remove(s._config_path)
+    assert _wait_dirty(s)
+    s.reload_if_changed()
+    assert s.snapshot().onstep.port == 9997
+    assert not os.path.exists(s._config_path)
+
+
+def test_watcher_polling_fallback(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text("{}")
+    calls = []
+    watcher = SettingsWatcher(str(path), lambda: calls.append(1), poll_interval=0.02)
+    watcher._run = watcher._watch_poll
+    watcher.start()
+    deadline = time.time() + 2
+    while not calls and time.time() < deadline:
+        time.sleep(0.01)
+    path.write_text('{"mode": "align"}')
+    while len(calls) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(calls) >= 2
+
+
+def test_concurrent_callers_start_one_watcher(tmp_path, monkeypatch):
+    s = _settings(tmp_path)
+    started = []
+    monkeypatch.setattr(SettingsWatcher, "start", lambda self: started.append(self) or time.sleep(0.05))
+    threads = [threading.Thread(target=s.reload_if_changed) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(started) == 1
@@ -0,0 +1,76 @@
+import multiprocessing
+import struct
+from skysolve_next.core.models import SolveResult
+from skysolve_next.core.shm import PREVIEW_CAPACITY, SharedPreview, SharedStatus, _SEQ_OFFSET
+
+
+def _result(ra, dec, confidence=0.9):
+    return SolveResult(ra_deg=ra, dec_deg=dec, roll_deg=12.0, plate_scale_arcsec_px=30.5, confidence=confidence)
+
+
+def test_publish_and_read(tmp_path):
+    path = str(tmp_path / "status")
+    assert SharedStatus(path).read() is None
+
+    writer = SharedStatus(path)
+    writer.publish("solve", _result(0.0, 0.0), None, {"pipeline": {"solve": {"processed": 3}}})
+    reader = SharedStatus(path)
+    status = reader.read()
+    assert (status["ra"], status["dec"]) == (0.0, 0.0)
+    assert status["roll"] == 12.0 and status["plate_scale"] == 30.5
+    assert status["confidence"] == 0.9
+    assert status["pipeline"] == {"solve": {"processed": 3}}
+    assert status["timestamp"] is not None
+
+    # A failed frame keeps the last pointing and stats but updates mode and error
+    writer.publish("solve", _result(None, None, 0.0), "no stars")
+    status = reader.read()
+    assert (status["ra"], status["dec"]) == (0.0, 0.0)
+    assert status["error"] == "no stars"
+    assert status["pipeline"] == {"solve": {"processed": 3}}
+
+
+def test_reader_never_returns_a_write_in_progress(tmp_path):
+    path = str(tmp_path / "status")
+    writer = SharedStatus(path)
+    writer.publish("solve", _result(1.0, 2.0))
+    with open(path, "r+b") as f:
+        f.seek(_SEQ_OFFSET)
+        seq = struct.unpack("<Q", f.read(8))[0]
+        f.seek(_SEQ_OFFSET)
+        f.write(struct.pack("<Q", seq + 1))  # writer died mid-update
+    assert SharedStatus(path).read(retries=10) is None
+
+
+def _writer(path, count):
+    writer = SharedStatus(path)
+    for i in range(count):
+        writer.publish("solve", _result(float(i), float(i) / 2.0))
+
+
+def test_concurrent_reads_are_consistent(tmp_path):
+    path = str(tmp_path / "status")
+    SharedStatus(path).publish("solve", _result(0.0, 0.0))
+    proc = multiprocessing.get_context("fork").Process(target=_writer, args=(path, 3000))
+    proc.start()
+    reader = SharedStatus(path)
+    reads = 0
+    while proc.is_alive() or reads == 0:
+        status = reader.read()
+        if status is not None:
+            assert status["dec"] == status["ra"] / 2.0
+            reads += 1
+    proc.join()
+    assert reader.read()["ra"] == 2999.0
+
+
+def test_preview_roundtrip(tmp_path):
+    path = str(tmp_path / "preview")
+    assert SharedPreview(path).read() is None
+    writer, reader = SharedPreview(path), SharedPreview(path)
+    assert writer.publish(b"\xff\xd8first")
+    assert reader.read()[0] == b"\xff\xd8first"
+    assert writer.publish(b"\xff\xd8second, longer")
+    jpeg, written_at = reader.read()
+    assert jpeg == b"\xff\xd8second, longer" and written_at > 0
+    assert not writer.publish(b"x" * (PREVIEW_CAPACITY + 1))
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from skysolve_next.solver.starfinder import STAR_DTYPE, find_stars, label_components
+
+
+def _synthetic_frame(stars, width=400, height=300, sky=20.0, noise=2.0, seed=0):
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    frame = sky + 0.02 * xx + rng.normal(0.0, noise, (height, width))
+    for x, y, amp, sigma in stars:
+        frame += amp * np.exp(-((xx - x) ** 2 + (yy - y) ** 2) / (2 * sigma ** 2))
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+STARS = [(50.3, 60.7, 200.0, 1.5), (210.8, 140.1, 120.0, 1.5), (330.5, 40.2, 60.0, 2.0), (120.2, 250.9, 30.0, 1.5)]
+
+
+def test_finds_stars_with_subpixel_centroids():
+    field = find_stars(_synthetic_frame(STARS))
+    assert field.stars.dtype == STAR_DTYPE
+    assert len(field) == len(STARS)
+    for x, y, _, _ in STARS:
+        d = np.hypot(field.stars["x"] - x, field.stars["y"] - y)
+        assert d.min() < 0.25
+
+
+def test_stars_sorted_by_flux_and_limited():
+    field = find_stars(_synthetic_frame(STARS), max_stars=2)
+    assert len(field) == 2
+    assert field.stars["flux"][0] >= field.stars["flux"][1]
+    assert abs(field.stars["x"][0] - 50.3) < 0.25
+
+
+def test_fwhm_tracks_star_width():
+    field = find_stars(_synthetic_frame([(100.0, 100.0, 150.0, 1.2), (300.0, 200.0, 150.0, 2.5)]))
+    narrow, wide = sorted(field.stars["fwhm"])
+    assert narrow < wide
+    assert 1.5 < narrow < 3.5
+
+
+def test_background_and_noise_estimates():
+    field = find_stars(_synthetic_frame([], noise=3.0))
+    assert len(field) == 0
+    assert 20.0 < field.background < 30.0
+    assert 2.0 < field.noise < 4.0
+
+
+def test_single_hot_pixels_are_rejected():
+    frame = _synthetic_frame(STARS[:1])
+    frame[200, 300] = 255
+    frame[20, 380] = 255
+    field = find_stars(frame)
+    assert len(field) == 1
+
+
+def test_saturated_stars_are_counted():
+    field = find_stars(_synthetic_frame([(100.0, 100.0, 500.0, 2.0), (300.0, 200.0, 80.0, 1.5)]))
+    assert field.saturated == 1
+    assert field.peak == 255
+
+
+def test_rgb_frames_are_accepted():
+    gray = _synthetic_frame(STARS)
+    field = find_stars(np.dstack([gray, gray, gray]))
+    assert len(field) == len(STARS)
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (7, 5)])
+def test_tiny_frames(shape):
+    assert len(find_stars(np.zeros(shape, dtype=np.uint8))) == 0
+
+
+def test_label_components_eight_connected():
+    mask = np.zeros((6, 8), dtype=bool)
+    mask[0, 0] = mask[1, 1] = mask[2, 2] = True  # diagonal chain
+    mask[4:6, 5:8] = True
+    mask[0, 7] = True
+    idx, ids, count = label_components(mask)
+    assert count == 3
+    assert len(idx) == mask.sum()
+
+
+def test_label_components_snake():
+    # A long winding region still collapses to a single component
+    mask = np.zeros((21, 21), dtype=bool)
+    mask[::2, :] = True
+    mask[1::4, -1] = True
+    mask[3::4, 0] = True
+    _, _, count = label_components(mask)
+    assert count == 1
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from skysolve_next.solver import tetra3_solver
+from skysolve_next.solver.starfinder import find_stars
+from skysolve_next.solver.tetra3_solver import Tetra3Solver
+
+
+class FakeTetra3:
+    instances = 0
+
+    def __init__(self, load_database=None):
+        FakeTetra3.instances += 1
+        self.database = load_database
+        self.calls = []
+
+    def solve_from_centroids(self, centroids, size, **kwargs):
+        self.calls.append((centroids, size, kwargs))
+        return {"RA": 83.8, "Dec": -5.4, "Roll": 12.5, "FOV": 10.0, "Matches": 9, "Prob": 1e-6, "T_solve": 12.0}
+
+
+class FakeModule:
+    Tetra3 = FakeTetra3
+
+
+@pytest.fixture
+def fake_tetra3(monkeypatch):
+    FakeTetra3.instances = 0
+    monkeypatch.setattr(tetra3_solver, "tetra3", FakeModule)
+    monkeypatch.setattr(tetra3_solver, "TETRA3_AVAILABLE", True)
+    monkeypatch.setattr(tetra3_solver, "_databases", {})
+    return FakeTetra3
+
+
+def _frame(n=8, width=320, height=240):
+    rng = np.random.default_rng(3)
+    yy, xx = np.mgrid[0:height, 0:width]
+    frame = 15.0 + rng.normal(0.0, 1.0, (height, width))
+    for i in range(n):
+        x, y = 20 + 35 * i, 30 + 22 * i
+        frame += (200 - 15 * i) * np.exp(-((xx - x) ** 2 + (yy - y) ** 2) / (2 * 1.5 ** 2))
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def test_database_loaded_once(fake_tetra3):
+    a = Tetra3Solver()
+    b = Tetra3Solver()
+    a.load()
+    a.solve(_frame())
+    b.solve(_frame())
+    assert fake_tetra3.instances == 1
+
+
+def test_solve_from_frame(fake_tetra3):
+    solver = Tetra3Solver(fov_estimate=10.0)
+    result = solver.solve(_frame(), ra_hint=1.0, dec_hint=2.0, radius_hint=5.0)
+    assert (result.ra_deg, result.dec_deg, result.roll_deg) == (83.8, -5.4, 12.5)
+    assert result.plate_scale_arcsec_px == pytest.approx(10.0 * 3600 / 320)
+    assert result.confidence == pytest.approx(1.0, abs=1e-5)
+    t3 = tetra3_solver._databases["default_database"]
+    centroids, size, kwargs = t3.calls[0]
+    assert size == (240, 320)
+    assert kwargs["fov_estimate"] == 10.0
+    # Centroids are passed as (y, x), brightest first
+    assert centroids[0] == pytest.approx([30, 20], abs=0.2)
+
+
+def test_solve_from_star_field(fake_tetra3):
+    field = find_stars(_frame())
+    result = Tetra3Solver().solve(field)
+    assert result.ra_deg == 83.8
+
+
+def test_too_few_stars_fails_without_solving(fake_tetra3):
+    result = Tetra3Solver().solve(_frame(n=2))
+    assert result.ra_deg is None and result.confidence == 0.0
+    assert fake_tetra3.instances == 0
+
+
+def test_no_match(fake_tetra3, monkeypatch):
+    monkeypatch.setattr(FakeTetra3, "solve_from_centroids", lambda self, *a, **k: {"RA": None, "T_solve": 5.0})
+    result = Tetra3Solver().solve(_frame())
+    assert result.ra_deg is None
+
+
+def test_missing_tetra3(monkeypatch):
+    monkeypatch.setattr(tetra3_solver, "TETRA3_AVAILABLE", False)
+    with pytest.raises(RuntimeError):
+        Tetra3Solver().solve(_frame())
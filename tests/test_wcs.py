@@ -0,0 +1,87 @@
+import math
+import os
+import numpy as np
+import pytest
+from skysolve_next.solver.astrometry_solver import AstrometrySolver
+from skysolve_next.solver.fits import _format_header, _pad, read_header, read_table
+from skysolve_next.solver.wcs import WcsSolution
+
+
+def _wcs_cards(ra, dec, scale_arcsec=30.0, roll_deg=0.0, width=320, height=240):
+    s = scale_arcsec / 3600.0
+    c, n = math.cos(math.radians(roll_deg)), math.sin(math.radians(roll_deg))
+    return [
+        ("SIMPLE", True, None), ("BITPIX", 8, None), ("NAXIS", 0, None),
+        ("CTYPE1", "RA---TAN", None), ("CTYPE2", "DEC--TAN", None),
+        ("CRVAL1", float(ra), None), ("CRVAL2", float(dec), None),
+        ("CRPIX1", 0.5 + width / 2.0, None), ("CRPIX2", 0.5 + height / 2.0, None),
+        ("CD1_1", -s * c, None), ("CD1_2", s * n, None), ("CD2_1", s * n, None), ("CD2_2", s * c, None),
+        ("IMAGEW", width, None), ("IMAGEH", height, None),
+    ]
+
+
+def _write_table(path, columns):
+    """Write a one-extension FITS file with float64 columns."""
+    table = np.empty(len(next(iter(columns.values()))), dtype=[(k, ">f8") for k in columns])
+    for name, values in columns.items():
+        table[name] = values
+    extension = [("XTENSION", "BINTABLE", None), ("BITPIX", 8, None), ("NAXIS", 2, None),
+                 ("NAXIS1", table.dtype.itemsize, None), ("NAXIS2", len(table), None),
+                 ("PCOUNT", 0, None), ("GCOUNT", 1, None), ("TFIELDS", len(columns), None)]
+    for i, name in enumerate(columns, start=1):
+        extension += [(f"TTYPE{i}", name, None), (f"TFORM{i}", "D", None)]
+    with open(path, "wb") as f:
+        f.write(_format_header([("SIMPLE", True, None), ("BITPIX", 8, None), ("NAXIS", 0, None)]))
+        f.write(_format_header(extension))
+        f.write(_pad(table.tobytes(), b"\0"))
+
+
+def test_table_round_trip(tmp_path):
+    path = str(tmp_path / "t.fits")
+    _write_table(path, {"LOGODDS": [42.0, 3.0], "NMATCH": [17.0, 4.0]})
+    header, table = read_table(path)
+    assert header["NAXIS2"] == 2
+    assert table["LOGODDS"].tolist() == [42.0, 3.0]
+    assert read_header(path, hdu=1)["TTYPE2"] == "NMATCH"
+
+
+def test_tan_projection_offsets():
+    header = dict((k, v) for k, v, _ in _wcs_cards(120.0, 20.0, scale_arcsec=36.0))
+    wcs = WcsSolution.from_header(header)
+    assert wcs.center() == pytest.approx((120.0, 20.0))
+    # 100 px north of the reference pixel along the Dec axis
+    ra, dec = wcs.pixel_to_radec(wcs.crpix[0], wcs.crpix[1] + 100)
+    assert ra == pytest.approx(120.0)
+    assert dec == pytest.approx(20.0 + math.degrees(math.atan(math.radians(1.0))))
+    roll, scale, parity = wcs.orientation()
+    assert scale == pytest.approx(36.0)
+    assert roll == pytest.approx(0.0, abs=1e-9)
+    assert parity == -1
+
+
+def test_solution_read_from_wcs_files(monkeypatch, tmp_path):
+    def fake_run(cmd, capture_output, text, timeout):
+        base_path = os.path.splitext(cmd[1])[0]
+        # A real solve at RA 0h on the celestial equator
+        with open(base_path + ".wcs", "wb") as f:
+            f.write(_format_header(_wcs_cards(0.0, 0.0, scale_arcsec=25.0, roll_deg=12.0)))
+        _write_table(cmd[cmd.index("--match") + 1], {"LOGODDS": [30.0]})
+        _write_table(cmd[cmd.index("--corr") + 1], {"field_x": np.arange(14.0)})
+        open(base_path + ".solved", "w").close()
+
+        class Result:
+            returncode = 0
+            stdout = "no parsable center here"
+            stderr = ""
+        return Result()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    solver = AstrometrySolver(work_dir=str(tmp_path))
+    frame = np.zeros((240, 320), dtype=np.uint8)
+    result = solver.solve(frame, enable_fallback=False)
+    assert result.ra_deg == pytest.approx(0.0, abs=1e-9) or result.ra_deg == pytest.approx(360.0)
+    assert result.dec_deg == pytest.approx(0.0, abs=1e-9)
+    assert result.roll_deg == pytest.approx(12.0)
+    assert result.plate_scale_arcsec_px == pytest.approx(25.0)
+    assert result.confidence == pytest.approx(1.0 - math.exp(-30.0))
+    assert result.matched_stars == 14